@@ -0,0 +1,151 @@
+import io
+import threading
+import wave
+
+from upstream import env_float, env_int
+
+try:
+    import numpy as np
+except Exception:
+    np = None
+
+
+TARGET_SAMPLE_RATE = max(8000, env_int("AUDIO_TARGET_SAMPLE_RATE", 16000))
+VAD_FRAME_MS = 20
+VAD_MIN_RMS = max(0.0, env_float("AUDIO_VAD_MIN_RMS", 0.01))
+VAD_NOISE_FACTOR = 3.0
+VAD_PADDING_MS = max(0, env_int("AUDIO_VAD_PADDING_MS", 200))
+WAV_MIME_TOKENS = ("wav", "wave")
+
+_totals_lock = threading.Lock()
+_totals = {
+    "segments": 0,
+    "silent_segments": 0,
+    "input_bytes": 0,
+    "output_bytes": 0,
+    "input_seconds": 0.0,
+    "output_seconds": 0.0,
+}
+
+
+def is_available():
+    return np is not None
+
+
+def is_wav(audio, mime_type=""):
+    header = bytes(audio[:12])
+    return (header[:4] == b"RIFF" and header[8:12] == b"WAVE") or any(token in (mime_type or "").lower() for token in WAV_MIME_TOKENS)
+
+
+def decode_wav(audio):
+    with wave.open(io.BytesIO(audio), "rb") as reader:
+        channels = reader.getnchannels()
+        width = reader.getsampwidth()
+        rate = reader.getframerate()
+        raw = reader.readframes(reader.getnframes())
+
+    if width == 1:
+        samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif width == 2:
+        samples = np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768.0
+    elif width == 3:
+        packed = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        values = packed[:, 0] | (packed[:, 1] << 8) | (packed[:, 2] << 16)
+        samples = np.where(values >= 1 << 23, values - (1 << 24), values).astype(np.float32) / float(1 << 23)
+    elif width == 4:
+        samples = np.frombuffer(raw, dtype="<i4").astype(np.float32) / float(1 << 31)
+    else:
+        raise ValueError(f"Unsupported WAV sample width: {width} bytes.")
+
+    if channels > 1:
+        samples = samples[: len(samples) - len(samples) % channels].reshape(-1, channels).mean(axis=1)
+    return samples, rate
+
+
+def voiced_bounds(samples, rate):
+    frame = max(1, rate * VAD_FRAME_MS // 1000)
+    count = len(samples) // frame
+    if count == 0:
+        return 0, 0
+    frames = samples[: count * frame].reshape(count, frame)
+    rms = np.sqrt(np.mean(frames * frames, axis=1))
+    # Adapt to the room: the quietest tenth of the segment approximates its noise floor.
+    threshold = max(VAD_MIN_RMS, float(np.percentile(rms, 10)) * VAD_NOISE_FACTOR)
+    voiced = np.flatnonzero(rms > threshold)
+    if voiced.size == 0:
+        return 0, 0
+    padding = VAD_PADDING_MS * rate // 1000
+    start = max(0, int(voiced[0]) * frame - padding)
+    end = min(len(samples), (int(voiced[-1]) + 1) * frame + padding)
+    return start, end
+
+
+def resample(samples, rate, target_rate=TARGET_SAMPLE_RATE):
+    if rate == target_rate or len(samples) == 0:
+        return samples
+    if rate > target_rate:
+        # Box filter before decimating keeps the worst aliasing out of the speech band.
+        width = int(round(rate / target_rate))
+        if width > 1:
+            samples = np.convolve(samples, np.full(width, 1.0 / width, dtype=np.float32), mode="same")
+    length = max(1, int(round(len(samples) * target_rate / rate)))
+    positions = np.arange(length, dtype=np.float64) * (rate / target_rate)
+    return np.interp(positions, np.arange(len(samples)), samples).astype(np.float32)
+
+
+def encode_wav(samples, rate):
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767.0).astype("<i2")
+    output = io.BytesIO()
+    with wave.open(output, "wb") as writer:
+        writer.setnchannels(1)
+        writer.setsampwidth(2)
+        writer.setframerate(rate)
+        writer.writeframes(pcm.tobytes())
+    return output.getbuffer()
+
+
+def _record(stats):
+    with _totals_lock:
+        _totals["segments"] += 1
+        _totals["silent_segments"] += int(stats["silent"])
+        _totals["input_bytes"] += stats["input_bytes"]
+        _totals["output_bytes"] += stats["output_bytes"]
+        _totals["input_seconds"] += stats["input_seconds"]
+        _totals["output_seconds"] += stats["output_seconds"]
+
+
+def totals():
+    with _totals_lock:
+        summary = dict(_totals)
+    summary["trimmed_bytes"] = summary["input_bytes"] - summary["output_bytes"]
+    summary["trimmed_seconds"] = round(summary["input_seconds"] - summary["output_seconds"], 3)
+    summary["input_seconds"] = round(summary["input_seconds"], 3)
+    summary["output_seconds"] = round(summary["output_seconds"], 3)
+    return summary
+
+
+def preprocess_audio(audio, mime_type=""):
+    # Returns (audio, mime_type, stats); stats is None when the input was passed through untouched.
+    if not is_available() or not audio or not is_wav(audio, mime_type):
+        return audio, mime_type, None
+    try:
+        samples, rate = decode_wav(audio)
+    except (wave.Error, EOFError, ValueError):
+        return audio, mime_type, None
+
+    input_seconds = len(samples) / rate if rate else 0.0
+    start, end = voiced_bounds(samples, rate)
+    speech = resample(samples[start:end], rate)
+    output = encode_wav(speech, TARGET_SAMPLE_RATE) if end > start else memoryview(b"")
+    stats = {
+        "input_bytes": len(audio),
+        "output_bytes": len(output),
+        "input_seconds": round(input_seconds, 3),
+        "output_seconds": round((end - start) / rate if rate else 0.0, 3),
+        "sample_rate": rate,
+        "silent": end <= start,
+    }
+    stats["trimmed_bytes"] = stats["input_bytes"] - stats["output_bytes"]
+    stats["trimmed_seconds"] = round(stats["input_seconds"] - stats["output_seconds"], 3)
+    _record(stats)
+    return output, "audio/wav", stats
@@ -0,0 +1,154 @@
+import re
+import threading
+
+from frames import read_bounded
+from upstream import env_float, env_int
+
+
+WINDOW_SECONDS = max(1.0, env_float("AUDIO_WINDOW_SECONDS", 6))
+WINDOW_OVERLAP_SECONDS = max(0.0, env_float("AUDIO_WINDOW_OVERLAP_SECONDS", 1))
+CHUNK_MAX_BYTES = max(1, env_int("AUDIO_CHUNK_MAX_BYTES", 1024 * 1024))
+MERGE_MAX_WORDS = 8
+
+
+class AudioSequenceError(Exception):
+    def __init__(self, expected, received):
+        super().__init__(f"Audio chunk {received} arrived, but the stream expects chunk {expected}.")
+        self.expected = expected
+        self.received = received
+
+
+class AudioChunkTooLargeError(Exception):
+    def __init__(self, max_bytes):
+        super().__init__(f"Audio chunk exceeds the {max_bytes // 1024} KB limit.")
+        self.max_bytes = max_bytes
+
+
+def read_audio_chunk(stream, max_bytes=CHUNK_MAX_BYTES, content_length=None):
+    data = read_bounded(stream, max_bytes, content_length)
+    if len(data) > max_bytes:
+        raise AudioChunkTooLargeError(max_bytes)
+    return memoryview(data)
+
+
+def _normalize_word(word):
+    return re.sub(r"[^\w']", "", word.lower())
+
+
+def merge_overlap(previous_text, incoming_text, max_words=MERGE_MAX_WORDS):
+    # Overlapping windows transcribe the same audio twice; drop the incoming words that repeat the tail.
+    incoming = incoming_text.split()
+    if not previous_text or not incoming:
+        return " ".join(incoming)
+    tail = [_normalize_word(word) for word in previous_text.split()[-max_words:]]
+    head = [_normalize_word(word) for word in incoming[:max_words]]
+    for size in range(min(len(tail), len(head)), 0, -1):
+        if tail[-size:] == head[:size]:
+            return " ".join(incoming[size:])
+    return " ".join(incoming)
+
+
+# Rolling per-session audio buffer that transcribes overlapping windows as they fill.
+# Chunk 0 is the container header (MediaRecorder's first blob) and is prepended to every
+# window, so each window is a decodable file built from references to the received chunks.
+class AudioStream:
+    def __init__(self, transcribe, executor, mime_type="audio/webm", window_seconds=WINDOW_SECONDS, overlap_seconds=WINDOW_OVERLAP_SECONDS):
+        self.transcribe = transcribe
+        self.executor = executor
+        self.mime_type = mime_type or "audio/webm"
+        self.window_seconds = window_seconds
+        self.overlap_seconds = min(overlap_seconds, window_seconds / 2)
+        self.next_seq = 0
+        self.windows_submitted = 0
+        self.text = ""
+        self.warning = ""
+        self._header = None
+        self._chunks = []
+        self._overlap_chunks = 0
+        self._results = {}
+        self._next_merge = 0
+        self._condition = threading.Condition()
+
+    @property
+    def pending_windows(self):
+        return self.windows_submitted - self._next_merge
+
+    def append(self, seq, data, duration_ms=1000, voiced=True):
+        with self._condition:
+            if seq < self.next_seq:
+                return False
+            if seq > self.next_seq:
+                raise AudioSequenceError(self.next_seq, seq)
+            self.next_seq += 1
+            if seq == 0:
+                self._header = data
+                return True
+            self._chunks.append((data, max(0.0, duration_ms / 1000.0), bool(voiced)))
+            if self._buffered_seconds() >= self.window_seconds:
+                self._submit_window(keep_overlap=True)
+            return True
+
+    def flush(self):
+        with self._condition:
+            # The overlap carried from the last full window was already transcribed.
+            if len(self._chunks) > self._overlap_chunks:
+                self._submit_window(keep_overlap=False)
+
+    def _buffered_seconds(self):
+        return sum(duration for _, duration, _ in self._chunks)
+
+    def _submit_window(self, keep_overlap):
+        chunks = self._chunks
+        if keep_overlap:
+            kept, seconds = [], 0.0
+            for chunk in reversed(chunks):
+                if seconds >= self.overlap_seconds:
+                    break
+                kept.insert(0, chunk)
+                seconds += chunk[1]
+            self._chunks = kept
+        else:
+            self._chunks = []
+        self._overlap_chunks = len(self._chunks)
+
+        # Windows without any voiced chunk would only make Whisper hallucinate on silence.
+        if not any(voiced for _, _, voiced in chunks):
+            return
+        parts = ([self._header] if self._header is not None else []) + [data for data, _, _ in chunks]
+        index = self.windows_submitted
+        self.windows_submitted += 1
+        self.executor.submit(self._transcribe_window, index, parts)
+
+    def _transcribe_window(self, index, parts):
+        text, warning = "", ""
+        try:
+            text = (self.transcribe(parts, self.mime_type) or "").strip()
+        except Exception as err:
+            warning = str(err)
+        with self._condition:
+            self._results[index] = (text, warning)
+            # Windows can finish out of order; merge strictly in capture order.
+            while self._next_merge in self._results:
+                text, warning = self._results.pop(self._next_merge)
+                self._next_merge += 1
+                addition = merge_overlap(self.text, text)
+                if addition:
+                    self.text = f"{self.text} {addition}".strip()
+                self.warning = warning
+            self._condition.notify_all()
+
+    def wait(self, timeout):
+        with self._condition:
+            self._condition.wait_for(lambda: self.pending_windows == 0, timeout=timeout)
+
+    def describe(self, text_offset=0):
+        with self._condition:
+            text_offset = max(0, min(text_offset, len(self.text)))
+            return {
+                "next_seq": self.next_seq,
+                "buffered_seconds": round(self._buffered_seconds(), 2),
+                "pending_windows": self.pending_windows,
+                "text_delta": self.text[text_offset:].strip(),
+                "text_length": len(self.text),
+                "warning": self.warning,
+            }
@@ -1,45 +1,54 @@
-from flask import Flask, request, jsonify
+from startup import startup
+
+from flask import Flask, Response, g, request, jsonify, stream_with_context
 from flask_cors import CORS
-import base64
+from werkzeug.exceptions import RequestEntityTooLarge
+import itertools
 import json
+import math
 import os
 import re
-import sys
+import time
+import io
 import uuid
-import tempfile
 import wave
-from urllib import error, request as urllib_request
-
-try:
-    import speech_recognition as sr
-except Exception:
-    sr = None
-
-
+from concurrent.futures import ThreadPoolExecutor
+
+import audio_preprocess
+from audio_stream import CHUNK_MAX_BYTES, AudioChunkTooLargeError, AudioSequenceError, AudioStream, read_audio_chunk
+from envconfig import APP_ROOT
+from frames import FRAME_MAX_BYTES, FrameTooLargeError, IncompleteBodyError, load_frame, read_frame_stream
+from jobs import TERMINAL_STATUSES, JobQueue, JobStore, QueueFullError, UnknownJobKindError
+from model_router import DEFAULT_DEADLINE_MS, DeadlineExceeded, ModelRouter, cancel_event, is_retryable, remaining_seconds, reset_deadline, set_deadline
+from prescore import prescore
+from prompt_context import ContextStore
+from question_bank import QuestionBank
+from ratelimit import RateLimiter
+from sessions import SessionOffsetError, SessionStore
+from settings import SettingsStore
+from speech_analytics import analyze_transcript, pace_wpm
+from result_cache import ResultCache, content_key, normalize_text, shared_disk_tier
+from upstream import CircuitOpenError, NvidiaAPIError, RateLimitedError, UpstreamClient, env_float, env_int
+import generation
+import serving
+import telemetry
+import vision
+
+startup.mark("imports")
 
 app = Flask(__name__)
+# Hard cap on any request body (form parsing, JSON and raw streams), on top of the per-route frame/chunk limits.
+app.config["MAX_CONTENT_LENGTH"] = max(1, env_int("REQUEST_MAX_BYTES", 32 * 1024 * 1024))
 CORS(app)
 
-APP_ROOT = os.path.dirname(sys.executable) if getattr(sys, "frozen", False) else os.path.dirname(os.path.abspath(__file__))
 SETTINGS_FILE = os.getenv("NVIDIA_SETTINGS_FILE", os.path.join(APP_ROOT, "nvidia_settings.json"))
+JOB_STORE_PATH = os.getenv("JOB_STORE_PATH", os.path.join(APP_ROOT, "jobs.sqlite3"))
+RATE_LIMIT_PATH = os.getenv("RATE_LIMIT_PATH", os.path.join(APP_ROOT, "ratelimit.sqlite3"))
+QUESTION_BANK_PATH = os.getenv("QUESTION_BANK_PATH", os.path.join(APP_ROOT, "question_bank.bin"))
+QUESTION_BANK_ENABLED = os.getenv("QUESTION_BANK_ENABLED", "1").lower() not in {"0", "false", "no"}
 
 
-def load_saved_api_key():
-    try:
-        if not os.path.exists(SETTINGS_FILE):
-            return None
-        with open(SETTINGS_FILE, "r", encoding="utf-8") as file_obj:
-            payload = json.load(file_obj)
-        key = (payload.get("nvidia_api_key") or "").strip()
-        return key or None
-    except Exception:
-        return None
-
-
-def save_api_key(api_key):
-    os.makedirs(os.path.dirname(SETTINGS_FILE), exist_ok=True)
-    with open(SETTINGS_FILE, "w", encoding="utf-8") as file_obj:
-        json.dump({"nvidia_api_key": api_key.strip()}, file_obj)
+settings_store = SettingsStore(SETTINGS_FILE)
 
 
 def mask_api_key(api_key):
@@ -51,14 +60,30 @@ def mask_api_key(api_key):
 
 
 def get_effective_api_key():
-    return (os.getenv("NVIDIA_API_KEY") or "").strip() or load_saved_api_key()
+    return settings_store.current().api_key
 
 
 def get_effective_stt_api_key():
-    return (os.getenv("NVIDIA_STT_API_KEY") or "").strip() or get_effective_api_key()
+    return settings_store.current().stt_api_key
+
+
+_speech_recognition = None
+
+
+def speech_recognition_module():
+    # The SpeechRecognition fallback is rarely used, so its import cost is paid on first use instead of at startup.
+    global _speech_recognition
+    if _speech_recognition is None:
+        try:
+            import speech_recognition
+        except Exception:
+            speech_recognition = False
+        _speech_recognition = speech_recognition
+    return _speech_recognition or None
 
 
 def transcribe_with_speech_recognition(audio_bytes, mime_type="audio/webm"):
+    sr = speech_recognition_module()
     if sr is None:
         raise RuntimeError("SpeechRecognition package is not installed.")
 
@@ -66,17 +91,13 @@ def transcribe_with_speech_recognition(audio_bytes, mime_type="audio/webm"):
     if not any(token in mime for token in ["wav", "x-wav", "wave"]):
         raise RuntimeError("SpeechRecognition fallback supports WAV input only.")
 
-    with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_wav:
-        temp_wav.write(audio_bytes)
-        temp_path = temp_wav.name
-
     try:
         # Validate WAV header quickly to avoid cryptic recognizer errors.
-        with wave.open(temp_path, "rb") as _:
+        with wave.open(io.BytesIO(audio_bytes), "rb") as _:
             pass
 
         recognizer = sr.Recognizer()
-        with sr.AudioFile(temp_path) as source:
+        with sr.AudioFile(io.BytesIO(audio_bytes)) as source:
             audio_data = recognizer.record(source)
 
         return (recognizer.recognize_google(audio_data) or "").strip()
@@ -84,61 +105,168 @@ def transcribe_with_speech_recognition(audio_bytes, mime_type="audio/webm"):
         return ""
     except sr.RequestError as req_err:
         raise RuntimeError(f"SpeechRecognition service error: {req_err}")
-    finally:
-        try:
-            os.remove(temp_path)
-        except OSError:
-            pass
 
 
-class NvidiaAPIError(Exception):
-    def __init__(self, status_code, message):
-        super().__init__(message)
-        self.status_code = status_code
+SCORE_FIELD_PATTERN = re.compile(r'"score"\s*:\s*(-?\d+(?:\.\d+)?)\s*[,}\s]')
+REALTIME_SECONDS_BUCKET = max(1, env_int("REALTIME_CACHE_SECONDS_BUCKET", 15))
+STREAM_INCLUDE_USAGE = os.getenv("NVIDIA_STREAM_INCLUDE_USAGE", "0").lower() in {"1", "true", "yes"}
+
+
+def default_result_caches():
+    disk = shared_disk_tier()
+    return {
+        "questions": ResultCache("questions", env_float("QUESTION_CACHE_TTL", 600), disk=disk),
+        "score": ResultCache("score", env_float("SCORE_CACHE_TTL", 3600), disk=disk),
+        # Realtime results go stale quickly, so they stay in memory only.
+        "realtime": ResultCache("realtime", env_float("REALTIME_CACHE_TTL", 120)),
+        "transcribe": ResultCache("transcribe", env_float("TRANSCRIBE_CACHE_TTL", 600), disk=disk),
+    }
 
 
 class AIInterviewSimulator:
-    def __init__(self):
-        self.model = os.getenv("NVIDIA_MODEL", "meta/llama-3.1-8b-instruct")
-        self.base_url = "https://integrate.api.nvidia.com/v1"
+    def __init__(self, client=None, caches=None, summary_executor=None, router=None):
+        self.client = client or UpstreamClient()
+        self.caches = caches or default_result_caches()
+        self.contexts = ContextStore()
+        self.summary_executor = summary_executor
+        self.router = router or ModelRouter(self.model)
+
+    # Read from the settings store on each call, so a saved change applies without a restart.
+    @property
+    def model(self):
+        return settings_store.current().model
+
+    @property
+    def base_url(self):
+        return settings_store.current().base_url
+
+    def _chat_payload(self, prompt, profile, model=None):
+        # Profiles double as routing tasks; the primary model of the task is the default.
+        model = model or self.router.primary(profile)
+        return {
+            "model": model,
+            "messages": [{"role": "user", "content": prompt}],
+            **generation.profile(profile).payload_fields(model),
+        }
 
-    def _generate_text(self, prompt):
+    @staticmethod
+    def _require_api_key():
         api_key = get_effective_api_key()
         if not api_key:
             raise RuntimeError(
                 "NVIDIA_API_KEY is missing. Set it via environment variable or /settings/api-key endpoint."
             )
+        return api_key
 
-        payload = {
-            "model": self.model,
-            "messages": [{"role": "user", "content": prompt}],
-            "temperature": 0.5,
-        }
+    def _text_cache_key(self, prompt, profile):
+        # The full request payload is the identity of a completion: sampling parameters and prompt. Answers from
+        # hedge or failover models are filed under the primary, since any of them serves the task.
+        return content_key("chat", json.dumps(self._chat_payload(prompt, profile), sort_keys=True))
 
-        req = urllib_request.Request(
-            f"{self.base_url}/chat/completions",
-            data=json.dumps(payload).encode("utf-8"),
-            headers={
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json",
-            },
-            method="POST",
-        )
+    def _remember_text(self, cache, prompt, text, profile):
+        if cache is not None:
+            cache.set(self._text_cache_key(prompt, profile), text)
 
+    def _complete_with_model(self, model, prompt, profile, api_key):
+        payload = self._chat_payload(prompt, profile, model)
+        url = f"{self.base_url}/chat/completions"
         try:
-            with urllib_request.urlopen(req, timeout=60) as response:
-                body = json.loads(response.read().decode("utf-8"))
-        except error.HTTPError as http_error:
+            body = self.client.post_json(url, payload, api_key, endpoint="chat")
+        except NvidiaAPIError as err:
+            if not generation.drop_guided(model, payload, err):
+                raise
+            body = self.client.post_json(url, payload, api_key, endpoint="chat")
+        telemetry.record_tokens(model, body.get("usage"))
+        return body.get("choices", [{}])[0].get("message", {}).get("content", "")
+
+    def _complete_text(self, prompt, profile):
+        api_key = self._require_api_key()
+        return self.router.call(profile, lambda model: self._complete_with_model(model, prompt, profile, api_key))
+
+    def _generate_text(self, prompt, profile, cache=None, refresh=False, key_prompt=None):
+        # key_prompt: a coarser rendering of the prompt to file the result under, when the exact prompt would
+        # never repeat.
+        if cache is None:
+            return self._complete_text(prompt, profile)
+        key = self._text_cache_key(key_prompt or prompt, profile)
+        return cache.get_or_compute(key, lambda: self._complete_text(prompt, profile), refresh=refresh)
+
+    def _stream_payload(self, prompt, profile, model):
+        payload = self._chat_payload(prompt, profile, model)
+        payload["stream"] = True
+        if STREAM_INCLUDE_USAGE:
+            payload["stream_options"] = {"include_usage": True}
+        return payload
+
+    def _open_stream(self, prompt, profile, api_key):
+        # Errors surface on the first read. That is where a rejected JSON constraint is retried without it and
+        # where an unavailable model fails over to the next one; streams are not hedged once tokens flow.
+        url = f"{self.base_url}/chat/completions"
+        candidates = self.router.candidates(profile)
+        for index, model in enumerate(candidates):
+            payload = self._stream_payload(prompt, profile, model)
             try:
-                details = json.loads(http_error.read().decode("utf-8"))
-                message = details.get("detail") or details.get("message") or str(details)
-            except Exception:
-                message = http_error.reason
-            raise NvidiaAPIError(http_error.code, message) from None
-        except error.URLError as url_error:
-            raise NvidiaAPIError(503, f"Network error while contacting NVIDIA API: {url_error.reason}") from None
+                try:
+                    chunks = self.client.stream_sse_json(url, payload, api_key, endpoint="chat")
+                    first = next(chunks, None)
+                except NvidiaAPIError as err:
+                    if not generation.drop_guided(model, payload, err):
+                        raise
+                    chunks = self.client.stream_sse_json(url, payload, api_key, endpoint="chat")
+                    first = next(chunks, None)
+            except Exception as err:
+                if index + 1 < len(candidates) and is_retryable(err):
+                    continue
+                raise
+            return model, chunks, [] if first is None else [first]
+
+    def _stream_text(self, prompt, profile, cache=None, refresh=False):
+        if cache is not None and not refresh:
+            cached = cache.get(self._text_cache_key(prompt, profile))
+            if cached is not None:
+                yield cached
+                return
+
+        api_key = self._require_api_key()
+        model, chunks, head = self._open_stream(prompt, profile, api_key)
+        tokens = []
+        try:
+            for chunk in itertools.chain(head, chunks):
+                if chunk.get("usage"):
+                    telemetry.record_tokens(model, chunk["usage"])
+                delta = (chunk.get("choices") or [{}])[0].get("delta") or {}
+                if delta.get("content"):
+                    tokens.append(delta["content"])
+                    yield delta["content"]
+        finally:
+            chunks.close()
+        # Only a stream that ran to completion is cached; an abandoned one never reaches this line.
+        self._remember_text(cache, prompt, "".join(tokens), profile)
+
+    def _summarize_context(self, previous_summary, text, budget_tokens):
+        # Runs on the summary executor, never on a request thread. An empty result makes the window
+        # fall back to an extractive summary.
+        if not get_effective_api_key() or not self.client.is_available(self.base_url):
+            return ""
+        prompt = f"""
+You maintain a running summary of a candidate's spoken interview answers.
 
-        return body.get("choices", [{}])[0].get("message", {}).get("content", "")
+Current summary:
+{previous_summary or "(none yet)"}
+
+New transcript to fold in:
+{text}
+
+Rewrite the summary so it covers both. Keep concrete facts, examples, numbers and any weak or off-topic
+answers. Stay under {budget_tokens * 3 // 4} words. Return only the summary text.
+"""
+        return self._complete_text(prompt, "summary")
+
+    def _bounded_context(self, endpoint, text, window=None, identity=()):
+        # Keeps prompt size flat over a long session: recent text verbatim, older text as a summary.
+        if window is None:
+            window = self.contexts.window(endpoint, identity, text)
+        return window.prepare(text, self._summarize_context, self.summary_executor)
 
     def transcribe_audio(self, audio_bytes, filename="audio.webm", mime_type="audio/webm"):
         api_key = get_effective_stt_api_key()
@@ -147,56 +275,48 @@ class AIInterviewSimulator:
                 "NVIDIA_STT_API_KEY is missing. Set it (or NVIDIA_API_KEY) via environment variable or /settings/api-key endpoint."
             )
 
-        stt_model = os.getenv("NVIDIA_STT_MODEL", "openai/whisper-large-v3")
-        payload = self._transcribe_audio_with_model(
-            api_key=api_key,
-            stt_model=stt_model,
-            audio_bytes=audio_bytes,
-            filename=filename,
-            mime_type=mime_type,
-        )
-        return (payload.get("text") or "").strip()
+        stt_model = settings_store.current().stt_model
 
-    def _transcribe_audio_with_model(self, api_key, stt_model, audio_bytes, filename="audio.webm", mime_type="audio/webm"):
-        boundary = f"----NVAudioBoundary{uuid.uuid4().hex}"
+        def transcribe():
+            payload = self._transcribe_audio_with_model(
+                api_key=api_key,
+                stt_model=stt_model,
+                audio_bytes=audio_bytes,
+                filename=filename,
+                mime_type=mime_type,
+            )
+            return (payload.get("text") or "").strip()
 
-        parts = []
-        parts.append(f"--{boundary}\r\n".encode("utf-8"))
-        parts.append(f'Content-Disposition: form-data; name="model"\r\n\r\n{stt_model}\r\n'.encode("utf-8"))
-        parts.append(f"--{boundary}\r\n".encode("utf-8"))
-        parts.append(
-            (
-                f'Content-Disposition: form-data; name="file"; filename="{filename}"\r\n'
-                f"Content-Type: {mime_type or 'audio/webm'}\r\n\r\n"
-            ).encode("utf-8")
-        )
-        parts.append(audio_bytes)
-        parts.append("\r\n".encode("utf-8"))
-        parts.append(f"--{boundary}--\r\n".encode("utf-8"))
-        body = b"".join(parts)
+        # Retried segments hash to the same key, so the client's retry does not cost a second Whisper call.
+        key = content_key("transcribe", stt_model, mime_type or "", audio_bytes)
+        return self.caches["transcribe"].get_or_compute(key, transcribe)
 
-        req = urllib_request.Request(
+    def _transcribe_audio_with_model(self, api_key, stt_model, audio_bytes, filename="audio.webm", mime_type="audio/webm"):
+        boundary = f"----NVAudioBoundary{uuid.uuid4().hex}"
+        head = (
+            f"--{boundary}\r\n"
+            f'Content-Disposition: form-data; name="model"\r\n\r\n{stt_model}\r\n'
+            f"--{boundary}\r\n"
+            f'Content-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+            f"Content-Type: {mime_type or 'audio/webm'}\r\n\r\n"
+        ).encode("utf-8")
+        tail = f"\r\n--{boundary}--\r\n".encode("utf-8")
+        # The audio may arrive as a list of stream chunks; they are sent as-is instead of joined into a new buffer.
+        audio_parts = list(audio_bytes) if isinstance(audio_bytes, (list, tuple)) else [audio_bytes]
+        body = [head, *audio_parts, tail]
+
+        _, response_body = self.client.request(
+            "POST",
             f"{self.base_url}/audio/transcriptions",
-            data=body,
+            body=body,
             headers={
                 "Authorization": f"Bearer {api_key}",
                 "Content-Type": f"multipart/form-data; boundary={boundary}",
+                "Content-Length": str(sum(memoryview(part).nbytes for part in body)),
             },
-            method="POST",
+            endpoint="stt",
         )
-
-        try:
-            with urllib_request.urlopen(req, timeout=120) as response:
-                return json.loads(response.read().decode("utf-8"))
-        except error.HTTPError as http_error:
-            try:
-                details = json.loads(http_error.read().decode("utf-8"))
-                message = details.get("detail") or details.get("message") or str(details)
-            except Exception:
-                message = http_error.reason
-            raise NvidiaAPIError(http_error.code, message) from None
-        except error.URLError as url_error:
-            raise NvidiaAPIError(503, f"Network error while contacting NVIDIA API: {url_error.reason}") from None
+        return json.loads(response_body.decode("utf-8"))
 
     @staticmethod
     def _clamp_score(value):
@@ -206,14 +326,19 @@ class AIInterviewSimulator:
     def _count_words(text):
         return len(re.findall(r"\b\w+\b", text or ""))
 
-    def _estimate_visual_scores(self, frame_base64):
+    def _estimate_visual_scores(self, frame, tracker=None):
         default_scores = {"eye_contact": 6, "posture": 6, "outfit": 6}
-        if not frame_base64:
+        if not frame:
             return default_scores
 
         try:
-            encoded = frame_base64.split(",", 1)[1] if "," in frame_base64 else frame_base64
-            image_bytes = base64.b64decode(encoded)
+            # frame is either raw JPEG bytes (multipart upload) or a legacy base64 data URL.
+            image_bytes = load_frame(frame) if isinstance(frame, str) else frame
+            analyzed = vision.visual_scores(image_bytes, tracker)
+            if analyzed is not None:
+                return analyzed
+
+            # Without NumPy/Pillow, fall back to the old compressed-size/byte-mean estimate.
             sample = image_bytes[:5000] if image_bytes else b""
             intensity = (sum(sample) / max(len(sample), 1)) if sample else 120
             size_hint = len(image_bytes) / 1024
@@ -225,12 +350,16 @@ class AIInterviewSimulator:
         except Exception:
             return default_scores
 
-    def _heuristic_realtime_score(self, transcript, session_seconds, filler_words, visual_scores, confidence_signal=6, lighting_score=6, face_detected=None):
-        words = self._count_words(transcript)
-        wpm = (words / max(session_seconds, 1)) * 60
+    def _heuristic_realtime_score(self, transcript, session_seconds, filler_words, visual_scores, confidence_signal=6, lighting_score=6, face_detected=None, word_count=None, speech=None):
+        words = word_count if word_count is not None else self._count_words(transcript)
+        # Prefer the rolling pace from speech analytics, so a slow start does not drag the score down for good.
+        # Too little speech for either leaves the pace out of the tone score.
+        wpm = speech.get("wpm") if speech else None
+        if wpm is None:
+            wpm = pace_wpm(words, session_seconds)
         filler_density = filler_words / max(words, 1)
 
-        tone = self._clamp_score(8.2 - (filler_density * 30) - abs(135 - wpm) / 40)
+        tone = self._clamp_score(8.2 - (filler_density * 30) - (abs(135 - wpm) / 40 if wpm is not None else 0))
         confidence = self._clamp_score(4 + min(words / 35, 3) - (filler_density * 24) + (confidence_signal - 6) * 0.55)
         posture = visual_scores.get("posture", 6)
         outfit = visual_scores.get("outfit", 6)
@@ -239,6 +368,17 @@ class AIInterviewSimulator:
 
         face_state = "detected" if face_detected is True else ("not detected" if face_detected is False else "not confirmed")
         light_state = "good" if lighting_score >= 7 else ("moderate" if lighting_score >= 4 else "poor")
+        feedback = [
+            f"Speech pace is about {int(wpm)} words per minute." if wpm is not None else "Not enough speech yet to measure your pace.",
+            f"Detected filler usage is {round(filler_density * 100, 1)}% of spoken words.",
+            f"Face detection is {face_state}; lighting quality is {light_state}.",
+        ]
+        if speech and speech.get("speaking_ratio") is not None:
+            pauses = speech["pauses"]
+            feedback.append(
+                f"You spoke for {round(speech['speaking_ratio'] * 100)}% of the recorded time, "
+                f"with {pauses['count']} pauses (longest {pauses['longest_seconds']} s)."
+            )
 
         return {
             "overall_score": overall,
@@ -247,11 +387,7 @@ class AIInterviewSimulator:
             "outfit_score": outfit,
             "confidence_score": confidence,
             "summary": "Heuristic realtime assessment generated from speech patterns and visual cues.",
-            "feedback": [
-                f"Speech pace is about {int(wpm)} words per minute.",
-                f"Detected filler usage is {round(filler_density * 100, 1)}% of spoken words.",
-                f"Face detection is {face_state}; lighting quality is {light_state}.",
-            ],
+            "feedback": feedback,
             "improvements": [
                 "Pause briefly before key points to sound more composed.",
                 "Keep shoulders straight and maintain camera-facing posture.",
@@ -259,8 +395,21 @@ class AIInterviewSimulator:
             ],
         }
 
-    def realtime_score(self, role, job_description, transcript, session_seconds, filler_words, frame_base64, eye_contact=None, posture=None, outfit=None, confidence_signal=6, lighting_score=6, face_detected=None):
-        visual_scores = self._estimate_visual_scores(frame_base64)
+    def _resolve_visual_inputs(self, frame, visual_scores=None, visual_tracker=None, lighting_score=None, face_detected=None):
+        if visual_scores is None:
+            visual_scores = self._estimate_visual_scores(frame, visual_tracker)
+        visual_scores = dict(visual_scores)
+        # Client-side measurements win; server frame analysis fills whatever the client did not send.
+        if lighting_score is None:
+            lighting_score = visual_scores.get("lighting", 6)
+        if face_detected is None:
+            face_detected = visual_scores.get("face_detected")
+        return visual_scores, lighting_score, face_detected
+
+    def realtime_score(self, role, job_description, transcript, session_seconds, filler_words, frame=None, eye_contact=None, posture=None, outfit=None, confidence_signal=6, lighting_score=None, face_detected=None, word_count=None, visual_scores=None, visual_tracker=None, session=None, speech=None):
+        visual_scores, lighting_score, face_detected = self._resolve_visual_inputs(
+            frame, visual_scores, visual_tracker, lighting_score, face_detected
+        )
         if eye_contact is not None:
             visual_scores["eye_contact"] = self._clamp_score(eye_contact)
         if posture is not None:
@@ -276,12 +425,25 @@ class AIInterviewSimulator:
             confidence_signal=self._clamp_score(confidence_signal),
             lighting_score=self._clamp_score(lighting_score),
             face_detected=face_detected,
+            word_count=word_count,
+            speech=speech,
         )
 
-        if not get_effective_api_key():
+        if not get_effective_api_key() or not self.client.is_available(self.base_url):
+            telemetry.count_fallback("realtime_heuristic")
             return heuristic
 
-        prompt = f"""
+        role = normalize_text(role)
+        job_description = normalize_text(job_description)
+        with telemetry.phase("context"):
+            if session is not None:
+                transcript = normalize_text(session.bounded_transcript(self._summarize_context, self.summary_executor))
+            else:
+                transcript = self._bounded_context("realtime", normalize_text(transcript), identity=(role, job_description))
+        speech_lines = self._speech_prompt_lines(speech)
+
+        def render(seconds):
+            return f"""
 You are a realtime interview coach evaluating a candidate.
 
 Role: {role}
@@ -291,13 +453,13 @@ Candidate transcript:
 {transcript}
 
 Observed metrics:
-- Session seconds: {session_seconds}
+- Session seconds: {seconds}
 - Filler words: {filler_words}
 - Eye contact estimate: {visual_scores['eye_contact']}/10
 - Posture estimate: {visual_scores['posture']}/10
 - Outfit estimate: {visual_scores['outfit']}/10
 - Lighting estimate: {lighting_score}/10
-- Face detected: {face_detected}
+- Face detected: {face_detected}{speech_lines}
 
 Return ONLY valid JSON in this schema:
 {{
@@ -311,13 +473,36 @@ Return ONLY valid JSON in this schema:
   "improvements": ["short bullet", "short bullet"]
 }}
 """
-        raw_output = self._generate_text(prompt)
-        match = re.search(r"\{.*\}", raw_output, re.DOTALL)
-        if not match:
+        # The model sees the real session time; the cache key uses coarse seconds (and normalized text), so an
+        # unchanged answer slice reuses the cached evaluation.
+        prompt = render(session_seconds)
+        key_prompt = render(session_seconds - session_seconds % REALTIME_SECONDS_BUCKET)
+        raw_output = self._generate_text(prompt, "realtime", self.caches["realtime"], key_prompt=key_prompt)
+        with telemetry.phase("postprocess"):
+            return self._merge_realtime_output(raw_output, heuristic, visual_scores)
+
+    @staticmethod
+    def _speech_prompt_lines(speech):
+        # Coarse values keep the prompt (and its cache key) stable between evaluations of a steady answer.
+        if not speech:
+            return ""
+        lines = []
+        if speech.get("wpm") is not None:
+            lines.append(f"- Speech pace: about {int(round(speech['wpm'], -1))} words per minute")
+        if speech.get("speaking_ratio") is not None:
+            pauses = speech["pauses"]
+            lines.append(f"- Speaking time: {int(round(speech['speaking_ratio'] * 10)) * 10}% of recorded audio")
+            lines.append(f"- Pauses: {pauses['count']} ({pauses['long']} long), longest {round(pauses['longest_seconds'])} s")
+        return "".join(f"\n{line}" for line in lines)
+
+    def _merge_realtime_output(self, raw_output, heuristic, visual_scores):
+        payload, outcome = generation.extract_json_object(raw_output)
+        telemetry.count_parse("realtime", outcome)
+        if payload is None:
+            telemetry.count_fallback("realtime_unparsed")
             return heuristic
 
         try:
-            payload = json.loads(match.group())
             payload["overall_score"] = self._clamp_score(payload.get("overall_score", heuristic["overall_score"]))
             payload["tone_score"] = self._clamp_score(payload.get("tone_score", heuristic["tone_score"]))
             payload["posture_score"] = self._clamp_score(payload.get("posture_score", visual_scores["posture"]))
@@ -328,10 +513,12 @@ Return ONLY valid JSON in this schema:
             payload.setdefault("improvements", heuristic["improvements"])
             return payload
         except Exception:
+            telemetry.count_fallback("realtime_unparsed")
             return heuristic
 
-    def generate_questions(self, job_role, job_description, n_questions=5):
-        prompt = f"""
+    @staticmethod
+    def _questions_prompt(job_role, job_description, n_questions):
+        return f"""
 You are an encouraging interviewer. Generate {n_questions} professional interview questions
 for this role.
 
@@ -345,12 +532,47 @@ Include:
 - Behavioral questions about teamwork, leadership, problem-solving, ethics.
 - Return as a numbered list only.
 """
-        questions_text = self._generate_text(prompt)
-        questions = [q.strip() for q in questions_text.split("\n") if q.strip() and q[0].isdigit()]
+
+    @staticmethod
+    def _is_question_line(line):
+        return bool(line.strip()) and line[0].isdigit()
+
+    def generate_questions(self, job_role, job_description, n_questions=5, refresh=False):
+        prompt = self._questions_prompt(normalize_text(job_role), normalize_text(job_description), n_questions)
+        questions_text = self._generate_text(prompt, "questions", self.caches["questions"], refresh)
+        questions = [q.strip() for q in questions_text.split("\n") if self._is_question_line(q)]
         return questions[:n_questions]
 
-    def score_answer(self, question, answer):
-        prompt = f"""
+    def stream_questions(self, job_role, job_description, n_questions=5, refresh=False):
+        prompt = self._questions_prompt(normalize_text(job_role), normalize_text(job_description), n_questions)
+        cache = self.caches["questions"]
+        questions = []
+        raw_output = ""
+        buffer = ""
+        tokens = self._stream_text(prompt, "questions", cache, refresh)
+        try:
+            for token in tokens:
+                raw_output += token
+                buffer += token
+                *lines, buffer = buffer.split("\n")
+                for line in lines:
+                    if self._is_question_line(line) and len(questions) < n_questions:
+                        questions.append(line.strip())
+                        yield "question", {"index": len(questions) - 1, "question": line.strip()}
+                if len(questions) >= n_questions:
+                    # The text so far already rebuilds every question, so it is worth caching without the tail.
+                    self._remember_text(cache, prompt, raw_output, "questions")
+                    break
+        finally:
+            tokens.close()
+        if self._is_question_line(buffer) and len(questions) < n_questions:
+            questions.append(buffer.strip())
+            yield "question", {"index": len(questions) - 1, "question": buffer.strip()}
+        yield "done", {"questions": questions}
+
+    @staticmethod
+    def _score_prompt(question, answer):
+        return f"""
 You are an encouraging interviewer, but also practical and have guts to say that the answer is logicless or anything which will help realize the candidate for its mistake.
 
 Question: {question}
@@ -368,11 +590,13 @@ Evaluate and provide:
 Output ONLY JSON in this format:
 {{"score": number, "feedback": ["...", "..."], "improvements": ["...", "..."]}}
 """
-        raw_output = self._generate_text(prompt)
-        match = re.search(r"\{.*\}", raw_output, re.DOTALL)
-        if match:
+
+    @staticmethod
+    def _parse_score_output(raw_output):
+        data, outcome = generation.extract_json_object(raw_output)
+        telemetry.count_parse("score", outcome)
+        if data is not None:
             try:
-                data = json.loads(match.group())
                 data["score"] = max(0, min(10, int(data.get("score", 5))))
                 data.setdefault("feedback", ["Good effort."])
                 data.setdefault("improvements", ["Add clearer examples."])
@@ -386,8 +610,158 @@ Output ONLY JSON in this format:
             "improvements": ["Keep trying! Answer more clearly and provide examples."],
         }
 
+    def _answer_context(self, question, answer, context_window=None):
+        question = normalize_text(question)
+        with telemetry.phase("context"):
+            return question, self._bounded_context("score", normalize_text(answer), context_window, (question,))
 
-simulator = AIInterviewSimulator()
+    @staticmethod
+    def prescore(question, answer):
+        result = prescore(question, answer)
+        prescores.inc(outcome=result["reason"] or "provisional")
+        return result
+
+    def score_answer(self, question, answer, refresh=False, context_window=None):
+        # Empty, gibberish and one-word answers are settled locally; the model only sees real attempts.
+        local = self.prescore(question, answer)
+        if not local["provisional"]:
+            return local
+        prompt = self._score_prompt(*self._answer_context(question, answer, context_window))
+        raw_output = self._generate_text(prompt, "score", self.caches["score"], refresh)
+        with telemetry.phase("postprocess"):
+            return self._parse_score_output(raw_output)
+
+    def stream_score(self, question, answer, refresh=False, context_window=None):
+        local = self.prescore(question, answer)
+        if not local["provisional"]:
+            yield "result", local
+            return
+        # Fail before the first event, so a missing key still maps to a plain HTTP error.
+        self._require_api_key()
+        yield "prescore", local
+        prompt = self._score_prompt(*self._answer_context(question, answer, context_window))
+        cache = self.caches["score"]
+        raw_output = ""
+        score_sent = False
+        extractor = generation.JSONObjectExtractor()
+        tokens = self._stream_text(prompt, "score", cache, refresh)
+        try:
+            for token in tokens:
+                raw_output += token
+                if not score_sent:
+                    # Only trust the number once a delimiter follows it, so "1" is not emitted for "10".
+                    match = SCORE_FIELD_PATTERN.search(raw_output)
+                    if match:
+                        score_sent = True
+                        yield "score", {"score": max(0, min(10, int(float(match.group(1)))))}
+                if extractor.feed(token) is not None:
+                    # The object is closed; whatever the model adds after it is never read.
+                    self._remember_text(cache, prompt, raw_output, "score")
+                    break
+        finally:
+            tokens.close()
+        yield "result", self._parse_score_output(raw_output)
+
+summary_task_executor = ThreadPoolExecutor(
+    max_workers=max(1, env_int("PROMPT_SUMMARY_WORKERS", 1)),
+    thread_name_prefix="prompt-summary",
+)
+prescores = telemetry.registry.register(telemetry.Counter("prescore_total", "Local answer pre-scores by outcome (provisional, or why the model was skipped).", ("outcome",)))
+# One budget per API key for every thread and worker process; waits never outlast the client's deadline.
+rate_limiter = RateLimiter(RATE_LIMIT_PATH, deadline=remaining_seconds, cancelled=cancel_event)
+simulator = AIInterviewSimulator(client=UpstreamClient(rate_limiter=rate_limiter, deadline=remaining_seconds), summary_executor=summary_task_executor)
+settings_store.subscribe(lambda settings: simulator.router.set_default_model(settings.model))
+realtime_sessions = SessionStore()
+SCORE_BATCH_MAX_ITEMS = max(1, env_int("SCORE_BATCH_MAX_ITEMS", 20))
+# Upstream trouble that a local estimate can stand in for on /score; key and request errors still surface.
+DEGRADABLE_SCORE_ERRORS = (DeadlineExceeded, CircuitOpenError, RateLimitedError)
+ai_task_executor = ThreadPoolExecutor(
+    max_workers=max(1, env_int("AI_TASK_WORKERS", 5)),
+    thread_name_prefix="ai-task",
+)
+audio_task_executor = ThreadPoolExecutor(
+    max_workers=max(1, env_int("AUDIO_TASK_WORKERS", 2)),
+    thread_name_prefix="audio-window",
+)
+# Refills bypass the result cache: the same prompt would otherwise hand back questions the bank already holds.
+question_bank = QuestionBank(
+    QUESTION_BANK_PATH,
+    refill=lambda job_role, job_description, count: simulator.generate_questions(job_role, job_description, count, refresh=True),
+)
+
+CIRCUIT_STATE_VALUES = {"closed": 0, "half_open": 1, "open": 2}
+cache_entries = telemetry.registry.register(telemetry.Gauge("result_cache_entries", "Entries held by each result cache.", ("cache",)))
+cache_lookups = telemetry.registry.register(telemetry.Counter("result_cache_lookups_total", "Result cache lookups by outcome.", ("cache", "outcome")))
+audio_trim = telemetry.registry.register(telemetry.Counter("audio_preprocess_total", "WAV preprocessing totals (bytes, seconds, segments).", ("field",)))
+sessions_open = telemetry.registry.register(telemetry.Gauge("realtime_sessions_open", "Realtime sessions held in memory."))
+circuit_state = telemetry.registry.register(telemetry.Gauge("upstream_circuit_state", "Circuit breaker state per host (0 closed, 1 half-open, 2 open).", ("host",)))
+
+
+def collect_component_metrics():
+    for name, cache in simulator.caches.items():
+        stats = cache.stats()
+        cache_entries.set(stats["entries"], cache=name)
+        for outcome in ("hits", "disk_hits", "misses", "coalesced", "evictions"):
+            cache_lookups.set_total(stats[outcome], cache=name, outcome=outcome)
+    for field, value in audio_preprocess.totals().items():
+        audio_trim.set_total(value, field=field)
+    sessions_open.set(len(realtime_sessions))
+    for host, state in simulator.client.breaker_states().items():
+        circuit_state.set(CIRCUIT_STATE_VALUES[state], host=host)
+
+
+telemetry.registry.add_collector(collect_component_metrics)
+
+
+def request_route():
+    return request.url_rule.rule if request.url_rule is not None else "unmatched"
+
+
+@app.before_request
+def start_request_metrics():
+    route = request_route()
+    g.telemetry_route = route
+    g.telemetry_timings, g.telemetry_token = telemetry.start_timings()
+    g.telemetry_profiler = telemetry.start_profile() if telemetry.should_profile(route) else None
+    telemetry.http_in_flight.inc(route=route)
+    deadline_ms = safe_int(request.headers.get("X-Deadline-Ms") or request.args.get("deadline_ms"), DEFAULT_DEADLINE_MS)
+    g.deadline_token = set_deadline(deadline_ms)
+
+
+@app.after_request
+def record_request_metrics(response):
+    route = g.get("telemetry_route")
+    if route is None:
+        return response
+    timings = g.telemetry_timings
+    server_timing = timings.header()
+    profiler = g.pop("telemetry_profiler", None)
+    profile_id = telemetry.finish_profile(profiler, route) if profiler is not None else None
+    if profile_id is not None:
+        server_timing += f', profile;desc="{profile_id}"'
+    response.headers["Server-Timing"] = server_timing
+    response.headers["Timing-Allow-Origin"] = "*"
+
+    telemetry.http_latency.observe(time.perf_counter() - timings.started, route=route, method=request.method)
+    telemetry.http_requests.inc(route=route, method=request.method, status=str(response.status_code))
+    if request.content_length:
+        telemetry.http_request_size.observe(request.content_length, route=route)
+    if not response.is_streamed:
+        telemetry.http_response_size.observe(response.content_length or 0, route=route)
+    return response
+
+
+@app.teardown_request
+def finish_request_metrics(_error=None):
+    route = g.pop("telemetry_route", None)
+    if route is None:
+        return
+    profiler = g.pop("telemetry_profiler", None)
+    if profiler is not None:
+        telemetry.discard_profile(profiler)
+    telemetry.http_in_flight.dec(route=route)
+    telemetry.finish_timings(g.pop("telemetry_token"))
+    reset_deadline(g.pop("deadline_token"))
 
 
 def safe_int(value, default=None):
@@ -399,6 +773,67 @@ def safe_int(value, default=None):
         return default
 
 
+def safe_bool(value, default=None):
+    if value is None:
+        return default
+    if isinstance(value, str):
+        return value.lower() in {"1", "true", "yes"}
+    return bool(value)
+
+
+def parse_payload_fields(fields):
+    data = {key: value for key, value in fields.items() if key != "payload"}
+    try:
+        data.update(json.loads(fields.get("payload") or "{}"))
+    except ValueError:
+        pass
+    return data
+
+
+def read_realtime_request():
+    # Realtime clients can send the camera frame as binary instead of base64-in-JSON:
+    # - raw image/jpeg body, other fields in the query string (or a JSON "payload" query param);
+    # - multipart/form-data with a "frame" file part plus a JSON "payload" field (or plain form fields).
+    # JSON bodies with frame_base64 keep working for older clients.
+    with telemetry.phase("parse"):
+        if request.mimetype.startswith("image/"):
+            if (request.content_length or 0) > FRAME_MAX_BYTES:
+                raise FrameTooLargeError(FRAME_MAX_BYTES)
+            frame = read_frame_stream(request.stream, content_length=request.content_length)
+            return apply_body_deadline(parse_payload_fields(request.args)), frame
+
+        if request.mimetype == "multipart/form-data":
+            frame_file = request.files.get("frame")
+            frame = read_frame_stream(frame_file.stream) if frame_file is not None else None
+            return apply_body_deadline(parse_payload_fields(request.form)), frame
+
+        data = apply_body_deadline(request.json or {})
+    with telemetry.phase("preprocess"):
+        return data, load_frame(data.get("frame_base64", ""))
+
+
+def apply_body_deadline(data):
+    # A "deadline_ms" field in the body overrides the header, for clients that avoid custom headers.
+    if isinstance(data, dict) and data.get("deadline_ms") is not None:
+        set_deadline(safe_int(data.get("deadline_ms"), 0))
+    return data
+
+
+def read_json_body():
+    with telemetry.phase("parse"):
+        return apply_body_deadline(request.json or {})
+
+
+def wants_async_result(data):
+    # "Prefer: respond-async" (or "async": true) returns the local pre-score now and the model verdict later.
+    return "respond-async" in (request.headers.get("Prefer") or "").lower() or safe_bool(data.get("async"), False)
+
+
+def wants_fresh_result():
+    # "Cache-Control: no-cache" skips the result cache lookup; the fresh result still replaces the cached one.
+    return "no-cache" in (request.headers.get("Cache-Control") or "").lower()
+
+
 def is_nvidia_not_found_error(err):
     if not isinstance(err, NvidiaAPIError):
         return False
@@ -424,10 +859,35 @@ def is_nvidia_stt_model_unavailable_error(err):
     return err.status_code in {400, 403, 404} and any(marker in message for marker in unavailable_markers)
 
 
+def is_nvidia_unavailable_error(err):
+    if isinstance(err, CircuitOpenError):
+        return True
+    return isinstance(err, NvidiaAPIError) and err.status_code in {502, 503, 504}
+
+
 def ai_error_response(err):
     if isinstance(err, RuntimeError):
         return jsonify({"error": str(err)}), 400
 
+    if isinstance(err, (FrameTooLargeError, AudioChunkTooLargeError)):
+        return jsonify({"error": str(err)}), 413
+
+    if isinstance(err, RequestEntityTooLarge):
+        return request_too_large(err)
+
+    if isinstance(err, IncompleteBodyError):
+        return jsonify({"error": str(err)}), 400
+
+    if isinstance(err, CircuitOpenError):
+        response = jsonify({"error": f"NVIDIA API error: {err}"})
+        response.headers["Retry-After"] = str(max(1, int(err.retry_in)))
+        return response, 503
+
+    if isinstance(err, RateLimitedError):
+        response = jsonify({"error": f"NVIDIA API error: {err}"})
+        response.headers["Retry-After"] = str(max(1, math.ceil(err.retry_after)))
+        return response, 429
+
     if isinstance(err, NvidiaAPIError):
         if err.status_code == 401:
             return (
@@ -444,54 +904,271 @@ def ai_error_response(err):
 
 
 
+@app.errorhandler(RequestEntityTooLarge)
+def request_too_large(_err):
+    return jsonify({"error": f"Request body exceeds the {round(app.config['MAX_CONTENT_LENGTH'] / (1024 * 1024), 1):g} MB limit."}), 413
+
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    return Response(telemetry.registry.render(), mimetype="text/plain; version=0.0.4")
+
+
+@app.route("/healthz", methods=["GET"])
+def healthz():
+    return jsonify({"status": "ok", "pid": os.getpid()})
+
+
+@app.route("/readyz", methods=["GET"])
+def readyz():
+    start_background_work()
+    report = startup.report()
+    if not report["ready"]:
+        response = jsonify({**report, "status": "warming_up"})
+        response.headers["Retry-After"] = "1"
+        return response, 503
+    return jsonify({**report, "status": "ready"})
+
+
+@app.route("/rate-limit/stats", methods=["GET"])
+def rate_limit_stats():
+    return jsonify({
+        "shared": rate_limiter.shared,
+        "requests_per_minute": {endpoint: round(rate * 60, 2) for endpoint, rate in rate_limiter.rates.items()},
+        "buckets": rate_limiter.snapshot(),
+    })
+
+
+@app.route("/question-bank/stats", methods=["GET"])
+def question_bank_stats():
+    return jsonify({"enabled": QUESTION_BANK_ENABLED, **question_bank.stats()})
+
+
+@app.route("/cache/stats", methods=["GET"])
+def cache_stats():
+    return jsonify({name: cache.stats() for name, cache in simulator.caches.items()})
+
+
 @app.route("/settings/api-key", methods=["GET", "POST"])
 def api_key_settings():
     if request.method == "GET":
-        env_key = (os.getenv("NVIDIA_API_KEY") or "").strip()
-        saved_key = load_saved_api_key()
-        active_key = env_key or saved_key
+        settings = settings_store.current()
         return jsonify(
             {
-                "configured": bool(active_key),
-                "source": "environment" if env_key else ("saved" if saved_key else "none"),
-                "masked_key": mask_api_key(active_key or ""),
+                "configured": bool(settings.api_key),
+                "source": settings.sources["api_key"] if settings.api_key else "none",
+                "masked_key": mask_api_key(settings.api_key or ""),
+                "stt_configured": bool(settings.stt_api_key),
+                "stt_source": settings.sources["stt_api_key"] if settings.stt_api_key else "none",
+                "stt_masked_key": mask_api_key(settings.stt_api_key or ""),
             }
         )
 
-    data = request.json or {}
+    data = read_json_body()
     api_key = (data.get("api_key") or "").strip()
     if not api_key:
         return jsonify({"error": "api_key is required."}), 400
 
-    save_api_key(api_key)
+    updates = {"api_key": api_key}
+    if "stt_api_key" in data:
+        updates["stt_api_key"] = data.get("stt_api_key")
+    try:
+        settings_store.update(**updates)
+    except OSError as err:
+        return jsonify({"error": f"Could not save settings: {err}"}), 500
     return jsonify({"saved": True, "masked_key": mask_api_key(api_key)})
 
 
 @app.route("/generate", methods=["POST"])
 def generate_questions():
-    data = request.json or {}
+    data = read_json_body()
     job_role = data.get("job_role", "")
     job_description = data.get("job_description", "")
 
     try:
-        questions = simulator.generate_questions(job_role, job_description)
-        return jsonify({"questions": questions})
+        return jsonify(generate_with_bank(job_role, job_description, user_id=request_user_id(data), refresh=wants_fresh_result()))
+    except Exception as err:
+        return ai_error_response(err)
+
+
+def request_user_id(data):
+    # Lets the question bank avoid repeating questions to the same person; anonymous callers are not tracked.
+    return (request.headers.get("X-User-Id") or data.get("user_id") or "").strip().lower() or None
+
+
+def banked_questions(job_role, job_description, n_questions, user_id, refresh):
+    if not QUESTION_BANK_ENABLED or refresh:
+        return None
+    return question_bank.take(job_role, job_description, n_questions, user_id)
+
+
+def generate_with_bank(job_role, job_description, n_questions=5, user_id=None, refresh=False):
+    questions = banked_questions(job_role, job_description, n_questions, user_id, refresh)
+    if questions is not None:
+        return {"questions": questions, "source": "bank"}
+    # A returning user who has used up the bank must not get the cached set they were already shown.
+    refresh = refresh or (QUESTION_BANK_ENABLED and question_bank.seen_in_role(job_role, user_id))
+    questions = simulator.generate_questions(job_role, job_description, n_questions, refresh)
+    if QUESTION_BANK_ENABLED:
+        question_bank.add(job_role, job_description, questions, user_id)
+    return {"questions": questions, "source": "model"}
+
+
+def stream_with_bank(job_role, job_description, user_id=None, refresh=False):
+    questions = banked_questions(job_role, job_description, 5, user_id, refresh)
+    if questions is not None:
+        for index, question in enumerate(questions):
+            yield "question", {"index": index, "question": question}
+        yield "done", {"questions": questions, "source": "bank"}
+        return
+
+    refresh = refresh or (QUESTION_BANK_ENABLED and question_bank.seen_in_role(job_role, user_id))
+    events = simulator.stream_questions(job_role, job_description, refresh=refresh)
+    try:
+        for event, payload in events:
+            if event == "done":
+                if QUESTION_BANK_ENABLED:
+                    question_bank.add(job_role, job_description, payload["questions"], user_id)
+                payload = {**payload, "source": "model"}
+            yield event, payload
+    finally:
+        events.close()
+
+
+def score_response(question, answer, data):
+    if wants_async_result(data):
+        local = simulator.prescore(question, answer)
+        if not local["provisional"]:
+            return jsonify(local)
+        try:
+            simulator._require_api_key()
+        except Exception as err:
+            return ai_error_response(err)
+        try:
+            job = job_queue.submit("score", {"question": question, "answer": answer, "refresh": wants_fresh_result()})
+        except QueueFullError as err:
+            return queue_full_response(err)
+        status_url = f"/jobs/{job['id']}"
+        response = jsonify({**local, "refinement": {"id": job["id"], "status_url": status_url}})
+        response.headers["Location"] = status_url
+        return response, 202
+
+    try:
+        return jsonify(simulator.score_answer(question, answer, refresh=wants_fresh_result()))
+    except DEGRADABLE_SCORE_ERRORS as err:
+        return jsonify(provisional_score(question, answer, err, "score_prescore"))
     except Exception as err:
         return ai_error_response(err)
 
 
 @app.route("/score", methods=["POST"])
 def score_answer():
-    data = request.json or {}
-    question = data.get("question", "")
-    answer = data.get("answer", "")
+    data = read_json_body()
+    return score_response(data.get("question", ""), data.get("answer", ""), data)
+
+
+def provisional_score(question, answer, err, kind):
+    # The local pre-score stands in for a model that cannot answer: it reflects the answer, unlike a fixed 5.
+    telemetry.count_fallback(kind)
+    message = f"NVIDIA API error: {err}" if isinstance(err, NvidiaAPIError) else (str(err) or "Unexpected backend error.")
+    return {
+        **prescore(question, answer),
+        "provisional": True,
+        "improvements": ["AI scoring was unavailable; this score only reflects answer length and coverage of the question."],
+        "error": message,
+        "fallback": True,
+    }
+
+
+def score_answer_with_fallback(question, answer, refresh=False):
+    try:
+        return simulator.score_answer(question, answer, refresh=refresh)
+    except Exception as err:
+        return provisional_score(question, answer, err, "score_batch")
+
+
+@app.route("/score/batch", methods=["POST"])
+def score_answer_batch():
+    data = read_json_body()
+    items = data.get("items")
+    if not isinstance(items, list) or not items:
+        return jsonify({"error": "items must be a non-empty list of {question, answer} objects."}), 400
+    if len(items) > SCORE_BATCH_MAX_ITEMS:
+        return jsonify({"error": f"At most {SCORE_BATCH_MAX_ITEMS} items can be scored per batch."}), 400
+
+    try:
+        simulator._require_api_key()
+    except Exception as err:
+        return ai_error_response(err)
+    return jsonify({"results": score_items(items)})
+
+
+def score_items(items):
+    futures = [
+        telemetry.submit(ai_task_executor, score_answer_with_fallback, item.get("question", ""), item.get("answer", ""))
+        if isinstance(item, dict) else None
+        for item in items
+    ]
+    return [
+        future.result() if future is not None else {"error": "Each item must be a {question, answer} object."}
+        for future in futures
+    ]
+
+
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
 
+def sse_response(events):
+    # Pull the first event before responding so key/auth/upstream errors still map to normal HTTP errors.
     try:
-        result = simulator.score_answer(question, answer)
-        return jsonify(result)
+        first = next(events)
+    except StopIteration:
+        first = None
     except Exception as err:
         return ai_error_response(err)
 
+    def generate():
+        try:
+            for event, data in itertools.chain([first] if first else [], events):
+                yield sse_event(event, data)
+        except Exception as err:
+            message = f"NVIDIA API error: {err}" if isinstance(err, NvidiaAPIError) else str(err) or "Unexpected backend error."
+            yield sse_event("error", {"error": message})
+        finally:
+            events.close()
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.route("/generate/stream", methods=["POST"])
+def generate_questions_stream():
+    data = read_json_body()
+    return sse_response(stream_with_bank(
+        data.get("job_role", ""),
+        data.get("job_description", ""),
+        user_id=request_user_id(data),
+        refresh=wants_fresh_result(),
+    ))
+
+
+@app.route("/score/stream", methods=["POST"])
+def score_answer_stream():
+    data = read_json_body()
+    return sse_response(simulator.stream_score(data.get("question", ""), data.get("answer", ""), refresh=wants_fresh_result()))
+
+
+def upload_buffer(stream):
+    # In-memory uploads expose their buffer directly, which saves copying the audio into a new bytes object.
+    if hasattr(stream, "getbuffer"):
+        stream.seek(0)
+        return stream.getbuffer()
+    return stream.read()
+
 
 @app.route("/transcribe-audio", methods=["POST"])
 def transcribe_audio():
@@ -499,9 +1176,24 @@ def transcribe_audio():
     if audio_file is None:
         return jsonify({"error": "Missing audio file in form-data under key 'audio'."}), 400
 
-    audio_bytes = audio_file.read()
-    mime_type = audio_file.mimetype or "audio/webm"
-    filename = audio_file.filename or "audio.webm"
+    try:
+        return jsonify(transcribe_upload(
+            upload_buffer(audio_file.stream),
+            audio_file.filename or "audio.webm",
+            audio_file.mimetype or "audio/webm",
+        ))
+    except Exception as err:
+        return ai_error_response(err)
+
+
+def transcribe_upload(audio_bytes, filename, mime_type):
+    # WAV/PCM segments are trimmed to speech, downmixed and resampled to 16 kHz before any STT call.
+    with telemetry.phase("preprocess"):
+        audio_bytes, mime_type, preprocessing = audio_preprocess.preprocess_audio(audio_bytes, mime_type)
+    if preprocessing is not None:
+        filename = f"{os.path.splitext(filename)[0]}.wav"
+        if preprocessing["silent"]:
+            return {"text": "", "preprocessing": preprocessing}
 
     try:
         transcript = simulator.transcribe_audio(
@@ -509,13 +1201,13 @@ def transcribe_audio():
             filename=filename,
             mime_type=mime_type,
         )
-        return jsonify({"text": transcript})
+        return {"text": transcript, "preprocessing": preprocessing}
     except Exception as err:
         if isinstance(err, NvidiaAPIError) and err.status_code == 401:
-            return jsonify({
+            return {
                 "text": "",
                 "warning": "Whisper authentication failed. Generate a key at https://build.nvidia.com/openai/whisper-large-v3 and set NVIDIA_STT_API_KEY (or NVIDIA_API_KEY).",
-            })
+            }
 
         if is_nvidia_stt_model_unavailable_error(err):
             # Fallback to SpeechRecognition library (WAV input only) when NVIDIA STT is unavailable.
@@ -524,65 +1216,433 @@ def transcribe_audio():
                     audio_bytes=audio_bytes,
                     mime_type=mime_type,
                 )
-                return jsonify({"text": fallback_text, "warning": "Using SpeechRecognition fallback transcription."})
+                telemetry.count_fallback("stt_speech_recognition")
+                return {"text": fallback_text, "warning": "Using SpeechRecognition fallback transcription.", "preprocessing": preprocessing}
             except Exception:
-                return jsonify({
+                return {
                     "text": "",
                     "warning": "Speech transcription model not available for this API key. Use a key from https://build.nvidia.com/openai/whisper-large-v3 and set NVIDIA_STT_API_KEY.",
-                })
+                }
+
+        if is_nvidia_unavailable_error(err):
+            # NVIDIA STT is down or the circuit breaker is open: try the local fallback instead of waiting.
+            try:
+                fallback_text = transcribe_with_speech_recognition(
+                    audio_bytes=audio_bytes,
+                    mime_type=mime_type,
+                )
+                telemetry.count_fallback("stt_speech_recognition")
+                return {"text": fallback_text, "warning": "Using SpeechRecognition fallback transcription.", "preprocessing": preprocessing}
+            except Exception:
+                return {
+                    "text": "",
+                    "warning": "Speech transcription is temporarily unavailable. Keep speaking; the next segment will be retried.",
+                }
+        raise
+
+
+def realtime_score_result(params):
+    params = dict(params)
+    with telemetry.phase("preprocess"):
+        visual_scores, params["lighting_score"], params["face_detected"] = simulator._resolve_visual_inputs(
+            params.pop("frame", None),
+            visual_tracker=params.pop("visual_tracker", None),
+            lighting_score=params.get("lighting_score"),
+            face_detected=params.get("face_detected"),
+        )
+    try:
+        result = simulator.realtime_score(visual_scores=visual_scores, **params)
+    except Exception as err:
+        if not (is_nvidia_not_found_error(err) or is_nvidia_unavailable_error(err)):
+            return None, err
+        # Realtime fallback when selected LLM route/model is unavailable, the circuit breaker is open or the
+        # client deadline cannot be met.
+        telemetry.count_fallback("realtime_deadline" if isinstance(err, DeadlineExceeded) else "realtime_heuristic")
+        result = simulator._heuristic_realtime_score(
+            transcript=params["transcript"],
+            session_seconds=params["session_seconds"],
+            filler_words=params["filler_words"],
+            visual_scores=visual_scores,
+            confidence_signal=params["confidence_signal"],
+            lighting_score=params["lighting_score"],
+            face_detected=params["face_detected"],
+            word_count=params.get("word_count"),
+            speech=params.get("speech"),
+        )
+
+    if visual_scores.get("source") == "server":
+        result["visual_metrics"] = visual_scores
+    if params.get("speech"):
+        result["speech_metrics"] = params["speech"]
+    return result, None
+
+
+def fused_realtime_score(params, question="", answer=""):
+    # Fused mode: score the current answer on a worker while this thread runs the realtime prompt,
+    # so the client gets coaching and answer feedback after roughly one LLM round trip.
+    answer_future = None
+    if question and answer:
+        answer_future = telemetry.submit(ai_task_executor, score_answer_with_fallback, question, answer)
+
+    result, err = realtime_score_result(params)
+    answer_score = answer_future.result() if answer_future is not None else None
+    if err is None and answer_future is not None:
+        result["answer_score"] = answer_score
+    return result, err
+
+
+def run_realtime_score(params, question="", answer=""):
+    result, err = fused_realtime_score(params, question, answer)
+    if err is not None:
         return ai_error_response(err)
+    return jsonify(result)
+
+
+def realtime_params(data, frame):
+    transcript = data.get("transcript", "")
+    session_seconds = max(1, int(data.get("session_seconds", 1)))
+    speech = analyze_transcript(transcript, session_seconds)
+    filler_words = safe_int(data.get("filler_words"), None)
+    return {
+        "role": data.get("role", "Candidate"),
+        "transcript": transcript,
+        "job_description": data.get("job_description", ""),
+        "session_seconds": session_seconds,
+        # A client-sent count still wins; otherwise the server's lexicon count is used.
+        "filler_words": max(0, filler_words) if filler_words is not None else speech["filler_words"],
+        "word_count": speech["word_count"],
+        "speech": speech,
+        "frame": frame,
+        "eye_contact": safe_int(data.get("eye_contact"), None),
+        "posture": safe_int(data.get("posture"), None),
+        "outfit": safe_int(data.get("outfit"), None),
+        "confidence_signal": safe_int(data.get("confidence_signal"), 6),
+        "lighting_score": safe_int(data.get("lighting_score"), None),
+        "face_detected": safe_bool(data.get("face_detected")),
+    }
 
 
 @app.route("/realtime-score", methods=["POST"])
 def realtime_score():
-    data = request.json or {}
+    try:
+        data, frame = read_realtime_request()
+        params = realtime_params(data, frame)
+    except Exception as err:
+        return ai_error_response(err)
+
+    question = (data.get("question") or "").strip()
+    answer = (data.get("answer") or "").strip()
+    return run_realtime_score(params, question=question, answer=answer)
+
+
+def run_generate_job(payload, _body):
+    n_questions = max(1, min(20, safe_int(payload.get("n_questions"), 5)))
+    user_id = (payload.get("user_id") or "").strip().lower() or None
+    return generate_with_bank(payload.get("job_role", ""), payload.get("job_description", ""), n_questions, user_id, bool(payload.get("refresh")))
+
+
+def run_score_job(payload, _body):
+    return simulator.score_answer(payload.get("question", ""), payload.get("answer", ""), bool(payload.get("refresh")))
+
+
+def run_score_batch_job(payload, _body):
+    items = payload.get("items")
+    if not isinstance(items, list) or not items or len(items) > SCORE_BATCH_MAX_ITEMS:
+        raise RuntimeError(f"items must be a list of 1 to {SCORE_BATCH_MAX_ITEMS} {{question, answer}} objects.")
+    simulator._require_api_key()
+    return {"results": score_items(items)}
+
+
+def run_realtime_job(payload, _body):
+    params = realtime_params(payload, load_frame(payload.get("frame_base64", "")))
+    result, err = fused_realtime_score(params, (payload.get("question") or "").strip(), (payload.get("answer") or "").strip())
+    if err is not None:
+        raise err
+    return result
+
+
+def run_transcribe_job(payload, body):
+    if not body:
+        raise RuntimeError("Transcription jobs need an audio upload under form-data key 'audio'.")
+    return transcribe_upload(body, payload.get("filename") or "audio.webm", payload.get("mime_type") or "audio/webm")
+
+
+def job_error(err):
+    # Failed jobs carry the same message and status code the synchronous endpoint would have answered with.
+    with app.app_context():
+        response, status_code = ai_error_response(err)
+        return response.get_json().get("error", str(err)), status_code
+
+
+job_queue = JobQueue(
+    JobStore(JOB_STORE_PATH),
+    {
+        "generate": run_generate_job,
+        "score": run_score_job,
+        "score_batch": run_score_batch_job,
+        "realtime": run_realtime_job,
+        "transcribe": run_transcribe_job,
+    },
+    on_error=job_error,
+)
+
+
+def queue_full_response(err):
+    response = jsonify({"error": str(err)})
+    response.headers["Retry-After"] = "2"
+    return response, 503
+
+
+def job_response(job, status_code=200):
+    response = jsonify({**job, "status_url": f"/jobs/{job['id']}", "events_url": f"/jobs/{job['id']}/events"})
+    return response, status_code
+
+
+@app.route("/jobs", methods=["GET", "POST"])
+def submit_job():
+    if request.method == "GET":
+        return jsonify(job_queue.stats())
+
+    if request.mimetype == "multipart/form-data":
+        audio_file = request.files.get("audio")
+        payload = parse_payload_fields(request.form)
+        body = upload_buffer(audio_file.stream) if audio_file is not None else None
+        if audio_file is not None:
+            payload.setdefault("filename", audio_file.filename or "audio.webm")
+            payload.setdefault("mime_type", audio_file.mimetype or "audio/webm")
+        kind = payload.pop("kind", None) or request.form.get("kind")
+    else:
+        data = read_json_body()
+        kind = data.get("kind")
+        payload = data.get("payload") if isinstance(data.get("payload"), dict) else {}
+        body = None
 
     try:
-        role = data.get("role", "Candidate")
-        transcript = data.get("transcript", "")
-        job_description = data.get("job_description", "")
-        session_seconds = max(1, int(data.get("session_seconds", 1)))
-        filler_words = max(0, int(data.get("filler_words", 0)))
-        frame_base64 = data.get("frame_base64", "")
-        eye_contact = safe_int(data.get("eye_contact"), None)
-        posture = safe_int(data.get("posture"), None)
-        outfit = safe_int(data.get("outfit"), None)
-        confidence_signal = safe_int(data.get("confidence_signal"), 6)
-        lighting_score = safe_int(data.get("lighting_score"), 6)
-        face_detected = data.get("face_detected")
-        if isinstance(face_detected, str):
-            face_detected = face_detected.lower() in {"1", "true", "yes"}
-
-        result = simulator.realtime_score(
-            role=role,
-            job_description=job_description,
-            transcript=transcript,
-            session_seconds=session_seconds,
-            filler_words=filler_words,
-            frame_base64=frame_base64,
-            eye_contact=eye_contact,
-            posture=posture,
-            outfit=outfit,
-            confidence_signal=confidence_signal,
-            lighting_score=lighting_score,
-            face_detected=face_detected,
-        )
-        return jsonify(result)
+        job = job_queue.submit(kind, payload, bytes(body) if body is not None else None)
+    except UnknownJobKindError as err:
+        return jsonify({"error": str(err)}), 400
+    except QueueFullError as err:
+        return queue_full_response(err)
+    response, status_code = job_response(job, 202)
+    response.headers["Location"] = f"/jobs/{job['id']}"
+    return response, status_code
+
+
+@app.route("/jobs/<job_id>", methods=["GET", "DELETE"])
+def job_detail(job_id):
+    if request.method == "DELETE":
+        return jsonify({"cancelled": job_queue.cancel(job_id)})
+
+    job_queue.start()
+    wait_seconds = min(max(0, safe_int(request.args.get("wait_ms"), 0)) / 1000, 15.0)
+    job = job_queue.wait(job_id, wait_seconds) if wait_seconds else job_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown or expired job."}), 404
+    return job_response(job)
+
+
+@app.route("/jobs/<job_id>/events", methods=["GET"])
+def job_events(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown or expired job."}), 404
+    job_queue.start()
+
+    def events():
+        current = job
+        yield "status", {"status": current["status"], "position": current.get("position")}
+        while current is not None and current["status"] not in TERMINAL_STATUSES:
+            previous = current["status"]
+            current = job_queue.wait(job_id, 15.0, statuses=TERMINAL_STATUSES | {"running"} - {previous})
+            if current is None:
+                break
+            if current["status"] == previous:
+                yield "ping", {}
+            else:
+                yield "status", {"status": current["status"], "position": current.get("position")}
+        if current is not None:
+            if current["status"] == "done":
+                yield "result", current["result"]
+            else:
+                yield "error", {"error": current["error"] or current["status"], "status_code": current["status_code"]}
+
+    return sse_response(events())
+
+
+def unknown_session_response():
+    return jsonify({"error": "Unknown or expired realtime session. Create a new one via /realtime/sessions."}), 404
+
+
+def apply_session_update(session, data):
+    if "question" in data:
+        session.set_question(data.get("question"), safe_int(data.get("answer_offset"), None))
+    delta = data.get("transcript_delta") or ""
+    appended = session.append_transcript(delta, safe_int(data.get("offset"), None))
+    metrics = data.get("metrics")
+    session.record_metrics(metrics if isinstance(metrics, dict) else data)
+    return appended
+
+
+@app.route("/realtime/sessions", methods=["POST"])
+def create_realtime_session():
+    data = read_json_body()
+    session = realtime_sessions.create(
+        role=data.get("role", "Candidate"),
+        job_description=data.get("job_description", ""),
+    )
+    apply_session_update(session, data)
+    return jsonify(session.describe()), 201
+
+
+@app.route("/realtime/sessions/<session_id>", methods=["GET", "DELETE"])
+def realtime_session_detail(session_id):
+    if request.method == "DELETE":
+        return jsonify({"deleted": realtime_sessions.delete(session_id)})
+
+    session = realtime_sessions.get(session_id)
+    if session is None:
+        return unknown_session_response()
+    return jsonify(session.describe())
+
+
+@app.route("/realtime/sessions/<session_id>/append", methods=["POST"])
+def append_realtime_session(session_id):
+    session = realtime_sessions.get(session_id)
+    if session is None:
+        return unknown_session_response()
+
+    try:
+        appended = apply_session_update(session, read_json_body())
+    except SessionOffsetError as err:
+        return jsonify({"error": str(err), "transcript_length": err.expected}), 409
+    return jsonify({"appended": appended, **session.describe()})
+
+
+@app.route("/realtime/sessions/<session_id>/evaluate", methods=["POST"])
+def evaluate_realtime_session(session_id):
+    session = realtime_sessions.get(session_id)
+    if session is None:
+        return unknown_session_response()
+
+    try:
+        data, frame = read_realtime_request()
+        apply_session_update(session, data)
+    except SessionOffsetError as err:
+        return jsonify({"error": str(err), "transcript_length": err.expected}), 409
     except Exception as err:
-        if is_nvidia_not_found_error(err):
-            # Realtime fallback when selected LLM route/model is unavailable.
-            heuristic = simulator._heuristic_realtime_score(
-                transcript=transcript,
-                session_seconds=session_seconds,
-                filler_words=filler_words,
-                visual_scores=simulator._estimate_visual_scores(frame_base64),
-                confidence_signal=confidence_signal,
-                lighting_score=lighting_score,
-                face_detected=face_detected,
-            )
-            return jsonify(heuristic)
         return ai_error_response(err)
 
+    fused = safe_bool(data.get("include_answer_score"), False)
+    snapshot = session.snapshot(include_answer=fused)
+    metrics = snapshot["metrics"]
+    session.mark_evaluated()
+    return run_realtime_score({
+        "role": snapshot["role"],
+        "job_description": snapshot["job_description"],
+        "transcript": "",
+        "session_seconds": max(1, safe_int(data.get("session_seconds"), session.session_seconds())),
+        "filler_words": max(0, metrics.get("filler_words", snapshot["speech"]["filler_words"])),
+        "frame": frame,
+        "eye_contact": metrics.get("eye_contact"),
+        "posture": metrics.get("posture"),
+        "outfit": metrics.get("outfit"),
+        "confidence_signal": metrics.get("confidence_signal", 6),
+        "lighting_score": metrics.get("lighting_score"),
+        "face_detected": metrics.get("face_detected"),
+        "word_count": snapshot["word_count"],
+        "speech": snapshot["speech"],
+        "visual_tracker": session.visual_tracker,
+        "session": session,
+    }, question=snapshot["question"] if fused else "", answer=snapshot["answer"] if fused else "")
+
+
+@app.route("/realtime/sessions/<session_id>/score-answer", methods=["POST"])
+def score_realtime_session_answer(session_id):
+    session = realtime_sessions.get(session_id)
+    if session is None:
+        return unknown_session_response()
+
+    data = read_json_body()
+    try:
+        apply_session_update(session, data)
+    except SessionOffsetError as err:
+        return jsonify({"error": str(err), "transcript_length": err.expected}), 409
+
+    snapshot = session.snapshot()
+    if not snapshot["question"] or not snapshot["answer"]:
+        return jsonify({"error": "No answer transcript captured yet for current realtime question."}), 400
+
+    return score_response(snapshot["question"], snapshot["answer"], data)
+
+
+def transcribe_stream_window(audio_parts, mime_type):
+    extension = "m4a" if "mp4" in mime_type else ("wav" if "wav" in mime_type else "webm")
+    return simulator.transcribe_audio(audio_bytes=audio_parts, filename=f"stream-window.{extension}", mime_type=mime_type)
+
+
+@app.route("/realtime/sessions/<session_id>/audio", methods=["POST"])
+def stream_realtime_audio(session_id):
+    session = realtime_sessions.get(session_id)
+    if session is None:
+        return unknown_session_response()
+
+    args = request.args
+    seq = safe_int(args.get("seq"), None)
+    mime_type = request.mimetype if (request.mimetype or "").startswith("audio/") else "audio/webm"
+    stream = session.audio_stream(
+        lambda: AudioStream(transcribe_stream_window, audio_task_executor, mime_type=mime_type),
+        reset=safe_bool(args.get("reset"), False),
+    )
+
+    try:
+        if seq is not None:
+            chunk = read_audio_chunk(request.stream, CHUNK_MAX_BYTES, request.content_length)
+            duration_ms = max(0, safe_int(args.get("duration_ms"), 1000))
+            voiced = safe_bool(args.get("voiced"), True)
+            # Resent chunks and the header chunk carry no new speech time.
+            if stream.append(seq, chunk, duration_ms=duration_ms, voiced=voiced) and seq > 0:
+                session.record_audio(duration_ms / 1000.0, voiced)
+        if safe_bool(args.get("flush"), False):
+            stream.flush()
+    except AudioSequenceError as err:
+        return jsonify({"error": str(err), "next_seq": err.expected}), 409
+    except Exception as err:
+        return ai_error_response(err)
+
+    wait_seconds = min(max(0, safe_int(args.get("wait_ms"), 0)) / 1000, 15.0)
+    if wait_seconds:
+        stream.wait(wait_seconds)
+    return jsonify(stream.describe(max(0, safe_int(args.get("text_offset"), 0))))
+
+
+WARMUP_CONNECTIONS = max(0, env_int("WARMUP_CONNECTIONS", 2))
+WARMUP_COMPLETION = os.getenv("WARMUP_COMPLETION", "0").lower() in {"1", "true", "yes"}
+
+
+def prewarm_upstream():
+    if not WARMUP_CONNECTIONS:
+        return "skipped"
+    simulator.client.prewarm(simulator.base_url, WARMUP_CONNECTIONS)
+    return "ok"
+
+
+def warm_up_model():
+    api_key = get_effective_api_key()
+    if not WARMUP_COMPLETION or not api_key:
+        return "skipped"
+    simulator._complete_with_model(simulator.router.primary("questions"), "Reply with OK.", "warmup", api_key)
+    return "ok"
+
+
+def start_background_work():
+    job_queue.start()
+    startup.warm_up([("upstream", prewarm_upstream), ("completion", warm_up_model)])
+
+
+startup.mark("app")
+
 
 if __name__ == "__main__":
-    app.run(port=5000, debug=True)
+    # Each serving process resumes queued jobs and warms upstream connections at startup,
+    # and lets running jobs finish during the drain.
+    serving.serve(app, on_shutdown=job_queue.stop, on_start=start_background_work)
@@ -0,0 +1,22 @@
+import os
+import sys
+
+
+# Where the backend keeps its files: next to the executable in the frozen desktop build, else next to the sources.
+APP_ROOT = os.path.dirname(sys.executable) if getattr(sys, "frozen", False) else os.path.dirname(os.path.abspath(__file__))
+
+
+# Environment parsing shared by every module; a malformed value falls back to the default instead of failing
+# the import. upstream.py re-exports these, which is where most modules import them from.
+def env_float(name, default):
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def env_int(name, default):
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
@@ -0,0 +1,90 @@
+import base64
+import binascii
+import io
+
+from upstream import env_int
+
+try:
+    from PIL import Image
+except Exception:
+    Image = None
+
+
+FRAME_MAX_BYTES = max(1, env_int("REALTIME_FRAME_MAX_BYTES", 512 * 1024))
+FRAME_MAX_SIDE = max(0, env_int("REALTIME_FRAME_MAX_SIDE", 0))
+
+
+class FrameTooLargeError(Exception):
+    def __init__(self, max_bytes):
+        super().__init__(f"Camera frame exceeds the {max_bytes // 1024} KB limit.")
+        self.max_bytes = max_bytes
+
+
+class IncompleteBodyError(Exception):
+    def __init__(self, expected, received):
+        super().__init__(f"Request body ended after {received} of {expected} bytes.")
+        self.expected = expected
+        self.received = received
+
+
+def read_bounded(stream, max_bytes, content_length=None):
+    # Reads until EOF or max_bytes + 1 (so the caller can tell "too large" apart); one read() may return less
+    # than was sent behind a proxy or with chunked input. A body shorter than its Content-Length is refused
+    # rather than processed truncated.
+    limit = min(content_length, max_bytes + 1) if content_length else max_bytes + 1
+    parts, received = [], 0
+    while received < limit:
+        block = stream.read(limit - received)
+        if not block:
+            break
+        parts.append(block)
+        received += len(block)
+    if content_length and received < limit:
+        raise IncompleteBodyError(content_length, received)
+    return parts[0] if len(parts) == 1 else b"".join(parts)
+
+
+def read_frame_stream(stream, max_bytes=FRAME_MAX_BYTES, content_length=None):
+    # Read straight from the body or multipart part; no base64 text or JSON string in between.
+    data = read_bounded(stream, max_bytes, content_length)
+    if len(data) > max_bytes:
+        raise FrameTooLargeError(max_bytes)
+    return memoryview(data)
+
+
+def decode_base64_frame(frame_base64, max_bytes=FRAME_MAX_BYTES):
+    if not frame_base64:
+        return None
+    encoded = frame_base64.split(",", 1)[1] if "," in frame_base64 else frame_base64
+    if len(encoded) * 3 // 4 > max_bytes:
+        raise FrameTooLargeError(max_bytes)
+    try:
+        return memoryview(base64.b64decode(encoded))
+    except (binascii.Error, ValueError):
+        return None
+
+
+def downscale_frame(frame, max_side=FRAME_MAX_SIDE):
+    if Image is None or not max_side or frame is None:
+        return frame
+    try:
+        image = Image.open(io.BytesIO(frame))
+        if max(image.size) <= max_side:
+            return frame
+        # draft() lets the JPEG decoder skip DCT detail instead of decoding full size and resizing.
+        image.draft("RGB", (max_side, max_side))
+        image = image.convert("RGB")
+        image.thumbnail((max_side, max_side))
+        output = io.BytesIO()
+        image.save(output, format="JPEG", quality=70)
+        return output.getbuffer()
+    except Exception:
+        return frame
+
+
+def load_frame(frame, max_bytes=FRAME_MAX_BYTES, max_side=FRAME_MAX_SIDE):
+    if isinstance(frame, str):
+        frame = decode_base64_frame(frame, max_bytes)
+    if not frame:
+        return None
+    return downscale_frame(frame, max_side)
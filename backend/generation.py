@@ -0,0 +1,176 @@
+import json
+import os
+import re
+import threading
+
+from upstream import NvidiaAPIError, env_float, env_int
+
+
+# How JSON output is constrained upstream: "nvext" (NIM guided_json), "json_schema" / "json_object"
+# (OpenAI-style response_format) or "off" to rely on the prompt alone.
+GUIDED_JSON_MODE = os.getenv("NVIDIA_GUIDED_JSON", "nvext").strip().lower()
+GUIDED_FIELDS = ("nvext", "response_format")
+STRUCTURAL_PATTERN = re.compile(r'[{}"\\]')
+
+SCORE_LIST = {"type": "array", "items": {"type": "string"}, "maxItems": 3}
+SCORE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "score": {"type": "integer", "minimum": 0, "maximum": 10},
+        "feedback": SCORE_LIST,
+        "improvements": SCORE_LIST,
+    },
+    "required": ["score", "feedback", "improvements"],
+}
+REALTIME_SCHEMA = {
+    "type": "object",
+    "properties": {
+        **{field: {"type": "integer", "minimum": 1, "maximum": 10} for field in (
+            "overall_score", "tone_score", "posture_score", "outfit_score", "confidence_score",
+        )},
+        "summary": {"type": "string"},
+        "feedback": SCORE_LIST,
+        "improvements": SCORE_LIST,
+    },
+    "required": ["overall_score", "tone_score", "posture_score", "outfit_score", "confidence_score", "summary", "feedback", "improvements"],
+}
+
+
+def _env_stop(name, default):
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return [part for part in value.split("|") if part] or None
+
+
+class GenerationProfile:
+    def __init__(self, name, max_tokens, temperature, stop=None, schema=None):
+        prefix = f"GEN_{name.upper()}"
+        self.name = name
+        self.max_tokens = env_int(f"{prefix}_MAX_TOKENS", max_tokens)
+        self.temperature = env_float(f"{prefix}_TEMPERATURE", temperature)
+        self.stop = _env_stop(f"{prefix}_STOP", stop)
+        self.schema = schema
+
+    def payload_fields(self, model):
+        fields = {"temperature": self.temperature}
+        if self.max_tokens and self.max_tokens > 0:
+            fields["max_tokens"] = self.max_tokens
+        if self.stop:
+            fields["stop"] = self.stop
+        if self.schema is not None and guided_supported(model):
+            fields.update(guided_fields(self.schema, self.name))
+        return fields
+
+
+PROFILES = {
+    "questions": GenerationProfile("questions", 768, 0.5),
+    "score": GenerationProfile("score", 320, 0.2, schema=SCORE_SCHEMA),
+    "realtime": GenerationProfile("realtime", 360, 0.2, schema=REALTIME_SCHEMA),
+    "summary": GenerationProfile("summary", 320, 0.3),
+    # One-token completion sent at startup so the model is loaded before the first real question.
+    "warmup": GenerationProfile("warmup", 1, 0.0),
+}
+
+_unsupported_models = set()
+_unsupported_lock = threading.Lock()
+
+
+def profile(name):
+    return PROFILES[name]
+
+
+def guided_supported(model):
+    if GUIDED_JSON_MODE not in {"nvext", "json_schema", "json_object"}:
+        return False
+    with _unsupported_lock:
+        return model not in _unsupported_models
+
+
+def guided_fields(schema, name):
+    if GUIDED_JSON_MODE == "nvext":
+        return {"nvext": {"guided_json": schema}}
+    if GUIDED_JSON_MODE == "json_schema":
+        return {"response_format": {"type": "json_schema", "json_schema": {"name": name, "schema": schema}}}
+    return {"response_format": {"type": "json_object"}}
+
+
+def drop_guided(model, payload, err):
+    # A model that rejects the constraint is remembered and the call is retried once without it.
+    if not isinstance(err, NvidiaAPIError) or err.status_code not in (400, 422):
+        return False
+    if not any(field in payload for field in GUIDED_FIELDS):
+        return False
+    with _unsupported_lock:
+        _unsupported_models.add(model)
+    for field in GUIDED_FIELDS:
+        payload.pop(field, None)
+    return True
+
+
+class JSONObjectExtractor:
+    # Incremental scanner for the first complete top-level JSON object in model output. It only looks at
+    # structural characters, tracks strings and escapes across chunk boundaries, and reports the object
+    # as soon as its closing brace arrives, so a streaming caller can stop reading right there.
+    def __init__(self):
+        self.value = None
+        self.rejected = 0
+        self._text = ""
+        self._scan_from = 0
+        self._skip_until = 0
+        self._start = 0
+        self._depth = 0
+        self._in_string = False
+
+    @property
+    def done(self):
+        return self.value is not None
+
+    def feed(self, chunk):
+        if self.value is not None or not chunk:
+            return self.value
+        self._text += chunk
+        for match in STRUCTURAL_PATTERN.finditer(self._text, self._scan_from):
+            index = match.start()
+            if index < self._skip_until:
+                continue
+            char = match.group()
+            if self._in_string:
+                if char == "\\":
+                    self._skip_until = index + 2
+                elif char == '"':
+                    self._in_string = False
+                continue
+            if char == '"':
+                # Quotes in prose before the object are not strings of the object.
+                self._in_string = self._depth > 0
+            elif char == "{":
+                if self._depth == 0:
+                    self._start = index
+                self._depth += 1
+            elif char == "}" and self._depth:
+                self._depth -= 1
+                if self._depth == 0 and self._accept(self._text[self._start:index + 1]):
+                    return self.value
+        self._scan_from = len(self._text)
+        return None
+
+    def _accept(self, candidate):
+        try:
+            value = json.loads(candidate)
+        except ValueError:
+            value = None
+        if isinstance(value, dict):
+            self.value = value
+            return True
+        # Braces in prose ("{score}") or a malformed object; keep scanning for the next one.
+        self.rejected += 1
+        return False
+
+
+def extract_json_object(text):
+    extractor = JSONObjectExtractor()
+    value = extractor.feed(text or "")
+    if value is None:
+        return None, "failed"
+    return value, "ok" if not extractor.rejected else "recovered"
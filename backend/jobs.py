@@ -0,0 +1,316 @@
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+
+import telemetry
+from upstream import env_float, env_int
+
+
+PRIORITIES = {"realtime": 0, "transcribe": 1, "generate": 2, "score": 3, "score_batch": 5}
+TERMINAL_STATUSES = frozenset({"done", "failed", "cancelled"})
+STATUSES = ("queued", "running", "done", "failed", "cancelled")
+HEARTBEAT_SECONDS = max(1.0, env_float("JOB_HEARTBEAT_SECONDS", 5))
+RETENTION_SECONDS = env_float("JOB_RETENTION_SECONDS", 3600)
+MAX_ATTEMPTS = max(1, env_int("JOB_MAX_ATTEMPTS", 3))
+QUEUE_MAX = max(1, env_int("JOB_QUEUE_MAX", 1000))
+POLL_SECONDS = 0.5
+
+job_duration = telemetry.registry.register(telemetry.Histogram("job_duration_seconds", "Time a job spent running, by kind.", ("kind",)))
+job_wait = telemetry.registry.register(telemetry.Histogram("job_queue_wait_seconds", "Time a job spent queued before a worker claimed it, by kind.", ("kind",)))
+job_outcomes = telemetry.registry.register(telemetry.Counter("jobs_total", "Finished jobs by kind and status.", ("kind", "status")))
+job_depth = telemetry.registry.register(telemetry.Gauge("jobs", "Jobs in the store by status.", ("status",)))
+
+
+class QueueFullError(Exception):
+    def __init__(self, limit):
+        super().__init__(f"Job queue is full ({limit} queued jobs). Retry shortly.")
+        self.limit = limit
+
+
+class UnknownJobKindError(ValueError):
+    pass
+
+
+class JobStore:
+    # SQLite is the queue itself: any process sharing the file can claim work, and queued jobs outlive a restart.
+    def __init__(self, path):
+        self.persistent = bool(path)
+        try:
+            if path:
+                directory = os.path.dirname(path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(path or ":memory:", check_same_thread=False, isolation_level=None)
+        except (OSError, sqlite3.Error):
+            # A read-only install directory still gets a working (non-persistent) queue.
+            self.persistent = False
+            self._conn = sqlite3.connect(":memory:", check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "seq INTEGER PRIMARY KEY AUTOINCREMENT, id TEXT UNIQUE, kind TEXT, priority INTEGER, status TEXT, "
+            "payload TEXT, body BLOB, result TEXT, error TEXT, status_code INTEGER, attempts INTEGER DEFAULT 0, "
+            "owner TEXT, created_at REAL, started_at REAL, finished_at REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_queue ON jobs (status, priority, seq)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS job_workers (owner TEXT PRIMARY KEY, seen REAL)")
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _row(row):
+        if row is None:
+            return None
+        job_id, kind, priority, status, result, error, status_code, attempts, created, started, finished = row
+        return {
+            "id": job_id,
+            "kind": kind,
+            "priority": priority,
+            "status": status,
+            "result": json.loads(result) if result is not None else None,
+            "error": error,
+            "status_code": status_code,
+            "attempts": attempts,
+            "created_at": created,
+            "started_at": started,
+            "finished_at": finished,
+        }
+
+    def insert(self, kind, priority, payload, body=None):
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            queued = self._conn.execute("SELECT COUNT(*) FROM jobs WHERE status = 'queued'").fetchone()[0]
+            if queued >= QUEUE_MAX:
+                raise QueueFullError(QUEUE_MAX)
+            self._conn.execute(
+                "INSERT INTO jobs (id, kind, priority, status, payload, body, created_at) VALUES (?, ?, ?, 'queued', ?, ?, ?)",
+                (job_id, kind, priority, json.dumps(payload), body, time.time()),
+            )
+        return job_id
+
+    def claim(self, owner):
+        # BEGIN IMMEDIATE takes the write lock up front, so two processes never claim the same job.
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT id, kind, payload, body, created_at FROM jobs WHERE status = 'queued' ORDER BY priority, seq LIMIT 1"
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        "UPDATE jobs SET status = 'running', owner = ?, started_at = ?, attempts = attempts + 1 WHERE id = ?",
+                        (owner, time.time(), row[0]),
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        if row is None:
+            return None
+        job_id, kind, payload, body, created = row
+        return {"id": job_id, "kind": kind, "payload": json.loads(payload), "body": body, "created_at": created}
+
+    def finish(self, job_id, status, result=None, error=None, status_code=None):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, status_code = ?, finished_at = ?, body = NULL WHERE id = ?",
+                (status, json.dumps(result) if result is not None else None, error, status_code, time.time(), job_id),
+            )
+
+    def get(self, job_id):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, kind, priority, status, result, error, status_code, attempts, created_at, started_at, finished_at "
+                "FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        return self._row(row)
+
+    def position(self, job_id):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) FROM jobs AS ahead, jobs AS job WHERE job.id = ? AND job.status = 'queued' "
+                "AND ahead.status = 'queued' AND (ahead.priority < job.priority OR (ahead.priority = job.priority AND ahead.seq < job.seq))",
+                (job_id,),
+            ).fetchone()
+        return row[0] if row else 0
+
+    def cancel(self, job_id):
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = 'cancelled', finished_at = ?, body = NULL WHERE id = ? AND status = 'queued'",
+                (time.time(), job_id),
+            )
+        return cursor.rowcount == 1
+
+    def maintain(self, owner, now=None):
+        # Heartbeat this process, hand back work held by processes that stopped heartbeating, prune old jobs.
+        now = now or time.time()
+        stale = now - 3 * HEARTBEAT_SECONDS
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO job_workers (owner, seen) VALUES (?, ?)", (owner, now))
+            self._conn.execute("DELETE FROM job_workers WHERE seen < ?", (stale,))
+            orphaned = "status = 'running' AND (owner IS NULL OR owner NOT IN (SELECT owner FROM job_workers))"
+            self._conn.execute(
+                f"UPDATE jobs SET status = 'failed', error = 'Job was interrupted too many times.', status_code = 500, "
+                f"finished_at = ?, body = NULL WHERE {orphaned} AND attempts >= ?",
+                (now, MAX_ATTEMPTS),
+            )
+            requeued = self._conn.execute(f"UPDATE jobs SET status = 'queued', owner = NULL WHERE {orphaned}").rowcount
+            self._conn.execute(
+                "DELETE FROM jobs WHERE status IN ('done', 'failed', 'cancelled') AND finished_at < ?",
+                (now - RETENTION_SECONDS,),
+            )
+        return requeued
+
+    def counts(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+    def remove_worker(self, owner):
+        with self._lock:
+            self._conn.execute("DELETE FROM job_workers WHERE owner = ?", (owner,))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class JobQueue:
+    def __init__(self, store, handlers, workers=None, on_error=None):
+        self.store = store
+        self.handlers = handlers
+        self.workers = max(1, workers or env_int("JOB_WORKERS", 4))
+        self.on_error = on_error
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._threads = []
+        self._running_jobs = 0
+        self._stopping = threading.Event()
+        self._work = threading.Condition()
+        self._changed = threading.Condition()
+        self._started = False
+        self._start_lock = threading.Lock()
+        telemetry.registry.add_collector(self.collect_metrics)
+
+    def start(self):
+        with self._start_lock:
+            if self._started:
+                return
+            self._started = True
+        self.store.maintain(self.owner)
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._work_loop, name=f"job-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        thread = threading.Thread(target=self._maintenance_loop, name="job-maintenance", daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def submit(self, kind, payload, body=None, priority=None):
+        if kind not in self.handlers:
+            raise UnknownJobKindError(f"Unknown job kind '{kind}'. Use one of: {', '.join(sorted(self.handlers))}.")
+        self.start()
+        job_id = self.store.insert(kind, PRIORITIES.get(kind, 3) if priority is None else priority, payload, body)
+        with self._work:
+            self._work.notify()
+        return self.get(job_id)
+
+    def get(self, job_id):
+        job = self.store.get(job_id)
+        if job is not None and job["status"] == "queued":
+            job["position"] = self.store.position(job_id)
+        return job
+
+    def cancel(self, job_id):
+        cancelled = self.store.cancel(job_id)
+        if cancelled:
+            self._notify_changed()
+        return cancelled
+
+    def wait(self, job_id, timeout, statuses=TERMINAL_STATUSES):
+        # Local jobs wake waiters directly; short polls cover jobs finished by another process.
+        deadline = time.monotonic() + max(0.0, timeout)
+        while True:
+            job = self.get(job_id)
+            remaining = deadline - time.monotonic()
+            if job is None or job["status"] in statuses or remaining <= 0:
+                return job
+            with self._changed:
+                self._changed.wait(min(remaining, POLL_SECONDS * 2))
+
+    def _notify_changed(self):
+        with self._changed:
+            self._changed.notify_all()
+
+    def _work_loop(self):
+        while not self._stopping.is_set():
+            job = self.store.claim(self.owner)
+            if job is None:
+                with self._work:
+                    self._work.wait(POLL_SECONDS)
+                continue
+            self._run(job)
+
+    def _run(self, job):
+        with self._work:
+            self._running_jobs += 1
+        self._notify_changed()
+        started = time.time()
+        job_wait.observe(max(0.0, started - job["created_at"]), kind=job["kind"])
+        try:
+            result = self.handlers[job["kind"]](job["payload"], job["body"])
+            self.store.finish(job["id"], "done", result=result, status_code=200)
+            status = "done"
+        except Exception as err:
+            message, status_code = self.on_error(err) if self.on_error else (str(err), 500)
+            self.store.finish(job["id"], "failed", error=message, status_code=status_code)
+            status = "failed"
+        finally:
+            with self._work:
+                self._running_jobs -= 1
+                self._work.notify_all()
+        job_duration.observe(time.time() - started, kind=job["kind"])
+        job_outcomes.inc(kind=job["kind"], status=status)
+        self._notify_changed()
+
+    def _maintenance_loop(self):
+        while not self._stopping.wait(HEARTBEAT_SECONDS):
+            try:
+                if self.store.maintain(self.owner):
+                    with self._work:
+                        self._work.notify_all()
+            except sqlite3.Error:
+                continue
+
+    def stop(self, timeout=None):
+        # Stop claiming new work and wait for jobs already running; queued jobs stay queued for the next start.
+        self._stopping.set()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._work:
+            self._work.notify_all()
+            while self._running_jobs:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    break
+                self._work.wait(remaining)
+        self.store.remove_worker(self.owner)
+        return self._running_jobs == 0
+
+    def stats(self):
+        counts = self.store.counts()
+        return {
+            "persistent": self.store.persistent,
+            "workers": self.workers,
+            "running_here": self._running_jobs,
+            **{status: counts.get(status, 0) for status in STATUSES},
+        }
+
+    def collect_metrics(self):
+        counts = self.store.counts()
+        for status in STATUSES:
+            job_depth.set(counts.get(status, 0), status=status)
@@ -0,0 +1,226 @@
+import contextvars
+import math
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import telemetry
+from serving import MAX_CONCURRENCY
+from upstream import CircuitOpenError, DeadlineExceeded, NvidiaAPIError, RateLimitedError, env_float, env_int
+
+
+TASKS = ("questions", "score", "realtime", "summary")
+LATENCY_WINDOW = max(8, env_int("ROUTER_LATENCY_WINDOW", 64))
+MIN_SAMPLES = max(1, env_int("ROUTER_MIN_SAMPLES", 8))
+HEDGE_DEFAULT_SECONDS = env_float("ROUTER_HEDGE_DELAY_MS", 4000) / 1000
+HEDGE_MIN_SECONDS = env_float("ROUTER_HEDGE_MIN_MS", 250) / 1000
+HEDGE_BUDGET = max(0.0, env_float("ROUTER_HEDGE_BUDGET", 0.1))
+DEFAULT_DEADLINE_MS = max(0, env_int("REQUEST_DEADLINE_MS", 0))
+# Every admitted request may hold one model call, plus the hedges the budget allows on top of that.
+WORKERS = max(0, env_int("ROUTER_WORKERS", 0)) or math.ceil(MAX_CONCURRENCY * (1 + HEDGE_BUDGET))
+RETRYABLE_STATUS = {404, 408, 429, 500, 502, 503, 504}
+
+hedges = telemetry.registry.register(telemetry.Counter("router_hedges_total", "Hedged requests by task and which model answered first.", ("task", "winner")))
+failovers = telemetry.registry.register(telemetry.Counter("router_failovers_total", "Calls moved to the next model after an error.", ("task",)))
+deadline_misses = telemetry.registry.register(telemetry.Counter("router_deadline_exceeded_total", "Calls abandoned because the client deadline could not be met.", ("task",)))
+model_latency = telemetry.registry.register(telemetry.Gauge("router_model_latency_seconds", "Recent latency percentiles per model.", ("model", "quantile")))
+
+
+_deadline = contextvars.ContextVar("request_deadline", default=None)
+_cancelled = contextvars.ContextVar("call_cancelled", default=None)
+
+
+def set_deadline(milliseconds):
+    # Deadlines are relative budgets from the client; zero or less means "no deadline".
+    deadline = time.monotonic() + milliseconds / 1000 if milliseconds and milliseconds > 0 else None
+    return _deadline.set(deadline)
+
+
+def reset_deadline(token):
+    _deadline.reset(token)
+
+
+def remaining_seconds():
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def cancel_event():
+    # Set once the router no longer needs the call running in this thread: another model answered first, the
+    # deadline passed or the caller gave up. None outside router pool workers.
+    return _cancelled.get()
+
+
+def task_models(task, default_model):
+    value = os.getenv(f"NVIDIA_MODELS_{task.upper()}", "")
+    models = [model.strip() for model in value.split(",") if model.strip()]
+    return models or [default_model]
+
+
+def is_retryable(err):
+    # The rate limit belongs to the API key, so another model on the same key would be refused as well; a spent
+    # deadline is spent for every model.
+    if isinstance(err, (RateLimitedError, DeadlineExceeded)):
+        return False
+    if isinstance(err, CircuitOpenError):
+        return True
+    if isinstance(err, NvidiaAPIError):
+        return err.status_code in RETRYABLE_STATUS
+    return isinstance(err, OSError)
+
+
+class LatencyTracker:
+    def __init__(self, size=LATENCY_WINDOW):
+        self._samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, fraction):
+        with self._lock:
+            if len(self._samples) < MIN_SAMPLES:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class ModelRouter:
+    # Ordered models per task. The primary gets the call; if it is still running after its recent p95, a hedge
+    # goes to the next model and the first answer wins. Errors fail over right away, and a client deadline
+    # bounds the whole thing: the caller gets DeadlineExceeded instead of waiting on a slow model.
+    def __init__(self, default_model, max_workers=None):
+        self.models = {task: task_models(task, default_model) for task in TASKS}
+        self.trackers = {}
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers or WORKERS,
+            thread_name_prefix="model-call",
+        )
+        self._calls = 0
+        self._hedged = 0
+        self._lock = threading.Lock()
+        telemetry.registry.add_collector(self.collect_metrics)
+
+    def set_default_model(self, default_model):
+        # Tasks without their own NVIDIA_MODELS_<TASK> list follow the configured model; swapped in one assignment.
+        self.models = {task: task_models(task, default_model) for task in TASKS}
+
+    def primary(self, task):
+        return self.models[task][0]
+
+    def tracker(self, model):
+        with self._lock:
+            tracker = self.trackers.get(model)
+            if tracker is None:
+                tracker = self.trackers[model] = LatencyTracker()
+            return tracker
+
+    def hedge_delay(self, model):
+        p95 = self.tracker(model).percentile(0.95)
+        return HEDGE_DEFAULT_SECONDS if p95 is None else max(HEDGE_MIN_SECONDS, p95)
+
+    def _hedge_allowed(self):
+        # Hedges are capped at a fraction of calls so a slow upstream does not get double the load.
+        with self._lock:
+            if self._hedged >= HEDGE_BUDGET * self._calls + 1:
+                return False
+            self._hedged += 1
+            return True
+
+    def _timed(self, model, fn):
+        started = time.perf_counter()
+        result = fn(model)
+        self.tracker(model).record(time.perf_counter() - started)
+        return result
+
+    def _run(self, model, fn, cancelled):
+        token = _cancelled.set(cancelled)
+        try:
+            return self._timed(model, fn)
+        finally:
+            _cancelled.reset(token)
+
+    def call(self, task, fn):
+        models = list(self.models[task])
+        remaining = remaining_seconds()
+        expected = self.tracker(models[0]).percentile(0.5)
+        if remaining is not None and (remaining <= 0 or (expected is not None and remaining < expected)):
+            deadline_misses.inc(task=task)
+            raise DeadlineExceeded(task)
+        with self._lock:
+            self._calls += 1
+
+        if len(models) == 1:
+            # Nothing to hedge or fail over to: run in the request thread, where the upstream client already
+            # stops its socket timeouts, retries and limiter wait at the deadline.
+            try:
+                return self._timed(models[0], fn)
+            except DeadlineExceeded:
+                deadline_misses.inc(task=task)
+                raise DeadlineExceeded(task) from None
+
+        pending = {}
+        errors = []
+        cancels = []
+
+        def launch():
+            model = models.pop(0)
+            cancels.append(threading.Event())
+            pending[telemetry.submit(self.executor, self._run, model, fn, cancels[-1])] = model
+
+        try:
+            return self._wait(task, models, pending, errors, launch)
+        finally:
+            # Calls still queued on the rate limiter give their token back instead of going out unwanted.
+            for cancelled in cancels:
+                cancelled.set()
+
+    def _wait(self, task, models, pending, errors, launch):
+        launch()
+        hedge_at = time.monotonic() + self.hedge_delay(pending[next(iter(pending))]) if models else None
+        hedged = False
+        while pending:
+            now = time.monotonic()
+            remaining = remaining_seconds()
+            timeouts = [value for value in (remaining, hedge_at - now if hedge_at else None) if value is not None]
+            done, _ = wait(list(pending), timeout=max(0.0, min(timeouts)) if timeouts else None, return_when=FIRST_COMPLETED)
+            for future in done:
+                model = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as err:
+                    errors.append(err)
+                    if models and is_retryable(err):
+                        failovers.inc(task=task)
+                        launch()
+                    continue
+                if hedged:
+                    hedges.inc(task=task, winner="primary" if model == self.primary(task) else "secondary")
+                return result
+            if done:
+                continue
+            if remaining is not None and remaining_seconds() <= 0:
+                # Abandoned calls finish on their own; their latency still feeds the tracker.
+                deadline_misses.inc(task=task)
+                raise DeadlineExceeded(task)
+            if hedge_at is not None and time.monotonic() >= hedge_at:
+                hedge_at = None
+                if models and self._hedge_allowed():
+                    hedged = True
+                    launch()
+        raise errors[-1]
+
+    def candidates(self, task):
+        return list(self.models[task])
+
+    def collect_metrics(self):
+        with self._lock:
+            trackers = dict(self.trackers)
+        for model, tracker in trackers.items():
+            for quantile in (0.5, 0.95):
+                value = tracker.percentile(quantile)
+                if value is not None:
+                    model_latency.set(value, model=model, quantile=str(quantile))
@@ -0,0 +1,162 @@
+import re
+import time
+import unicodedata
+import zlib
+from collections import Counter
+
+from upstream import env_float, env_int
+
+try:
+    import numpy as np
+except Exception:
+    np = None
+
+
+GIBBERISH_RATIO = env_float("PRESCORE_GIBBERISH_RATIO", 0.5)
+FULL_LENGTH_WORDS = max(1, env_int("PRESCORE_FULL_LENGTH_WORDS", 60))
+HASH_DIMENSIONS = 1 << 12
+# Words in any script. Python's \w stops at combining marks (the vowel signs of Devanagari and other Indic
+# scripts), so a word also runs on through non-ASCII characters other than punctuation (general, CJK, danda).
+WORD_PATTERN = re.compile(r"[\w'](?:[\w']|[^\s\x00-\x7f\u0964\u0965\u2000-\u206f\u3000-\u303f])*", re.UNICODE)
+CONSONANT_RUN_PATTERN = re.compile(r"[bcdfghjklmnpqrstvwxz]{5,}")
+REPEAT_PATTERN = re.compile(r"(.)\1{3,}")
+CODE_PATTERN = re.compile(r"[(){}\[\];]|=>|\b(?:def|function|return|for|while|print|console)\b")
+STOPWORDS = frozenset("""
+a about after again all also am an and any are as at be because been before being but by can could did do
+does doing for from had has have having he her here him his how i if in into is it its just me more most my
+no not now of on once only or other our out over own same she should so some such than that the their them
+then there these they this those through to too under until up very was we were what when where which while
+who whom why will with would you your yours describe explain tell give example walk us time talk
+""".split())
+VOWELS = frozenset("aeiouy")
+
+
+def tokenize(text):
+    return WORD_PATTERN.findall((text or "").lower())
+
+
+def _stem(token):
+    # Five-letter prefixes are a crude stem, enough to match "optimize" with "optimization".
+    return token[:5]
+
+
+def keywords(question):
+    return {_stem(token) for token in tokenize(question) if len(token) > 2 and token not in STOPWORDS}
+
+
+def _is_content_char(char):
+    # Letters, digits and combining marks; a number or a Hindi word is content, "!!!" is not.
+    return char.isalnum() or (not char.isascii() and unicodedata.category(char).startswith("M"))
+
+
+def _is_wordlike(token):
+    # Numbers and one- or two-letter tokens (variables, "ok") are never treated as noise.
+    if token.isdigit() or len(token) <= 2:
+        return True
+    if len(token) > 24:
+        return False
+    # The vowel and consonant-run checks only know the Latin alphabet.
+    if not token.isascii():
+        return not REPEAT_PATTERN.search(token)
+    if not VOWELS.intersection(token):
+        return False
+    return not CONSONANT_RUN_PATTERN.search(token) and not REPEAT_PATTERN.search(token)
+
+
+def _hashed_counts(tokens):
+    return Counter(zlib.crc32(token.encode("utf-8")) % HASH_DIMENSIONS for token in tokens)
+
+
+def lexical_overlap(question_tokens, answer_tokens):
+    # Cosine similarity of hashed bag-of-words vectors; vectorized when NumPy is installed.
+    if not question_tokens or not answer_tokens:
+        return 0.0
+    if np is not None:
+        question_ids = np.fromiter((zlib.crc32(token.encode("utf-8")) for token in question_tokens), dtype=np.uint32, count=len(question_tokens))
+        answer_ids = np.fromiter((zlib.crc32(token.encode("utf-8")) for token in answer_tokens), dtype=np.uint32, count=len(answer_tokens))
+        question_vector = np.bincount(question_ids % HASH_DIMENSIONS, minlength=HASH_DIMENSIONS).astype(np.float32)
+        answer_vector = np.bincount(answer_ids % HASH_DIMENSIONS, minlength=HASH_DIMENSIONS).astype(np.float32)
+        denominator = float(np.linalg.norm(question_vector) * np.linalg.norm(answer_vector))
+        return float(question_vector @ answer_vector) / denominator if denominator else 0.0
+
+    question_counts = _hashed_counts(question_tokens)
+    answer_counts = _hashed_counts(answer_tokens)
+    dot = sum(count * answer_counts.get(key, 0) for key, count in question_counts.items())
+    denominator = (sum(value * value for value in question_counts.values()) * sum(value * value for value in answer_counts.values())) ** 0.5
+    return dot / denominator if denominator else 0.0
+
+
+def features(question, answer):
+    answer = answer or ""
+    tokens = tokenize(answer)
+    alpha_tokens = [token for token in tokens if not token.isdigit()]
+    visible = [char for char in answer if not char.isspace()]
+    letters = sum(_is_content_char(char) for char in visible)
+    question_keywords = keywords(question)
+    answer_stems = {_stem(token) for token in tokens}
+    content_tokens = [token for token in tokens if token not in STOPWORDS]
+    return {
+        "words": len(tokens),
+        "characters": len(answer.strip()),
+        "unique_ratio": round(len(set(tokens)) / len(tokens), 3) if tokens else 0.0,
+        "stopword_ratio": round(1 - len(content_tokens) / len(tokens), 3) if tokens else 0.0,
+        "gibberish_ratio": round(sum(not _is_wordlike(token) for token in alpha_tokens) / len(alpha_tokens), 3) if alpha_tokens else 0.0,
+        "letter_ratio": round(letters / len(visible), 3) if visible else 0.0,
+        "keyword_coverage": round(len(question_keywords & answer_stems) / len(question_keywords), 3) if question_keywords else 0.0,
+        "code": bool(CODE_PATTERN.search(answer)),
+        "overlap": round(lexical_overlap([token for token in tokenize(question) if token not in STOPWORDS], content_tokens), 3),
+    }
+
+
+def _trivial_reason(values):
+    if values["words"] == 0:
+        return "gibberish" if values["characters"] else "empty"
+    if values["gibberish_ratio"] >= GIBBERISH_RATIO:
+        return "gibberish"
+    if values["words"] >= 8 and values["unique_ratio"] < 0.2:
+        return "repetitive"
+    # Short, symbol-heavy code ("arr.forEach(console.log)") is a real answer; leave it to the model.
+    if values["code"]:
+        return None
+    # Short answers ("HAVING", "Yes, definitely.") can be exactly right, so they go to the model too.
+    if values["letter_ratio"] < 0.5:
+        return "gibberish"
+    return None
+
+
+TRIVIAL_RESULTS = {
+    "empty": (0, ["No answer was given."], ["Answer the question in a few full sentences."]),
+    "gibberish": (0, ["The answer does not contain readable words."], ["Answer in plain sentences that address the question."]),
+    "repetitive": (0, ["The answer repeats the same words without content."], ["Explain your approach with a concrete example."]),
+}
+
+
+def prescore(question, answer):
+    # Milliseconds-cheap local verdict. Trivial answers get a final score here and never reach the model;
+    # everything else gets a provisional score that the model refines later.
+    started = time.perf_counter()
+    values = features(question, answer)
+    reason = _trivial_reason(values)
+    if reason is not None:
+        score, feedback, improvements = TRIVIAL_RESULTS[reason]
+        provisional = False
+    else:
+        length = min(1.0, values["words"] / FULL_LENGTH_WORDS)
+        quality = 0.45 * length + 0.35 * values["keyword_coverage"] + 0.2 * min(1.0, values["overlap"] * 2)
+        quality *= 1 - values["gibberish_ratio"]
+        # A provisional score never claims the top of the scale; that is the model's call.
+        score = max(1, min(8, round(1 + 7 * quality)))
+        feedback = [f"Provisional score from answer length and coverage of the question ({values['words']} words)."]
+        improvements = ["Detailed feedback follows once the AI review finishes."]
+        provisional = True
+    return {
+        "score": score,
+        "feedback": feedback,
+        "improvements": improvements,
+        "provisional": provisional,
+        "source": "prescore",
+        "reason": reason,
+        "features": values,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 3),
+    }
+
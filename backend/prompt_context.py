@@ -0,0 +1,200 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+
+import telemetry
+from upstream import env_int
+
+
+# No tokenizer ships with the backend; four characters per token is close enough for English prompt budgets.
+CHARS_PER_TOKEN = 4
+ENDPOINT_BUDGETS = {
+    "realtime": max(64, env_int("PROMPT_BUDGET_REALTIME_TOKENS", 768)),
+    "score": max(64, env_int("PROMPT_BUDGET_SCORE_TOKENS", 1536)),
+}
+SUMMARY_TOKENS = max(32, env_int("PROMPT_SUMMARY_TOKENS", 192))
+FOLD_MIN_TOKENS = max(1, env_int("PROMPT_FOLD_MIN_TOKENS", 128))
+MAX_WINDOWS = max(1, env_int("PROMPT_CONTEXT_MAX_WINDOWS", 512))
+OPENING_CHARS = 256
+ANCHOR_CHARS = 48
+SENTENCE_PATTERN = re.compile(r"[^.!?]+[.!?]?")
+
+prompt_tokens = telemetry.registry.register(telemetry.Histogram(
+    "prompt_context_tokens",
+    "Estimated transcript tokens placed in a prompt (summary plus verbatim window).",
+    ("endpoint",),
+    (64, 128, 256, 512, 1024, 2048, 4096, 8192),
+))
+context_folds = telemetry.registry.register(telemetry.Counter(
+    "prompt_context_folds_total",
+    "Background summary updates by outcome (model, extractive, stale).",
+    ("endpoint", "outcome"),
+))
+
+
+def estimate_tokens(text):
+    return -(-len(text or "") // CHARS_PER_TOKEN)
+
+
+def budget_for(endpoint):
+    return ENDPOINT_BUDGETS.get(endpoint, ENDPOINT_BUDGETS["realtime"])
+
+
+def window_start(text, keep_chars):
+    # Start the verbatim window on a word boundary so the model never sees half a word.
+    start = max(0, len(text) - keep_chars)
+    if start == 0:
+        return 0
+    space = text.find(" ", start)
+    return start if space == -1 else space + 1
+
+
+def extractive_summary(previous, text, budget_tokens):
+    # Offline fallback: keep every fourth sentence and let the oldest material fall off the front.
+    sentences = [match.group().strip() for match in SENTENCE_PATTERN.finditer(text)]
+    picked = [sentence for sentence in sentences[::4] if sentence]
+    combined = " ".join(part for part in [previous, *picked] if part)
+    limit = budget_tokens * CHARS_PER_TOKEN
+    if len(combined) <= limit:
+        return combined
+    return combined[window_start(combined, limit):]
+
+
+def render_context(summary, recent, omitted=False):
+    if not summary and not omitted:
+        return recent
+    parts = []
+    if summary:
+        parts.append(f"Summary of earlier answers:\n{summary}")
+    elif omitted:
+        parts.append("(Earlier answers omitted for length.)")
+    parts.append(f"Most recent transcript (verbatim):\n{recent}")
+    return "\n\n".join(parts)
+
+
+class ContextWindow:
+    # Bounded view over an append-only transcript: the newest text stays verbatim and everything before it is
+    # folded into a running summary. Folding runs on an executor, so a request never waits for the summarizer;
+    # until a fold lands, the gap between the summary and the verbatim window is simply left out.
+    def __init__(self, endpoint):
+        self.endpoint = endpoint
+        self.summary = ""
+        self.summarized = 0
+        self._anchor = ""
+        self._generation = 0
+        self._pending = None
+        self._lock = threading.Lock()
+
+    def _matches_locked(self, text):
+        if not self.summarized:
+            return True
+        return len(text) >= self.summarized and text[self.summarized - len(self._anchor):self.summarized] == self._anchor
+
+    def _reset_locked(self):
+        self.summary = ""
+        self.summarized = 0
+        self._anchor = ""
+        self._generation += 1
+        self._pending = None
+
+    def prepare(self, text, summarize, executor, budget_tokens=None):
+        with self._lock:
+            if not self._matches_locked(text):
+                # A different transcript (edited or restarted answer) invalidates the summary.
+                self._reset_locked()
+            context = self._prepare_locked(len(text), lambda start, end: text[start:end], summarize, executor, budget_tokens)
+        prompt_tokens.observe(estimate_tokens(context), endpoint=self.endpoint)
+        return context
+
+    def prepare_range(self, length, read, summarize, executor, budget_tokens=None):
+        # For an append-only transcript that hands out slices (read(start, end)) without joining the whole text,
+        # so the cost per call follows the window and the unsummarized backlog, not the transcript length.
+        with self._lock:
+            context = self._prepare_locked(length, read, summarize, executor, budget_tokens)
+        prompt_tokens.observe(estimate_tokens(context), endpoint=self.endpoint)
+        return context
+
+    def _prepare_locked(self, length, read, summarize, executor, budget_tokens):
+        budget_tokens = budget_tokens or budget_for(self.endpoint)
+        keep_chars = budget_tokens * CHARS_PER_TOKEN
+        if length <= keep_chars and not self.summarized:
+            return read(0, length)
+        start = max(0, length - keep_chars)
+        recent = read(start, length)
+        if start:
+            # Start the verbatim window on a word boundary so the model never sees half a word.
+            space = recent.find(" ")
+            if space != -1:
+                start += space + 1
+                recent = recent[space + 1:]
+        if start < self.summarized:
+            recent = recent[self.summarized - start:]
+            start = self.summarized
+        backlog = start - self.summarized
+        if backlog >= FOLD_MIN_TOKENS * CHARS_PER_TOKEN and self._pending is None and executor is not None:
+            self._schedule_locked(read, start, summarize, executor)
+        return render_context(self.summary, recent, omitted=backlog > 0)
+
+    def _schedule_locked(self, read, end, summarize, executor):
+        previous = self.summary
+        chunk = read(self.summarized, end)
+        anchor = read(max(0, end - ANCHOR_CHARS), end)
+        generation = self._generation
+        self._pending = executor.submit(self._fold, previous, chunk, end, anchor, generation, summarize)
+
+    def _fold(self, previous, chunk, end, anchor, generation, summarize):
+        outcome = "model"
+        try:
+            summary = (summarize(previous, chunk, SUMMARY_TOKENS) or "").strip()
+        except Exception:
+            summary = ""
+        if not summary:
+            outcome = "extractive"
+            summary = extractive_summary(previous, chunk, SUMMARY_TOKENS)
+        with self._lock:
+            if generation != self._generation:
+                outcome = "stale"
+            else:
+                self._pending = None
+                self.summary = summary
+                self.summarized = end
+                self._anchor = anchor
+        context_folds.inc(endpoint=self.endpoint, outcome=outcome)
+
+    def wait(self, timeout=None):
+        with self._lock:
+            pending = self._pending
+        if pending is not None:
+            pending.result(timeout)
+
+
+class ContextStore:
+    # Stateless endpoints resend the whole transcript, so their windows are found again by the text's opening
+    # characters, which stay the same while the transcript grows. The identity (role, job description, question)
+    # is hashed in full: two sessions that only differ after a long shared prefix must not share a summary.
+    def __init__(self, max_windows=None):
+        self.max_windows = max_windows or MAX_WINDOWS
+        self._windows = OrderedDict()
+        self._lock = threading.Lock()
+
+    def window(self, endpoint, identity, text):
+        digest = hashlib.sha256()
+        for part in identity:
+            encoded = str(part).encode("utf-8")
+            digest.update(b"%d:" % len(encoded))
+            digest.update(encoded)
+        key = (endpoint, digest.hexdigest(), text[:OPENING_CHARS])
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None:
+                window = self._windows[key] = ContextWindow(endpoint)
+                while len(self._windows) > self.max_windows:
+                    self._windows.popitem(last=False)
+            else:
+                self._windows.move_to_end(key)
+            return window
+
+    def __len__(self):
+        with self._lock:
+            return len(self._windows)
@@ -0,0 +1,346 @@
+import json
+import os
+import random
+import re
+import struct
+import tempfile
+import threading
+import time
+import zlib
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import telemetry
+from upstream import env_float, env_int
+
+try:
+    import numpy as np
+except Exception:
+    np = None
+
+
+LOW_WATER = max(0, env_int("QUESTION_BANK_LOW_WATER", 20))
+REFILL_BATCH = max(1, env_int("QUESTION_BANK_REFILL_BATCH", 10))
+MAX_PER_ROLE = max(1, env_int("QUESTION_BANK_MAX_PER_ROLE", 200))
+MAX_USERS = max(1, env_int("QUESTION_BANK_MAX_USERS", 10000))
+DUPLICATE_THRESHOLD = env_float("QUESTION_BANK_DUP_THRESHOLD", 0.5)
+REFILL_COOLDOWN_SECONDS = max(0.0, env_float("QUESTION_BANK_REFILL_COOLDOWN", 300))
+
+SIGNATURE_SIZE = 64
+BAND_ROWS = 4
+SHINGLE_WORDS = 3
+HASH_PRIME = 4294967311
+_seeds = random.Random(20240601)
+HASH_A = [_seeds.randrange(1, 1 << 31) for _ in range(SIGNATURE_SIZE)]
+HASH_B = [_seeds.randrange(0, 1 << 32) for _ in range(SIGNATURE_SIZE)]
+
+# File layout: magic, version, question count, signature size, length of the zlib-compressed JSON metadata,
+# then the metadata, then every MinHash signature as little-endian uint32s. Signatures load with a single
+# struct.unpack call, so startup never re-hashes the bank.
+FILE_MAGIC = b"QBNK"
+FILE_VERSION = 1
+FILE_HEADER = struct.Struct("<4sBIHI")
+
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+TAG_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+NUMBERING_PATTERN = re.compile(r"^\s*\d+\s*[.):-]\s*")
+FRONT_BACK_PATTERN = re.compile(r"\b(front|back)[\s-]+end\b")
+SENIORITY = frozenset("senior sr junior jr lead principal staff intern associate entry level mid i ii iii iv".split())
+ROLE_ALIASES = {"swe": "software engineer", "sde": "software engineer", "developer": "engineer", "dev": "engineer", "programmer": "engineer"}
+SKILL_ALIASES = {
+    "js": "javascript", "ts": "typescript", "golang": "go", "k8s": "kubernetes", "postgres": "postgresql",
+    "reactjs": "react", "react.js": "react", "nodejs": "node", "node.js": "node", "vue.js": "vue", "vuejs": "vue",
+    "c++": "cpp", "c#": "csharp", ".net": "dotnet", "ml": "machine learning", "ai": "machine learning",
+    "gcp": "google cloud", "tf": "terraform", "py": "python",
+}
+SKILLS = frozenset("""
+python java javascript typescript go rust cpp csharp dotnet ruby php kotlin swift scala react angular vue node django
+flask spring rails sql postgresql mysql mongodb redis kafka graphql rest html css aws azure docker kubernetes terraform
+linux git pandas spark tableau excel figma selenium
+""".split()) | frozenset({"machine learning", "system design", "data structures", "google cloud", "ci/cd"})
+
+bank_lookups = telemetry.registry.register(telemetry.Counter("question_bank_lookups_total", "Question requests by outcome (hit, miss, bypass).", ("outcome",)))
+bank_refills = telemetry.registry.register(telemetry.Counter("question_bank_refills_total", "Background refills by outcome (ok, exhausted, failed).", ("outcome",)))
+bank_additions = telemetry.registry.register(telemetry.Counter("question_bank_additions_total", "Questions offered to the bank (added, duplicate).", ("outcome",)))
+bank_size = telemetry.registry.register(telemetry.Gauge("question_bank_questions", "Questions held in the bank.", ()))
+
+
+def normalize_role(role):
+    text = FRONT_BACK_PATTERN.sub(r"\1end", (role or "").lower())
+    words = []
+    for word in WORD_PATTERN.findall(text):
+        if word in SENIORITY:
+            continue
+        words.extend(ROLE_ALIASES.get(word, word).split())
+    return " ".join(words)
+
+
+def skill_tags(text):
+    tokens = [token.rstrip(".") for token in TAG_PATTERN.findall(FRONT_BACK_PATTERN.sub(r"\1end", (text or "").lower()))]
+    tokens = [SKILL_ALIASES.get(token, token) for token in tokens if token]
+    bigrams = {f"{first} {second}" for first, second in zip(tokens, tokens[1:])}
+    return frozenset(token for token in tokens if token in SKILLS) | frozenset(bigrams & SKILLS)
+
+
+def strip_numbering(question):
+    return NUMBERING_PATTERN.sub("", question or "").strip()
+
+
+def shingles(text):
+    words = WORD_PATTERN.findall(text.lower())
+    if len(words) <= SHINGLE_WORDS:
+        return {" ".join(words)}
+    return {" ".join(words[index:index + SHINGLE_WORDS]) for index in range(len(words) - SHINGLE_WORDS + 1)}
+
+
+def minhash(text):
+    hashes = [zlib.crc32(shingle.encode("utf-8")) for shingle in shingles(text)]
+    if np is not None:
+        values = np.asarray(hashes, dtype=np.uint64)[:, None]
+        mixed = (values * np.asarray(HASH_A, dtype=np.uint64) + np.asarray(HASH_B, dtype=np.uint64)) % HASH_PRIME
+        return tuple(int(value) & 0xFFFFFFFF for value in mixed.min(axis=0))
+    return tuple(min((value * a + b) % HASH_PRIME for value in hashes) & 0xFFFFFFFF for a, b in zip(HASH_A, HASH_B))
+
+
+def similarity(first, second):
+    # Share of equal MinHash slots: an estimate of the Jaccard similarity of the two shingle sets.
+    return sum(a == b for a, b in zip(first, second)) / SIGNATURE_SIZE
+
+
+class Question:
+    __slots__ = ("id", "text", "role", "tags", "signature", "opener", "created")
+
+    def __init__(self, question_id, text, role, tags, signature, opener=False, created=None):
+        self.id = question_id
+        self.text = text
+        self.role = role
+        self.tags = tags
+        self.signature = signature
+        self.opener = opener
+        self.created = created or time.time()
+
+
+class QuestionBank:
+    # Pre-generated questions per normalized role. A tag -> ids inverted index ranks questions against the
+    # request's skills, MinHash signatures banded for LSH keep near-duplicates out of a role's pool, and each
+    # user's served ids are remembered so nobody sees the same question twice. When a role's pool runs low,
+    # refill(role, job_description, count) runs on a background thread and the new questions are saved.
+    def __init__(self, path, refill=None, executor=None):
+        self.path = path
+        self.refill = refill
+        self.executor = executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix="question-refill")
+        self.questions = {}
+        self.roles = defaultdict(OrderedDict)
+        self.tag_index = defaultdict(set)
+        self.bands = defaultdict(set)
+        self.seen = OrderedDict()
+        self._next_id = 1
+        self._refilling = set()
+        self._refill_after = {}
+        self._save_pending = False
+        self._lock = threading.RLock()
+        self.load()
+        telemetry.registry.add_collector(self.collect_metrics)
+
+    @staticmethod
+    def _band_keys(role, signature):
+        return [(role, band, signature[band * BAND_ROWS:(band + 1) * BAND_ROWS]) for band in range(SIGNATURE_SIZE // BAND_ROWS)]
+
+    def _duplicate_locked(self, role, signature):
+        candidates = set()
+        for key in self._band_keys(role, signature):
+            candidates |= self.bands.get(key, set())
+        for question_id in candidates:
+            if similarity(self.questions[question_id].signature, signature) >= DUPLICATE_THRESHOLD:
+                return question_id
+        return None
+
+    def _insert_locked(self, question):
+        self.questions[question.id] = question
+        self.roles[question.role][question.id] = None
+        for tag in question.tags:
+            self.tag_index[tag].add(question.id)
+        for key in self._band_keys(question.role, question.signature):
+            self.bands[key].add(question.id)
+        self._next_id = max(self._next_id, question.id + 1)
+        pool = self.roles[question.role]
+        while len(pool) > MAX_PER_ROLE:
+            self._remove_locked(next(iter(pool)))
+
+    def _remove_locked(self, question_id):
+        question = self.questions.pop(question_id)
+        self.roles[question.role].pop(question_id, None)
+        for tag in question.tags:
+            self.tag_index[tag].discard(question_id)
+        for key in self._band_keys(question.role, question.signature):
+            self.bands[key].discard(question_id)
+
+    def add(self, job_role, job_description, questions, user_id=None):
+        # Model-generated questions go into the bank; near-duplicates map to the question already held.
+        role = normalize_role(job_role)
+        if not role:
+            return []
+        request_tags = skill_tags(job_description)
+        ids = []
+        with self._lock:
+            for index, raw in enumerate(questions):
+                text = strip_numbering(raw)
+                if not text:
+                    continue
+                signature = minhash(text)
+                duplicate = self._duplicate_locked(role, signature)
+                if duplicate is not None:
+                    bank_additions.inc(outcome="duplicate")
+                    ids.append(duplicate)
+                    continue
+                question = Question(self._next_id, text, role, request_tags | skill_tags(text), signature, opener=index == 0)
+                self._insert_locked(question)
+                bank_additions.inc(outcome="added")
+                ids.append(question.id)
+            if user_id:
+                self._mark_seen_locked(user_id, ids)
+        self._schedule_save()
+        return ids
+
+    def _mark_seen_locked(self, user_id, ids):
+        seen = self.seen.get(user_id)
+        if seen is None:
+            seen = self.seen[user_id] = set()
+            while len(self.seen) > MAX_USERS:
+                self.seen.popitem(last=False)
+        else:
+            self.seen.move_to_end(user_id)
+        seen.update(ids)
+
+    def seen_in_role(self, job_role, user_id):
+        role = normalize_role(job_role)
+        with self._lock:
+            seen = self.seen.get(user_id) if user_id else None
+            return bool(seen) and any(question_id in seen for question_id in self.roles.get(role, ()))
+
+    def take(self, job_role, job_description, count, user_id=None):
+        # Questions for this role the user has not seen, best skill match first (an opening question leads).
+        # Returns None when the pool cannot fill the request, so the caller asks the model instead.
+        role = normalize_role(job_role)
+        if not role:
+            bank_lookups.inc(outcome="bypass")
+            return None
+        request_tags = skill_tags(job_description)
+        with self._lock:
+            seen = self.seen.get(user_id, set()) if user_id else set()
+            eligible = [question_id for question_id in self.roles.get(role, ()) if question_id not in seen]
+            if len(eligible) - count < LOW_WATER:
+                self._schedule_refill(job_role, job_description, role)
+            if len(eligible) < count:
+                bank_lookups.inc(outcome="miss")
+                return None
+            eligible_set = set(eligible)
+            matches = defaultdict(int)
+            for tag in request_tags:
+                for question_id in self.tag_index.get(tag, ()):
+                    if question_id in eligible_set:
+                        matches[question_id] += 1
+            ranked = sorted(eligible, key=lambda question_id: (-matches[question_id], random.random()))[:count]
+            openers = [question_id for question_id in ranked if self.questions[question_id].opener]
+            if openers:
+                ranked.remove(openers[0])
+                ranked.insert(0, openers[0])
+            if user_id:
+                self._mark_seen_locked(user_id, ranked)
+            bank_lookups.inc(outcome="hit")
+            return [f"{position}. {self.questions[question_id].text}" for position, question_id in enumerate(ranked, start=1)]
+
+    def _schedule_refill(self, job_role, job_description, role):
+        if self.refill is None or role in self._refilling or time.monotonic() < self._refill_after.get(role, 0):
+            return
+        self._refilling.add(role)
+        self.executor.submit(self._run_refill, job_role, job_description, role)
+
+    def _run_refill(self, job_role, job_description, role):
+        with self._lock:
+            before = set(self.roles.get(role, ()))
+        try:
+            questions = self.refill(job_role, job_description, REFILL_BATCH)
+            added = set(self.add(job_role, job_description, questions)) - before
+            outcome = "ok" if added else "exhausted"
+        except Exception:
+            outcome = "failed"
+        bank_refills.inc(outcome=outcome)
+        with self._lock:
+            self._refilling.discard(role)
+            if outcome != "ok":
+                # The model keeps producing what the bank already holds (or is failing); stop asking for a while.
+                self._refill_after[role] = time.monotonic() + REFILL_COOLDOWN_SECONDS
+
+    def _schedule_save(self):
+        with self._lock:
+            if self._save_pending or not self.path:
+                return
+            self._save_pending = True
+        self.executor.submit(self.save)
+
+    def save(self):
+        with self._lock:
+            self._save_pending = False
+            questions = list(self.questions.values())
+        roles = sorted({question.role for question in questions})
+        tags = sorted({tag for question in questions for tag in question.tags})
+        role_index = {role: index for index, role in enumerate(roles)}
+        tag_index = {tag: index for index, tag in enumerate(tags)}
+        metadata = zlib.compress(json.dumps({
+            "roles": roles,
+            "tags": tags,
+            "questions": [
+                [question.id, question.text, role_index[question.role], sorted(tag_index[tag] for tag in question.tags), int(question.opener), round(question.created)]
+                for question in questions
+            ],
+        }, separators=(",", ":")).encode("utf-8"))
+        signatures = [value for question in questions for value in question.signature]
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        handle, temp_path = tempfile.mkstemp(dir=directory, prefix=".question_bank.")
+        try:
+            with os.fdopen(handle, "wb") as file_obj:
+                file_obj.write(FILE_HEADER.pack(FILE_MAGIC, FILE_VERSION, len(questions), SIGNATURE_SIZE, len(metadata)))
+                file_obj.write(metadata)
+                file_obj.write(struct.pack(f"<{len(signatures)}I", *signatures))
+            os.replace(temp_path, self.path)
+        except Exception:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+            raise
+
+    def load(self):
+        try:
+            with open(self.path, "rb") as file_obj:
+                data = file_obj.read()
+            magic, version, count, signature_size, metadata_length = FILE_HEADER.unpack_from(data)
+            if magic != FILE_MAGIC or version != FILE_VERSION or signature_size != SIGNATURE_SIZE:
+                return False
+            offset = FILE_HEADER.size
+            metadata = json.loads(zlib.decompress(data[offset:offset + metadata_length]))
+            signatures = struct.unpack_from(f"<{count * SIGNATURE_SIZE}I", data, offset + metadata_length)
+        except (OSError, ValueError, struct.error, zlib.error):
+            # A missing or unreadable bank just means starting empty; it refills from the model.
+            return False
+        roles, tags = metadata["roles"], metadata["tags"]
+        with self._lock:
+            for index, (question_id, text, role, tag_ids, opener, created) in enumerate(metadata["questions"]):
+                signature = signatures[index * SIGNATURE_SIZE:(index + 1) * SIGNATURE_SIZE]
+                self._insert_locked(Question(question_id, text, roles[role], frozenset(tags[tag] for tag in tag_ids), signature, bool(opener), created))
+        return True
+
+    def stats(self):
+        with self._lock:
+            return {
+                "questions": len(self.questions),
+                "roles": {role: len(pool) for role, pool in self.roles.items() if pool},
+                "users": len(self.seen),
+                "refilling": sorted(self._refilling),
+            }
+
+    def collect_metrics(self):
+        with self._lock:
+            bank_size.set(len(self.questions))
@@ -0,0 +1,172 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+import telemetry
+from upstream import RateLimitedError, env_float, env_int
+
+
+# Requests per minute and burst size per API key; a rate of 0 turns limiting off for that endpoint.
+ENDPOINT_RATES = {
+    "chat": max(0.0, env_float("RATE_LIMIT_CHAT_RPM", 40)) / 60,
+    "stt": max(0.0, env_float("RATE_LIMIT_STT_RPM", 40)) / 60,
+}
+ENDPOINT_BURSTS = {
+    "chat": max(1, env_int("RATE_LIMIT_CHAT_BURST", 5)),
+    "stt": max(1, env_int("RATE_LIMIT_STT_BURST", 5)),
+}
+MAX_WAIT_SECONDS = max(0.0, env_float("RATE_LIMIT_MAX_WAIT_MS", 3000) / 1000)
+RECOVERY_SECONDS = max(1.0, env_float("RATE_LIMIT_RECOVERY_SECONDS", 60))
+DEFAULT_PENALTY_SECONDS = 1.0
+MIN_RATE_FRACTION = 0.1
+
+limiter_waits = telemetry.registry.register(telemetry.Histogram(
+    "rate_limit_wait_seconds",
+    "Time upstream calls were held back by the per-key rate limiter.",
+    ("endpoint",),
+    (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+))
+limiter_rejections = telemetry.registry.register(telemetry.Counter(
+    "rate_limit_rejected_total",
+    "Upstream calls refused locally because the key's budget would not free up in time.",
+    ("endpoint",),
+))
+limiter_penalties = telemetry.registry.register(telemetry.Counter(
+    "rate_limit_upstream_429_total",
+    "429 answers from the NVIDIA API that slowed a key's bucket down.",
+    ("endpoint",),
+))
+
+
+class CallCancelled(Exception):
+    # The caller stopped wanting the call while it waited for its token; the token went back to the bucket.
+    def __init__(self, endpoint):
+        super().__init__(f"{endpoint} call cancelled while waiting for the rate limiter.")
+        self.endpoint = endpoint
+
+
+def bucket_key(endpoint, api_key):
+    # Keys are only stored hashed; the endpoint keeps the chat and STT budgets apart even for one shared key.
+    return f"{endpoint}:{hashlib.sha256(api_key.encode('utf-8')).hexdigest()[:24]}"
+
+
+class RateLimiter:
+    # Token bucket per (endpoint, API key), kept in SQLite so every thread and every worker process draws from
+    # the same budget. A caller reserves a token and sleeps until it is due, which queues callers in arrival
+    # order; when the reservation lies beyond the caller's wait limit (or request deadline) it is refused up
+    # front with RateLimitedError instead of being sent to collect a 429. An upstream 429 turns into debt worth
+    # Retry-After seconds and halves the bucket's rate, which then recovers linearly (RATE_LIMIT_RECOVERY_SECONDS
+    # to regain the full configured rate). A waiter whose cancel event is set (the router no longer needs its
+    # call) wakes up and refunds its reservation rather than sending the request anyway.
+    def __init__(self, path, rates=None, bursts=None, max_wait=None, deadline=None, cancelled=None):
+        self.rates = rates or ENDPOINT_RATES
+        self.bursts = bursts or ENDPOINT_BURSTS
+        self.max_wait = MAX_WAIT_SECONDS if max_wait is None else max_wait
+        self.deadline = deadline
+        self.cancelled = cancelled
+        self.shared = bool(path)
+        try:
+            if path:
+                directory = os.path.dirname(path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(path or ":memory:", check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        except (OSError, sqlite3.Error):
+            # Unwritable location: limit within this process only.
+            self.shared = False
+            self._conn = sqlite3.connect(":memory:", check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA synchronous=OFF")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, tokens REAL, rate REAL, updated REAL)")
+        self._lock = threading.Lock()
+
+    def enabled(self, endpoint):
+        return self.rates.get(endpoint, 0) > 0
+
+    def _update(self, key, endpoint, change):
+        # Runs change(tokens, rate, now) -> (tokens, rate, result) on the refilled bucket inside one write
+        # transaction; a change that returns tokens=None leaves the bucket untouched.
+        base_rate = self.rates[endpoint]
+        burst = self.bursts.get(endpoint, 1)
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                row = self._conn.execute("SELECT tokens, rate, updated FROM buckets WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    tokens, rate = float(burst), base_rate
+                else:
+                    tokens, rate, updated = row
+                    elapsed = max(0.0, now - updated)
+                    rate = min(base_rate, rate + base_rate * elapsed / RECOVERY_SECONDS)
+                    tokens = min(float(burst), tokens + elapsed * rate)
+                tokens, rate, result = change(tokens, rate, now)
+                if tokens is not None:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO buckets (key, tokens, rate, updated) VALUES (?, ?, ?, ?)",
+                        (key, tokens, rate, now),
+                    )
+                self._conn.execute("COMMIT")
+                return result
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _wait_limit(self):
+        remaining = self.deadline() if self.deadline is not None else None
+        return self.max_wait if remaining is None else max(0.0, min(self.max_wait, remaining))
+
+    def acquire(self, endpoint, api_key):
+        if not api_key or not self.enabled(endpoint):
+            return 0.0
+        wait_limit = self._wait_limit()
+
+        def reserve(tokens, rate, _now):
+            wait = 0.0 if tokens >= 1 else (1 - tokens) / rate
+            if wait > wait_limit:
+                return None, rate, -wait
+            return tokens - 1, rate, wait
+
+        key = bucket_key(endpoint, api_key)
+        wait = self._update(key, endpoint, reserve)
+        if wait < 0:
+            limiter_rejections.inc(endpoint=endpoint)
+            raise RateLimitedError(endpoint, -wait)
+        limiter_waits.observe(wait, endpoint=endpoint)
+        if wait > 0:
+            cancelled = self.cancelled() if self.cancelled is not None else None
+            if cancelled is None:
+                time.sleep(wait)
+            elif cancelled.wait(wait):
+                self._refund(key, endpoint)
+                raise CallCancelled(endpoint)
+        return wait
+
+    def _refund(self, key, endpoint):
+        burst = float(self.bursts.get(endpoint, 1))
+        self._update(key, endpoint, lambda tokens, rate, _now: (min(burst, tokens + 1), rate, None))
+
+    def penalize(self, endpoint, api_key, retry_after=None):
+        if not api_key or not self.enabled(endpoint):
+            return
+        limiter_penalties.inc(endpoint=endpoint)
+        pause = DEFAULT_PENALTY_SECONDS if retry_after is None else retry_after
+        floor = self.rates[endpoint] * MIN_RATE_FRACTION
+
+        def slow_down(tokens, rate, _now):
+            rate = max(floor, rate / 2)
+            return min(tokens, 0.0) - pause * rate, rate, None
+
+        self._update(bucket_key(endpoint, api_key), endpoint, slow_down)
+
+    def snapshot(self):
+        now = time.time()
+        with self._lock:
+            rows = self._conn.execute("SELECT key, tokens, rate, updated FROM buckets").fetchall()
+        return {
+            key: {"tokens": round(tokens, 2), "rate_per_minute": round(rate * 60, 2), "idle_seconds": round(now - updated, 1)}
+            for key, tokens, rate, updated in rows
+        }
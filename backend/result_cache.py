@@ -0,0 +1,219 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from model_router import DeadlineExceeded, remaining_seconds
+from upstream import env_int
+
+
+DEFAULT_MAX_ENTRIES = max(0, env_int("RESULT_CACHE_MAX_ENTRIES", 512))
+DISK_PATH = os.getenv("RESULT_CACHE_PATH", "")
+DISK_PRUNE_EVERY = 200
+
+
+def normalize_text(value):
+    return " ".join(str(value or "").split())
+
+
+def content_key(*parts):
+    # Length-prefixed parts keep ("ab", "c") and ("a", "bc") apart; audio buffers are hashed without joining them.
+    digest = hashlib.sha256()
+
+    def feed(part):
+        if isinstance(part, (list, tuple)):
+            digest.update(b"L%d:" % len(part))
+            for item in part:
+                feed(item)
+            return
+        if isinstance(part, (bytes, bytearray, memoryview)):
+            view = memoryview(part)
+            digest.update(b"B%d:" % view.nbytes)
+            digest.update(view)
+            return
+        data = (part if isinstance(part, str) else repr(part)).encode("utf-8")
+        digest.update(b"S%d:" % len(data))
+        digest.update(data)
+
+    for part in parts:
+        feed(part)
+    return digest.hexdigest()
+
+
+class DiskTier:
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS results (namespace TEXT, key TEXT, expires_at REAL, value TEXT, PRIMARY KEY (namespace, key))"
+        )
+        self._writes = 0
+        self._lock = threading.Lock()
+
+    def get(self, namespace, key):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM results WHERE namespace = ? AND key = ? AND expires_at > ?",
+                (namespace, key, time.time()),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, namespace, key, value, expires_at):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results (namespace, key, expires_at, value) VALUES (?, ?, ?, ?)",
+                (namespace, key, expires_at, json.dumps(value)),
+            )
+            self._writes += 1
+            if self._writes % DISK_PRUNE_EVERY == 0:
+                self._conn.execute("DELETE FROM results WHERE expires_at <= ?", (time.time(),))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_disk_tier = None
+_disk_lock = threading.Lock()
+
+
+def shared_disk_tier():
+    global _disk_tier
+    if not DISK_PATH:
+        return None
+    with _disk_lock:
+        if _disk_tier is None:
+            _disk_tier = DiskTier(DISK_PATH)
+        return _disk_tier
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+    def wait(self, name):
+        # A follower waits no longer than its own request deadline, however long the leader's call takes.
+        remaining = remaining_seconds()
+        if not self.done.wait(None if remaining is None else max(0.0, remaining)):
+            raise DeadlineExceeded(name)
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+class ResultCache:
+    def __init__(self, name, ttl, max_entries=DEFAULT_MAX_ENTRIES, disk=None):
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.disk = disk
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.ttl > 0 and self.max_entries > 0
+
+    def _store_locked(self, key, value, expires_at):
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key):
+        if not self.enabled:
+            return None
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[key]
+        if self.disk is not None:
+            value = self.disk.get(self.name, key)
+            if value is not None:
+                with self._lock:
+                    self.hits += 1
+                    self.disk_hits += 1
+                    self._store_locked(key, value, now + self.ttl)
+                return value
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key, value):
+        if not self.enabled or value is None or value == "":
+            return
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._store_locked(key, value, expires_at)
+        if self.disk is not None:
+            self.disk.set(self.name, key, value, expires_at)
+
+    def get_or_compute(self, key, compute, refresh=False):
+        if not self.enabled:
+            return compute()
+        if not refresh:
+            value = self.get(key)
+            if value is not None:
+                return value
+
+        # Single flight: concurrent identical requests wait for the first one instead of calling upstream again.
+        with self._lock:
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+            else:
+                self.coalesced += 1
+        if not leader:
+            return flight.wait(self.name)
+
+        try:
+            flight.value = compute()
+            self.set(key, flight.value)
+            return flight.value
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.done.set()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
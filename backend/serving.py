@@ -0,0 +1,266 @@
+import json
+import math
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+from werkzeug.serving import make_server
+from werkzeug.wsgi import ClosingIterator
+
+import telemetry
+from startup import startup
+from upstream import env_float, env_int
+
+
+# "threaded": one process, a thread per connection (default, works everywhere including the PyInstaller build).
+# "processes": a supervisor plus SERVER_WORKERS threaded children sharing one listening socket (POSIX only).
+# "dev": the Flask development server with the reloader and debugger.
+MODES = ("threaded", "processes", "dev")
+SERVER_MODE = os.getenv("SERVER_MODE", "threaded").strip().lower()
+HOST = os.getenv("HOST", "127.0.0.1")
+PORT = env_int("PORT", 5000)
+WORKERS = max(1, env_int("SERVER_WORKERS", min(4, os.cpu_count() or 1)))
+MAX_CONCURRENCY = max(1, env_int("SERVER_MAX_CONCURRENCY", 32))
+QUEUE_MAX = max(0, env_int("SERVER_QUEUE_MAX", 64))
+QUEUE_TIMEOUT_SECONDS = max(0.0, env_float("SERVER_QUEUE_TIMEOUT_MS", 5000) / 1000)
+DRAIN_SECONDS = max(0.0, env_float("SERVER_DRAIN_SECONDS", 20))
+LISTEN_FD_ENV = "SERVER_LISTEN_FD"
+# Probes, scrapes and preflights never wait behind model calls.
+EXEMPT_PATHS = frozenset({"/metrics", "/healthz", "/readyz"})
+
+admission_rejections = telemetry.registry.register(telemetry.Counter(
+    "http_admission_rejected_total",
+    "Requests turned away with 503 by admission control (queue_full, queue_timeout, draining).",
+    ("reason",),
+))
+admission_wait = telemetry.registry.register(telemetry.Histogram(
+    "http_admission_wait_seconds",
+    "Time requests waited for a concurrency slot.",
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+))
+admission_state = telemetry.registry.register(telemetry.Gauge(
+    "http_admission_requests",
+    "Requests holding a concurrency slot (active) or waiting for one (waiting).",
+    ("state",),
+))
+
+
+def log(message):
+    print(f"[serving] {message}", file=sys.stderr, flush=True)
+
+
+class AdmissionControl:
+    # WSGI middleware: at most max_concurrency requests run at once and up to queue_max more wait (no longer than
+    # queue_timeout) for a slot. Everything past that gets 503 with a Retry-After sized from recent service times,
+    # so an overloaded backend answers fast instead of piling up threads. Streamed responses hold their slot until
+    # the body is closed.
+    def __init__(self, app, max_concurrency=None, queue_max=None, queue_timeout=None, exempt=EXEMPT_PATHS):
+        self.app = app
+        self.max_concurrency = max_concurrency or MAX_CONCURRENCY
+        self.queue_max = QUEUE_MAX if queue_max is None else queue_max
+        self.queue_timeout = QUEUE_TIMEOUT_SECONDS if queue_timeout is None else queue_timeout
+        self.exempt = exempt
+        self.active = 0
+        self.waiting = 0
+        self.draining = False
+        self._service_seconds = 1.0
+        self._cond = threading.Condition()
+        telemetry.registry.add_collector(self.collect_metrics)
+
+    def _acquire(self):
+        with self._cond:
+            if self.draining:
+                return "draining"
+            if self.active < self.max_concurrency and not self.waiting:
+                self.active += 1
+                return None
+            if self.waiting >= self.queue_max:
+                return "queue_full"
+            self.waiting += 1
+            deadline = time.monotonic() + self.queue_timeout
+            try:
+                while self.active >= self.max_concurrency and not self.draining:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return "queue_timeout"
+                    self._cond.wait(remaining)
+                if self.draining:
+                    return "draining"
+                self.active += 1
+                return None
+            finally:
+                self.waiting -= 1
+
+    def _release(self, admitted):
+        elapsed = time.monotonic() - admitted
+        with self._cond:
+            self.active -= 1
+            # Exponentially weighted service time, used only to size Retry-After.
+            self._service_seconds += 0.1 * (elapsed - self._service_seconds)
+            self._cond.notify_all()
+
+    def retry_after(self):
+        with self._cond:
+            backlog = self.waiting + self.active
+            return max(1, math.ceil(self._service_seconds * backlog / self.max_concurrency))
+
+    def _reject(self, start_response, reason):
+        admission_rejections.inc(reason=reason)
+        message = "Server is shutting down." if reason == "draining" else "Server is busy; retry shortly."
+        body = json.dumps({"error": message}).encode("utf-8")
+        headers = [
+            ("Content-Type", "application/json"),
+            ("Content-Length", str(len(body))),
+            ("Retry-After", str(self.retry_after())),
+            ("Access-Control-Allow-Origin", "*"),
+        ]
+        if reason == "draining":
+            headers.append(("Connection", "close"))
+        start_response("503 Service Unavailable", headers)
+        return [body]
+
+    def __call__(self, environ, start_response):
+        if environ.get("REQUEST_METHOD") == "OPTIONS" or environ.get("PATH_INFO", "") in self.exempt:
+            return self.app(environ, start_response)
+        started = time.monotonic()
+        rejected = self._acquire()
+        admitted = time.monotonic()
+        admission_wait.observe(admitted - started)
+        if rejected is not None:
+            return self._reject(start_response, rejected)
+        try:
+            body = self.app(environ, start_response)
+        except BaseException:
+            self._release(admitted)
+            raise
+        return ClosingIterator(body, lambda: self._release(admitted))
+
+    def drain(self, timeout):
+        # Refuse new requests and wait for the admitted ones to finish; True when nothing was left running.
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self.draining = True
+            self._cond.notify_all()
+            while self.active:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def collect_metrics(self):
+        with self._cond:
+            admission_state.set(self.active, state="active")
+            admission_state.set(self.waiting, state="waiting")
+
+
+def _shutdown_signals():
+    names = ("SIGTERM", "SIGINT", "SIGBREAK")
+    return [getattr(signal, name) for name in names if hasattr(signal, name)]
+
+
+def _on_shutdown_signal(callback):
+    fired = threading.Event()
+
+    def handler(signum, _frame):
+        if fired.is_set():
+            # Second signal: stop waiting for the drain.
+            raise SystemExit(128 + signum)
+        fired.set()
+        threading.Thread(target=callback, name="server-shutdown", daemon=True).start()
+
+    for signum in _shutdown_signals():
+        signal.signal(signum, handler)
+
+
+def serve_threaded(app, on_shutdown=None):
+    admission = app if isinstance(app, AdmissionControl) else AdmissionControl(app)
+    listen_fd = os.getenv(LISTEN_FD_ENV)
+    server = make_server(HOST, PORT, admission, threaded=True, fd=int(listen_fd) if listen_fd else None)
+
+    def begin_shutdown():
+        admission.drain(0)
+        server.shutdown()
+
+    _on_shutdown_signal(begin_shutdown)
+    startup.mark("listening")
+    log(f"pid {os.getpid()} serving http://{HOST}:{PORT} (max {admission.max_concurrency} concurrent, queue {admission.queue_max})")
+    try:
+        server.serve_forever()
+    finally:
+        # Close the listener first so new connections go to a sibling worker (or are refused) while we drain.
+        server.server_close()
+        started = time.monotonic()
+        drained = admission.drain(DRAIN_SECONDS)
+        if on_shutdown is not None:
+            on_shutdown(max(0.0, DRAIN_SECONDS - (time.monotonic() - started)))
+        log(f"pid {os.getpid()} stopped ({'drained' if drained else f'{admission.active} requests abandoned'})")
+
+
+def _child_command():
+    # A frozen (PyInstaller) build re-runs its own executable; a source checkout re-runs the script.
+    if getattr(sys, "frozen", False):
+        return [sys.executable, *sys.argv[1:]]
+    return [sys.executable, *sys.argv]
+
+
+def serve_processes(workers=None):
+    # Supervisor: bind once, hand the socket to each child, restart children that crash, and forward
+    # shutdown signals so every child drains before the supervisor exits.
+    workers = workers or WORKERS
+    listener = socket.create_server((HOST, PORT), backlog=128)
+    listener.set_inheritable(True)
+    env = {**os.environ, LISTEN_FD_ENV: str(listener.fileno()), "SERVER_MODE": "threaded"}
+    stopping = threading.Event()
+    children = []
+
+    def spawn():
+        return subprocess.Popen(_child_command(), env=env, pass_fds=(listener.fileno(),))
+
+    def begin_shutdown():
+        stopping.set()
+        for child in children:
+            if child.poll() is None:
+                child.terminate()
+
+    _on_shutdown_signal(begin_shutdown)
+    children.extend(spawn() for _ in range(workers))
+    log(f"supervisor {os.getpid()} serving http://{HOST}:{PORT} with {workers} worker processes")
+    try:
+        while not stopping.wait(1.0):
+            for index, child in enumerate(children):
+                if child.poll() is not None and not stopping.is_set():
+                    log(f"worker {child.pid} exited with {child.returncode}; restarting")
+                    children[index] = spawn()
+    finally:
+        listener.close()
+        deadline = time.monotonic() + DRAIN_SECONDS + 5
+        for child in children:
+            try:
+                child.wait(max(0.0, deadline - time.monotonic()))
+            except subprocess.TimeoutExpired:
+                child.kill()
+
+
+def serve(app, on_shutdown=None, on_start=None):
+    mode = SERVER_MODE if SERVER_MODE in MODES else "threaded"
+    if mode == "processes" and (os.name != "posix" or os.getenv(LISTEN_FD_ENV)):
+        if os.name != "posix":
+            log("SERVER_MODE=processes needs POSIX socket inheritance; using threaded mode")
+        mode = "threaded"
+
+    if mode == "dev":
+        # The reloader parent only watches files; workers start in the serving child.
+        if os.environ.get("WERKZEUG_RUN_MAIN") == "true" and on_start is not None:
+            on_start()
+        app.run(host=HOST, port=PORT, debug=True)
+    elif mode == "processes":
+        serve_processes()
+    else:
+        if on_start is not None:
+            on_start()
+        serve_threaded(app, on_shutdown)
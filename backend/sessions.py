@@ -0,0 +1,231 @@
+import bisect
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from prompt_context import ContextWindow
+from speech_analytics import SpeechAnalytics
+from upstream import env_float, env_int
+from vision import VisualTracker
+
+
+METRIC_FIELDS = ("eye_contact", "posture", "outfit", "confidence_signal", "lighting_score", "filler_words")
+
+
+class SessionOffsetError(Exception):
+    def __init__(self, expected, received):
+        super().__init__(f"Transcript delta starts at offset {received}, but the session holds {expected} characters.")
+        self.expected = expected
+        self.received = received
+
+
+def _coerce_int(value):
+    try:
+        if value is None:
+            return None
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _coerce_bool(value):
+    if isinstance(value, str):
+        return value.lower() in {"1", "true", "yes"}
+    if value is None:
+        return None
+    return bool(value)
+
+
+class RealtimeSession:
+    def __init__(self, session_id, role="Candidate", job_description=""):
+        self.id = session_id
+        self.role = role or "Candidate"
+        self.job_description = job_description or ""
+        self.created_at = time.monotonic()
+        self.last_access = self.created_at
+        self.question = ""
+        self.answer_offset = 0
+        self.speech = SpeechAnalytics()
+        self.metrics = {}
+        self.metric_samples = 0
+        self.evaluations = 0
+        self.visual_tracker = VisualTracker()
+        self.context_window = ContextWindow("realtime")
+        self.audio = None
+        # Deltas are kept as received with their start offsets, so any slice is found by bisection instead of
+        # joining the whole transcript; the current answer has its own chunk list starting at answer_offset.
+        self._chunks = []
+        self._starts = []
+        self._answer_chunks = []
+        self._length = 0
+        self._lock = threading.Lock()
+
+    @property
+    def transcript_length(self):
+        return self._length
+
+    def _read_locked(self, start, end):
+        end = min(end, self._length)
+        if start >= end:
+            return ""
+        index = bisect.bisect_right(self._starts, start) - 1
+        parts = []
+        while index < len(self._chunks) and self._starts[index] < end:
+            chunk_start = self._starts[index]
+            parts.append(self._chunks[index][max(0, start - chunk_start):end - chunk_start])
+            index += 1
+        return "".join(parts)
+
+    def read(self, start, end):
+        with self._lock:
+            return self._read_locked(start, end)
+
+    def bounded_transcript(self, summarize, executor):
+        # Prompt context for the session: a verbatim tail plus the rolling summary of everything before it.
+        with self._lock:
+            length = self._length
+        return self.context_window.prepare_range(length, self.read, summarize, executor)
+
+    def _answer_locked(self):
+        if len(self._answer_chunks) > 1:
+            self._answer_chunks = ["".join(self._answer_chunks)]
+        return self._answer_chunks[0].strip() if self._answer_chunks else ""
+
+    def append_transcript(self, delta, offset=None):
+        if not delta:
+            return 0
+        with self._lock:
+            if offset is not None:
+                if offset > self._length:
+                    raise SessionOffsetError(self._length, offset)
+                # Retried uploads resend text the session already has; keep only the unseen tail.
+                overlap = self._length - offset
+                if overlap >= len(delta):
+                    return 0
+                delta = delta[overlap:]
+
+            self._chunks.append(delta)
+            self._starts.append(self._length)
+            self._answer_chunks.append(delta)
+            self._length += len(delta)
+            self.speech.add_text(delta, self.elapsed())
+            return len(delta)
+
+    def record_audio(self, duration, voiced):
+        with self._lock:
+            self.speech.add_audio(duration, voiced)
+
+    def record_metrics(self, sample):
+        with self._lock:
+            updated = False
+            for field in METRIC_FIELDS + ("face_detected",):
+                if field not in sample:
+                    continue
+                value = _coerce_bool(sample[field]) if field == "face_detected" else _coerce_int(sample[field])
+                # An explicit null hands the metric back to server-side estimation.
+                if value is None:
+                    self.metrics.pop(field, None)
+                else:
+                    self.metrics[field] = value
+                updated = True
+            if updated:
+                self.metric_samples += 1
+
+    def audio_stream(self, factory, reset=False):
+        with self._lock:
+            if self.audio is None or reset:
+                self.audio = factory()
+            return self.audio
+
+    def set_question(self, question, answer_offset=None):
+        with self._lock:
+            question = (question or "").strip()
+            previous_offset = self.answer_offset
+            if answer_offset is not None:
+                self.answer_offset = max(0, min(answer_offset, self._length))
+            elif question != self.question:
+                self.answer_offset = self._length
+            self.question = question
+            if self.answer_offset != previous_offset:
+                answer = self._read_locked(self.answer_offset, self._length)
+                self._answer_chunks = [answer] if answer else []
+
+    def mark_evaluated(self):
+        with self._lock:
+            self.evaluations += 1
+
+    def elapsed(self):
+        return time.monotonic() - self.created_at
+
+    def session_seconds(self):
+        return max(1, int(self.elapsed()))
+
+    def snapshot(self, include_answer=True):
+        # The transcript itself is not part of the snapshot; prompts use bounded_transcript().
+        with self._lock:
+            speech = self.speech.snapshot(self.elapsed())
+            return {
+                "role": self.role,
+                "job_description": self.job_description,
+                "word_count": speech["word_count"],
+                "speech": speech,
+                "question": self.question,
+                "answer": self._answer_locked() if include_answer else "",
+                "metrics": dict(self.metrics),
+            }
+
+    def describe(self):
+        with self._lock:
+            speech = self.speech.snapshot(self.elapsed())
+            return {
+                "session_id": self.id,
+                "transcript_length": self._length,
+                "word_count": speech["word_count"],
+                "metric_samples": self.metric_samples,
+                "evaluations": self.evaluations,
+                "question": self.question,
+                "answer_offset": self.answer_offset,
+                "speech_metrics": speech,
+            }
+
+
+class SessionStore:
+    def __init__(self, max_sessions=None, idle_timeout=None):
+        self.max_sessions = max_sessions or max(1, env_int("REALTIME_SESSION_MAX", 256))
+        self.idle_timeout = idle_timeout or max(1.0, env_float("REALTIME_SESSION_IDLE_SECONDS", 1800))
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _evict_locked(self, now):
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            if now - session.last_access < self.idle_timeout and len(self._sessions) <= self.max_sessions:
+                break
+            del self._sessions[session_id]
+
+    def create(self, role="Candidate", job_description=""):
+        session = RealtimeSession(uuid.uuid4().hex, role=role, job_description=job_description)
+        with self._lock:
+            self._sessions[session.id] = session
+            self._evict_locked(session.created_at)
+        return session
+
+    def get(self, session_id):
+        now = time.monotonic()
+        with self._lock:
+            self._evict_locked(now)
+            session = self._sessions.get(session_id)
+            if session is None:
+                return None
+            session.last_access = now
+            self._sessions.move_to_end(session_id)
+            return session
+
+    def delete(self, session_id):
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def __len__(self):
+        with self._lock:
+            return len(self._sessions)
@@ -0,0 +1,170 @@
+import json
+import os
+import tempfile
+import threading
+import time
+
+from upstream import env_float
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+
+CHECK_INTERVAL_SECONDS = max(0.0, env_float("SETTINGS_CHECK_INTERVAL_MS", 1000) / 1000)
+DEFAULT_MODEL = "meta/llama-3.1-8b-instruct"
+DEFAULT_STT_MODEL = "openai/whisper-large-v3"
+DEFAULT_BASE_URL = "https://integrate.api.nvidia.com/v1"
+# Setting -> (key in the settings file, environment variable that overrides it, default).
+FIELDS = {
+    "api_key": ("nvidia_api_key", "NVIDIA_API_KEY", None),
+    "stt_api_key": ("nvidia_stt_api_key", "NVIDIA_STT_API_KEY", None),
+    "model": ("model", "NVIDIA_MODEL", DEFAULT_MODEL),
+    "stt_model": ("stt_model", "NVIDIA_STT_MODEL", DEFAULT_STT_MODEL),
+    "base_url": ("base_url", "NVIDIA_BASE_URL", DEFAULT_BASE_URL),
+}
+
+
+class Settings:
+    # Immutable snapshot of the effective settings; sources maps each field to environment, saved or default.
+    __slots__ = ("api_key", "stt_api_key", "model", "stt_model", "base_url", "saved", "sources")
+
+    def __init__(self, saved):
+        self.saved = saved
+        self.sources = {}
+        for field, (file_key, env_name, default) in FIELDS.items():
+            env_value = (os.getenv(env_name) or "").strip()
+            saved_value = (saved.get(file_key) or "").strip() if isinstance(saved.get(file_key), str) else ""
+            value, source = (env_value, "environment") if env_value else ((saved_value, "saved") if saved_value else (default, "default"))
+            if field == "base_url" and value:
+                value = value.rstrip("/")
+            setattr(self, field, value or None)
+            self.sources[field] = source
+        # The STT key falls back to the chat key, as before.
+        if self.stt_api_key is None and self.api_key is not None:
+            self.stt_api_key = self.api_key
+            self.sources["stt_api_key"] = self.sources["api_key"]
+
+
+def _file_signature(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+
+class _FileLock:
+    # Advisory lock on a sidecar file, so writers in other processes (a second worker, the desktop app) take turns.
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def __enter__(self):
+        self._file = open(self.path, "a+b")
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        elif msvcrt is not None:
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+        return self
+
+    def __exit__(self, *_exc):
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            elif msvcrt is not None:
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            self._file.close()
+
+
+class SettingsStore:
+    # Effective NVIDIA settings held in memory. Readers get the current snapshot without touching the disk; at
+    # most once per SETTINGS_CHECK_INTERVAL_MS one of them stats the file and reloads it if its mtime, size or
+    # inode changed, which is how a key saved by another worker process shows up here. Writes merge into the
+    # file under a lock and replace it atomically (temp file + rename), so readers never see a half-written file.
+    def __init__(self, path, check_interval=None, on_change=None):
+        self.path = path
+        self.check_interval = CHECK_INTERVAL_SECONDS if check_interval is None else check_interval
+        self._listeners = [on_change] if on_change is not None else []
+        self._lock = threading.Lock()
+        self._signature = None
+        self._next_check = 0.0
+        self._settings = Settings({})
+        self.reload(force=True)
+
+    def subscribe(self, callback):
+        self._listeners.append(callback)
+        callback(self._settings)
+
+    def _read_file(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as file_obj:
+                payload = json.load(file_obj)
+            return payload if isinstance(payload, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _publish(self, saved, signature):
+        previous = self._settings
+        self._settings = settings = Settings(saved)
+        self._signature = signature
+        if any(getattr(previous, field) != getattr(settings, field) for field in FIELDS):
+            for callback in self._listeners:
+                callback(settings)
+
+    def reload(self, force=False):
+        with self._lock:
+            self._next_check = time.monotonic() + self.check_interval
+            signature = _file_signature(self.path)
+            if force or signature != self._signature:
+                self._publish(self._read_file(), signature)
+            return self._settings
+
+    def current(self):
+        if time.monotonic() < self._next_check:
+            return self._settings
+        return self.reload()
+
+    def update(self, **values):
+        # values: setting name -> new value; None or "" removes the saved value.
+        unknown = set(values) - set(FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown settings: {', '.join(sorted(unknown))}")
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        with self._lock, _FileLock(f"{self.path}.lock"):
+            # Re-read under the lock so fields saved by another process in the meantime are kept.
+            saved = self._read_file()
+            for field, value in values.items():
+                value = (value or "").strip()
+                if value:
+                    saved[FIELDS[field][0]] = value
+                else:
+                    saved.pop(FIELDS[field][0], None)
+            handle, temp_path = tempfile.mkstemp(dir=directory, prefix=".nvidia_settings.")
+            try:
+                with os.fdopen(handle, "w", encoding="utf-8") as file_obj:
+                    json.dump(saved, file_obj)
+                    file_obj.flush()
+                    os.fsync(file_obj.fileno())
+                # The file holds credentials; keep it private to the user (a no-op on Windows).
+                os.chmod(temp_path, 0o600)
+                os.replace(temp_path, self.path)
+            except Exception:
+                try:
+                    os.unlink(temp_path)
+                except OSError:
+                    pass
+                raise
+            self._next_check = time.monotonic() + self.check_interval
+            self._publish(saved, _file_signature(self.path))
+            return self._settings
@@ -0,0 +1,184 @@
+import os
+import re
+
+from upstream import env_float, env_int
+
+
+DEFAULT_FILLER_WORDS = "um,uh,like,you know,actually,basically,literally"
+FILLER_WORDS = tuple(
+    phrase for phrase in (" ".join(item.lower().split()) for item in os.getenv("SPEECH_FILLER_WORDS", DEFAULT_FILLER_WORDS).split(",")) if phrase
+)
+WPM_WINDOW_SECONDS = max(5, env_int("SPEECH_WPM_WINDOW_SECONDS", 60))
+# Below both of these a pace is mostly noise (five words in two seconds reads as 150 WPM), so none is reported.
+WPM_MIN_SECONDS = max(0.0, env_float("SPEECH_WPM_MIN_SECONDS", 10))
+WPM_MIN_WORDS = max(1, env_int("SPEECH_WPM_MIN_WORDS", 25))
+PAUSE_MIN_SECONDS = max(0.0, env_float("SPEECH_PAUSE_MIN_MS", 1000) / 1000)
+LONG_PAUSE_SECONDS = max(PAUSE_MIN_SECONDS, env_float("SPEECH_LONG_PAUSE_MS", 3000) / 1000)
+# A "word" longer than this without a break is committed instead of waiting for the next delta.
+MAX_CARRY_CHARS = 64
+WORD_PATTERN = re.compile(r"\w+")
+_END = object()
+
+
+def pace_wpm(words, seconds):
+    if seconds is None or (seconds < WPM_MIN_SECONDS and words < WPM_MIN_WORDS):
+        return None
+    return words * 60 / max(1.0, seconds)
+
+
+def build_lexicon(phrases):
+    # Token trie: each filler phrase is a path of lowercase words ending in an _END marker holding the phrase.
+    root = {}
+    for phrase in phrases:
+        node = root
+        for token in WORD_PATTERN.findall(phrase.lower()):
+            node = node.setdefault(token, {})
+        if node is not root:
+            node[_END] = phrase
+    return root
+
+
+DEFAULT_LEXICON = build_lexicon(FILLER_WORDS)
+
+
+class SpeechAnalytics:
+    # Delivery metrics for one realtime session, updated from transcript deltas and audio chunks as they arrive.
+    # Each delta is tokenized once and fed word by word through a token trie, so single- and multi-word fillers
+    # are matched in the same pass and a phrase split across deltas ("you" + " know") still counts. A word cut
+    # in half at the end of a delta is held back until the next delta shows whether it continues. Words per
+    # second land in a fixed ring of one-second buckets for the rolling WPM; pauses and speaking time come from
+    # the voiced flag on audio chunks. Memory stays fixed per session whatever the transcript length.
+    def __init__(self, lexicon=None, window_seconds=None):
+        self.lexicon = DEFAULT_LEXICON if lexicon is None else lexicon
+        self.window_seconds = window_seconds or WPM_WINDOW_SECONDS
+        self.word_count = 0
+        self.filler_count = 0
+        self.filler_counts = {}
+        self.last_word_at = None
+        self._partial = []
+        self._carry = ""
+        self._bucket_words = [0] * self.window_seconds
+        self._bucket_second = [-1] * self.window_seconds
+        self._timed = False
+        self.audio_seconds = 0.0
+        self.voiced_seconds = 0.0
+        self.pause_count = 0
+        self.long_pause_count = 0
+        self.pause_seconds = 0.0
+        self.longest_pause = 0.0
+        self._silence = 0.0
+
+    def _advance(self, states, token):
+        # One step of the matcher; returns the partial matches still alive and the phrases completed by token.
+        alive, matched = [], []
+        for node in states + [self.lexicon]:
+            child = node.get(token)
+            if child is None:
+                continue
+            phrase = child.get(_END)
+            if phrase is not None:
+                matched.append(phrase)
+            if len(child) > (phrase is not None):
+                alive.append(child)
+        return alive, matched
+
+    def _commit(self, token):
+        self.word_count += 1
+        self._partial, matched = self._advance(self._partial, token.lower())
+        for phrase in matched:
+            self.filler_count += 1
+            self.filler_counts[phrase] = self.filler_counts.get(phrase, 0) + 1
+
+    def _record_words(self, words, at):
+        second = int(at)
+        index = second % self.window_seconds
+        if self._bucket_second[index] != second:
+            self._bucket_second[index] = second
+            self._bucket_words[index] = 0
+        self._bucket_words[index] += words
+        self._timed = True
+        self.last_word_at = at
+
+    def add_text(self, delta, at=None):
+        # at: seconds on the session clock when the delta arrived; None keeps the words out of the rolling WPM.
+        if not delta:
+            return 0
+        text = self._carry + delta
+        self._carry = ""
+        before = self.word_count
+        for match in WORD_PATTERN.finditer(text):
+            if match.end() == len(text) and len(match.group()) < MAX_CARRY_CHARS:
+                self._carry = match.group()
+                break
+            self._commit(match.group())
+        added = self.word_count - before
+        if added and at is not None:
+            self._record_words(added, at)
+        return added
+
+    def add_audio(self, duration, voiced):
+        duration = max(0.0, duration)
+        self.audio_seconds += duration
+        if not voiced:
+            self._silence += duration
+            return
+        # A silence only counts as a pause once speech resumes; trailing silence is reported as current_silence.
+        if self._silence >= PAUSE_MIN_SECONDS:
+            self.pause_count += 1
+            self.pause_seconds += self._silence
+            self.longest_pause = max(self.longest_pause, self._silence)
+            if self._silence >= LONG_PAUSE_SECONDS:
+                self.long_pause_count += 1
+        self._silence = 0.0
+        self.voiced_seconds += duration
+
+    def _pending(self):
+        # The held-back word is counted (and matched against a copy of the matcher state) but not committed.
+        if not self._carry:
+            return 0, []
+        return 1, self._advance(self._partial, self._carry.lower())[1]
+
+    def rolling_wpm(self, now):
+        second = int(now)
+        words = sum(
+            count for count, stamp in zip(self._bucket_words, self._bucket_second)
+            if stamp >= 0 and second - stamp < self.window_seconds
+        )
+        return pace_wpm(words, min(float(self.window_seconds), now))
+
+    def snapshot(self, now=None):
+        pending_words, pending_fillers = self._pending()
+        words = self.word_count + pending_words
+        filler_counts = dict(self.filler_counts)
+        for phrase in pending_fillers:
+            filler_counts[phrase] = filler_counts.get(phrase, 0) + 1
+        fillers = self.filler_count + len(pending_fillers)
+        average_wpm = pace_wpm(words, now)
+        wpm = self.rolling_wpm(now) if now is not None and self._timed else average_wpm
+        return {
+            "word_count": words,
+            "filler_words": fillers,
+            "filler_counts": filler_counts,
+            "filler_rate": round(fillers / max(words, 1), 4),
+            "wpm": None if wpm is None else round(wpm, 1),
+            "average_wpm": None if average_wpm is None else round(average_wpm, 1),
+            "wpm_window_seconds": self.window_seconds,
+            "audio_seconds": round(self.audio_seconds, 2),
+            "speaking_ratio": round(self.voiced_seconds / self.audio_seconds, 3) if self.audio_seconds else None,
+            "pauses": {
+                "count": self.pause_count,
+                "long": self.long_pause_count,
+                "total_seconds": round(self.pause_seconds, 2),
+                "longest_seconds": round(self.longest_pause, 2),
+                "average_seconds": round(self.pause_seconds / self.pause_count, 2) if self.pause_count else 0.0,
+                "current_silence_seconds": round(self._silence, 2),
+            },
+        }
+
+
+def analyze_transcript(text, session_seconds=None):
+    # One pass over a whole transcript, for the stateless /realtime-score route.
+    analytics = SpeechAnalytics()
+    analytics.add_text(text or "")
+    analytics.add_text(" ")
+    return analytics.snapshot(session_seconds)
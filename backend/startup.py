@@ -0,0 +1,107 @@
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import telemetry
+from upstream import env_float
+
+
+# Imported first by backend.py, so this clock starts before Flask, NumPy and the rest are loaded.
+IMPORT_STARTED = time.perf_counter()
+IMPORT_STARTED_WALL = time.time()
+WARMUP_TIMEOUT_SECONDS = max(0.0, env_float("WARMUP_TIMEOUT_MS", 10000) / 1000)
+REPORT_ENABLED = os.getenv("STARTUP_REPORT", "1").lower() not in {"0", "false", "no"}
+
+startup_phases = telemetry.registry.register(telemetry.Gauge(
+    "startup_phase_seconds",
+    "Seconds from the start of the backend import until each startup phase finished.",
+    ("phase",),
+))
+
+
+def launcher_delay():
+    # The desktop launcher passes its spawn time (epoch ms). The gap covers interpreter start and,
+    # for the one-file Windows build, unpacking the bundle.
+    try:
+        launched_ms = float(os.environ["BACKEND_LAUNCHED_AT"])
+    except (KeyError, ValueError):
+        return None
+    return round(max(0.0, IMPORT_STARTED_WALL - launched_ms / 1000), 3)
+
+
+class Startup:
+    # Ordered startup timeline plus the warm-up steps that gate readiness. Warm-up runs once on a background
+    # thread; readiness turns true when every step has finished (passed or failed) or WARMUP_TIMEOUT_MS has
+    # passed, so an offline machine still gets a usable UI.
+    def __init__(self, timeout=None):
+        self.timeout = WARMUP_TIMEOUT_SECONDS if timeout is None else timeout
+        self.phases = OrderedDict()
+        self.checks = OrderedDict()
+        self._done = threading.Event()
+        self._warmup_started = None
+        self._lock = threading.Lock()
+
+    def mark(self, phase):
+        elapsed = round(time.perf_counter() - IMPORT_STARTED, 3)
+        with self._lock:
+            self.phases.setdefault(phase, elapsed)
+        startup_phases.set(elapsed, phase=phase)
+        return elapsed
+
+    def warm_up(self, steps):
+        with self._lock:
+            if self._warmup_started is not None:
+                return
+            self._warmup_started = time.monotonic()
+        thread = threading.Thread(target=self._run, args=(steps,), name="startup-warmup", daemon=True)
+        thread.start()
+
+    def _run(self, steps):
+        for name, step in steps:
+            started = time.perf_counter()
+            try:
+                outcome = step() or "ok"
+            except Exception as err:
+                outcome = f"failed: {err}"
+            with self._lock:
+                self.checks[name] = {"status": outcome, "seconds": round(time.perf_counter() - started, 3)}
+            self.mark(f"warmup_{name}")
+        self.mark("ready")
+        self._done.set()
+        if REPORT_ENABLED:
+            self.log()
+
+    @property
+    def ready(self):
+        if self._done.is_set():
+            return True
+        with self._lock:
+            started = self._warmup_started
+        return started is not None and time.monotonic() - started >= self.timeout
+
+    def report(self):
+        with self._lock:
+            phases = dict(self.phases)
+            checks = {name: dict(check) for name, check in self.checks.items()}
+        return {
+            "ready": self.ready,
+            "warmup_complete": self._done.is_set(),
+            "pid": os.getpid(),
+            "frozen": bool(getattr(sys, "frozen", False)),
+            "uptime_seconds": round(time.perf_counter() - IMPORT_STARTED, 3),
+            "launcher_delay_seconds": launcher_delay(),
+            "phases": phases,
+            "checks": checks,
+        }
+
+    def log(self):
+        report = self.report()
+        phases = ", ".join(f"{name} {seconds:.3f}s" for name, seconds in report["phases"].items())
+        launch = report["launcher_delay_seconds"]
+        prefix = f"launch {launch:.3f}s, " if launch is not None else ""
+        print(f"[startup] pid {report['pid']}: {prefix}{phases}", file=sys.stderr, flush=True)
+
+
+startup = Startup()
@@ -0,0 +1,305 @@
+import contextvars
+import cProfile
+import math
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+# Not from upstream: upstream imports this module.
+from envconfig import APP_ROOT, env_float
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+PROFILE_ROUTES = {route.strip() for route in os.getenv("PROFILE_ROUTES", "").split(",") if route.strip()}
+PROFILE_SAMPLE_RATE = min(1.0, max(0.0, env_float("PROFILE_SAMPLE_RATE", 0.01)))
+PROFILE_DIR = os.getenv("PROFILE_DIR") or os.path.join(APP_ROOT, "profiles")
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values)) + list(extra or [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def header(self):
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        with self._lock:
+            values = dict(self._values)
+        return self.header() + [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in sorted(values.items())]
+
+    def set_total(self, value, **labels):
+        # For counters mirrored from a component's own running total when metrics are collected.
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets) + (math.inf,)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][index] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        with self._lock:
+            values = {key: ([*series[0]], series[1], series[2]) for key, series in self._values.items()}
+        lines = self.header()
+        for key, (counts, total, count) in sorted(values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, [("le", _format_value(bound))])
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(float(total))}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector):
+        # Collectors refresh gauges from other components' own counters right before a scrape.
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self):
+        with self._lock:
+            collectors = list(self._collectors)
+            metrics = list(self._metrics)
+        for collector in collectors:
+            collector()
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_requests = registry.register(Counter("http_requests_total", "HTTP requests by route, method and status.", ("route", "method", "status")))
+http_latency = registry.register(Histogram("http_request_duration_seconds", "HTTP request latency until the response headers are ready.", ("route", "method")))
+http_in_flight = registry.register(Gauge("http_requests_in_flight", "HTTP requests currently being handled.", ("route",)))
+http_request_size = registry.register(Histogram("http_request_size_bytes", "HTTP request body sizes.", ("route",), SIZE_BUCKETS))
+http_response_size = registry.register(Histogram("http_response_size_bytes", "HTTP response body sizes (streamed bodies excluded).", ("route",), SIZE_BUCKETS))
+upstream_latency = registry.register(Histogram("upstream_request_duration_seconds", "NVIDIA API call latency including retries.", ("endpoint",)))
+upstream_requests = registry.register(Counter("upstream_requests_total", "NVIDIA API calls by endpoint and final status.", ("endpoint", "status")))
+upstream_retries = registry.register(Counter("upstream_retries_total", "NVIDIA API retry attempts.", ("endpoint",)))
+upstream_in_flight = registry.register(Gauge("upstream_requests_in_flight", "NVIDIA API calls currently open.", ("endpoint",)))
+upstream_sent_bytes = registry.register(Counter("upstream_sent_bytes_total", "Request body bytes sent to the NVIDIA API.", ("endpoint",)))
+upstream_received_bytes = registry.register(Counter("upstream_received_bytes_total", "Response body bytes read from the NVIDIA API.", ("endpoint",)))
+llm_tokens = registry.register(Counter("llm_tokens_total", "Token usage reported by the chat completions API.", ("model", "kind")))
+fallbacks = registry.register(Counter("fallbacks_total", "Responses served by a fallback path instead of the primary model.", ("kind",)))
+json_parses = registry.register(Counter("llm_json_parse_total", "Structured model outputs by parse outcome (ok, recovered, failed).", ("endpoint", "outcome")))
+
+
+class Timings:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = {}
+        self._lock = threading.Lock()
+
+    def add(self, phase, seconds):
+        with self._lock:
+            self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def header(self):
+        with self._lock:
+            phases = dict(self.phases)
+        parts = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in phases.items()]
+        parts.append(f"total;dur={(time.perf_counter() - self.started) * 1000:.1f}")
+        return ", ".join(parts)
+
+
+_current_timings = contextvars.ContextVar("current_timings", default=None)
+
+
+def start_timings():
+    timings = Timings()
+    return timings, _current_timings.set(timings)
+
+
+def finish_timings(token):
+    _current_timings.reset(token)
+
+
+def add_phase(name, seconds):
+    timings = _current_timings.get()
+    if timings is not None:
+        timings.add(name, seconds)
+
+
+@contextmanager
+def phase(name):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        add_phase(name, time.perf_counter() - started)
+
+
+def submit(executor, fn, *args, **kwargs):
+    # Work fanned out to a pool still reports its phases to the request that started it.
+    context = contextvars.copy_context()
+    return executor.submit(context.run, fn, *args, **kwargs)
+
+
+def count_fallback(kind):
+    fallbacks.inc(kind=kind)
+
+
+def count_parse(endpoint, outcome):
+    json_parses.inc(endpoint=endpoint, outcome=outcome)
+
+
+def record_tokens(model, usage):
+    if not isinstance(usage, dict):
+        return
+    for kind in ("prompt_tokens", "completion_tokens"):
+        value = usage.get(kind)
+        if isinstance(value, int) and value >= 0:
+            llm_tokens.inc(value, model=model, kind=kind.replace("_tokens", ""))
+
+
+def body_size(body):
+    if body is None:
+        return 0
+    if isinstance(body, (list, tuple)):
+        return sum(memoryview(part).nbytes for part in body)
+    return memoryview(body).nbytes
+
+
+def upstream_started(endpoint):
+    upstream_in_flight.inc(endpoint=endpoint)
+
+
+def upstream_finished(endpoint, status, seconds, sent_bytes=0, received_bytes=0):
+    upstream_in_flight.dec(endpoint=endpoint)
+    upstream_latency.observe(seconds, endpoint=endpoint)
+    upstream_requests.inc(endpoint=endpoint, status=status)
+    upstream_sent_bytes.inc(sent_bytes, endpoint=endpoint)
+    upstream_received_bytes.inc(received_bytes, endpoint=endpoint)
+    add_phase("upstream", seconds)
+
+
+def upstream_retry(endpoint):
+    upstream_retries.inc(endpoint=endpoint)
+
+
+_profile_lock = threading.Lock()
+
+
+def should_profile(route):
+    return route in PROFILE_ROUTES and random.random() < PROFILE_SAMPLE_RATE
+
+
+def start_profile():
+    # One profiled request at a time: Python 3.12+ refuses a second active profiler, so a sampled request that
+    # finds the slot taken (or a debugger holding it) just runs unprofiled.
+    if not _profile_lock.acquire(blocking=False):
+        return None
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except Exception as err:
+        _profile_lock.release()
+        print(f"[telemetry] profiler not started: {err}", file=sys.stderr, flush=True)
+        return None
+    return profiler
+
+
+def discard_profile(profiler):
+    try:
+        profiler.disable()
+    finally:
+        _profile_lock.release()
+
+
+def finish_profile(profiler, route):
+    # Returns an opaque id for the response header, or None when the file could not be written; the file path
+    # (server layout) only goes to the server log. Profiling never fails the request it samples.
+    discard_profile(profiler)
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_") or "root"
+    profile_id = uuid.uuid4().hex[:12]
+    path = os.path.join(PROFILE_DIR, f"{slug}-{int(time.time() * 1000)}-{profile_id}.prof")
+    try:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        profiler.dump_stats(path)
+    except Exception as err:
+        print(f"[telemetry] profile for {route} not written to {path}: {err}", file=sys.stderr, flush=True)
+        return None
+    print(f"[telemetry] profile {profile_id} for {route} written to {path}", file=sys.stderr, flush=True)
+    return profile_id
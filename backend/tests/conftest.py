@@ -0,0 +1,117 @@
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+# The backend modules read their configuration at import time, so point every file they write at a scratch
+# directory and drop real credentials before the first of them is imported.
+SCRATCH_DIR = tempfile.mkdtemp(prefix="interview-backend-tests-")
+os.environ.update({
+    "NVIDIA_SETTINGS_FILE": os.path.join(SCRATCH_DIR, "nvidia_settings.json"),
+    "JOB_STORE_PATH": os.path.join(SCRATCH_DIR, "jobs.sqlite3"),
+    "RATE_LIMIT_PATH": os.path.join(SCRATCH_DIR, "ratelimit.sqlite3"),
+    "QUESTION_BANK_PATH": os.path.join(SCRATCH_DIR, "question_bank.bin"),
+    "PROFILE_DIR": os.path.join(SCRATCH_DIR, "profiles"),
+    "STARTUP_REPORT": "0",
+    # Route tests drive the model through the scripted upstream; the bank and limiter have their own tests.
+    "QUESTION_BANK_ENABLED": "0",
+    "RATE_LIMIT_CHAT_RPM": "0",
+    "RATE_LIMIT_STT_RPM": "0",
+})
+for name in ("NVIDIA_API_KEY", "NVIDIA_STT_API_KEY", "NVIDIA_BASE_URL", "NVIDIA_MODEL"):
+    os.environ.pop(name, None)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class ScriptedUpstream:
+    # Local HTTP/1.1 server that answers with queued (status, body, headers, delay) tuples, then 200 {}.
+    def __init__(self):
+        self.responses = []
+        self.requests = []
+        self.ports = []
+        self._lock = threading.Lock()
+        upstream = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                with upstream._lock:
+                    upstream.requests.append((self.path, dict(self.headers), body))
+                    upstream.ports.append(self.client_address[1])
+                    status, payload, headers, delay = upstream.responses.pop(0) if upstream.responses else (200, {}, {}, 0)
+                if delay:
+                    time.sleep(delay)
+                data = payload if isinstance(payload, bytes) else json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = do_POST
+
+            def log_message(self, *_args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def queue(self, status=200, payload=None, headers=None, delay=0):
+        with self._lock:
+            self.responses.append((status, {} if payload is None else payload, headers or {}, delay))
+
+    def queue_chat(self, content, delay=0):
+        self.queue(200, {"choices": [{"message": {"content": content}}]}, delay=delay)
+
+    def queue_stream(self, tokens):
+        events = [json.dumps({"choices": [{"delta": {"content": token}}]}) for token in tokens] + ["[DONE]"]
+        body = "".join(f"data: {event}\n\n" for event in events).encode("utf-8")
+        self.queue(200, body, {"Content-Type": "text/event-stream"})
+
+    def request_json(self, index):
+        return json.loads(self.requests[index][2].decode("utf-8"))
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def upstream_server():
+    server = ScriptedUpstream()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def backend_module():
+    import backend
+
+    return backend
+
+
+@pytest.fixture
+def client(backend_module):
+    return backend_module.app.test_client()
+
+
+@pytest.fixture
+def nvidia(backend_module, upstream_server):
+    # Points the backend at the scripted upstream with a test key; caches are emptied on both sides.
+    backend_module.settings_store.update(api_key="test-key", base_url=upstream_server.url)
+    for cache in backend_module.simulator.caches.values():
+        cache.clear()
+    yield upstream_server
+    backend_module.settings_store.update(api_key=None, base_url=None)
+    for cache in backend_module.simulator.caches.values():
+        cache.clear()
@@ -0,0 +1,79 @@
+import io
+import wave
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import audio_preprocess  # noqa: E402
+
+
+def wav_bytes(samples, rate=48000, channels=2):
+    pcm = (np.clip(samples, -1, 1) * 32767).astype("<i2")
+    if channels > 1:
+        pcm = np.repeat(pcm, channels)
+    output = io.BytesIO()
+    with wave.open(output, "wb") as writer:
+        writer.setnchannels(channels)
+        writer.setsampwidth(2)
+        writer.setframerate(rate)
+        writer.writeframes(pcm.tobytes())
+    return output.getvalue()
+
+
+def padded_tone(rate=48000, silence=1.0, tone=1.0):
+    quiet = np.zeros(int(rate * silence), dtype=np.float32)
+    voiced = 0.5 * np.sin(2 * np.pi * 220 * np.arange(int(rate * tone)) / rate).astype(np.float32)
+    return np.concatenate([quiet, voiced, quiet])
+
+
+def test_trims_silence_downmixes_and_resamples():
+    audio = wav_bytes(padded_tone())
+    output, mime_type, stats = audio_preprocess.preprocess_audio(audio, "audio/wav")
+    assert mime_type == "audio/wav"
+    with wave.open(io.BytesIO(bytes(output)), "rb") as reader:
+        assert reader.getnchannels() == 1
+        assert reader.getframerate() == audio_preprocess.TARGET_SAMPLE_RATE
+        seconds = reader.getnframes() / reader.getframerate()
+    padding = 2 * audio_preprocess.VAD_PADDING_MS / 1000
+    assert 1.0 <= seconds <= 1.0 + padding + 0.05
+    assert stats["input_seconds"] == 3.0
+    assert stats["trimmed_bytes"] == len(audio) - len(output)
+    assert stats["silent"] is False
+
+
+def test_silent_segment_becomes_empty():
+    output, _, stats = audio_preprocess.preprocess_audio(wav_bytes(np.zeros(48000, dtype=np.float32)), "audio/wav")
+    assert len(output) == 0
+    assert stats["silent"] is True
+
+
+def test_non_wav_and_broken_wav_pass_through():
+    assert audio_preprocess.preprocess_audio(b"\x1aE\xdf\xa3webm", "audio/webm") == (b"\x1aE\xdf\xa3webm", "audio/webm", None)
+    broken = b"RIFF\x00\x00\x00\x00WAVEjunk"
+    assert audio_preprocess.preprocess_audio(broken, "audio/wav") == (broken, "audio/wav", None)
+
+
+def test_totals_accumulate():
+    before = audio_preprocess.totals()
+    audio_preprocess.preprocess_audio(wav_bytes(np.zeros(16000, dtype=np.float32), rate=16000, channels=1), "audio/wav")
+    after = audio_preprocess.totals()
+    assert after["segments"] == before["segments"] + 1
+    assert after["silent_segments"] == before["silent_segments"] + 1
+
+
+def test_silent_upload_skips_whisper(client, nvidia):
+    audio = wav_bytes(np.zeros(48000, dtype=np.float32))
+    response = client.post("/transcribe-audio", data={"audio": (io.BytesIO(audio), "clip.wav", "audio/wav")})
+    assert response.get_json()["text"] == ""
+    assert nvidia.requests == []
+
+
+def test_upload_sent_to_whisper_is_trimmed(client, nvidia):
+    nvidia.queue(200, {"text": "hello"})
+    audio = wav_bytes(padded_tone())
+    response = client.post("/transcribe-audio", data={"audio": (io.BytesIO(audio), "clip.wav", "audio/wav")})
+    result = response.get_json()
+    assert result["text"] == "hello"
+    assert result["preprocessing"]["output_bytes"] < len(audio) // 4
+    assert len(nvidia.requests[0][2]) < len(audio) // 4
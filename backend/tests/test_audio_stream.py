@@ -0,0 +1,105 @@
+import io
+
+import pytest
+
+from audio_stream import AudioChunkTooLargeError, AudioSequenceError, AudioStream, merge_overlap, read_audio_chunk
+
+
+class ManualExecutor:
+    # Holds submitted windows so a test decides when (and in which order) they finish.
+    def __init__(self):
+        self.calls = []
+
+    def submit(self, fn, *args):
+        self.calls.append((fn, args))
+
+    def run(self, order=None):
+        calls, self.calls = self.calls, []
+        for index in order if order is not None else range(len(calls)):
+            fn, args = calls[index]
+            fn(*args)
+
+
+def test_merge_overlap_drops_repeated_words():
+    assert merge_overlap("we shipped the new API", "the new API in March") == "in March"
+    assert merge_overlap("we shipped it.", "It, really shipped") == "really shipped"
+    assert merge_overlap("", "hello world") == "hello world"
+    assert merge_overlap("one two", "three four") == "three four"
+
+
+def test_sequence_rules():
+    stream = AudioStream(lambda parts, mime: "", ManualExecutor(), window_seconds=10)
+    assert stream.append(0, b"header")
+    assert stream.append(1, b"a")
+    assert stream.append(1, b"a") is False
+    with pytest.raises(AudioSequenceError) as excinfo:
+        stream.append(3, b"c")
+    assert (excinfo.value.expected, excinfo.value.received) == (2, 3)
+
+
+def test_full_window_is_sent_with_header_and_keeps_overlap():
+    received = []
+    executor = ManualExecutor()
+    stream = AudioStream(lambda parts, mime: received.append(list(parts)) or "text", executor, window_seconds=3, overlap_seconds=1)
+    stream.append(0, b"H")
+    for seq, data in enumerate((b"a", b"b", b"c", b"d", b"e"), start=1):
+        stream.append(seq, data)
+    executor.run()
+    assert received == [[b"H", b"a", b"b", b"c"], [b"H", b"c", b"d", b"e"]]
+    assert stream.describe()["buffered_seconds"] == 1.0
+
+
+def test_silent_windows_are_not_transcribed():
+    executor = ManualExecutor()
+    stream = AudioStream(lambda parts, mime: "hallucination", executor, window_seconds=2, overlap_seconds=0)
+    stream.append(0, b"H")
+    stream.append(1, b"a", voiced=False)
+    stream.append(2, b"b", voiced=False)
+    assert executor.calls == []
+    assert stream.windows_submitted == 0
+
+
+def test_windows_finishing_out_of_order_merge_in_capture_order():
+    texts = {b"a": "first window", b"b": "window second part"}
+    executor = ManualExecutor()
+    stream = AudioStream(lambda parts, mime: texts[parts[-1]], executor, window_seconds=1, overlap_seconds=0)
+    stream.append(0, b"H")
+    stream.append(1, b"a")
+    stream.append(2, b"b")
+    assert stream.pending_windows == 2
+    # The second window finishes first but has to wait for the first before it is merged.
+    executor.run(order=[1, 0])
+    assert stream.text == "first window second part"
+    assert stream.pending_windows == 0
+    assert stream.describe(text_offset=6)["text_delta"] == "window second part"
+
+
+def test_flush_skips_overlap_already_transcribed():
+    executor = ManualExecutor()
+    stream = AudioStream(lambda parts, mime: "x", executor, window_seconds=2, overlap_seconds=1)
+    stream.append(0, b"H")
+    stream.append(1, b"a")
+    stream.append(2, b"b")
+    stream.flush()
+    assert len(executor.calls) == 1
+    stream.append(3, b"c")
+    stream.flush()
+    assert len(executor.calls) == 2
+
+
+def test_transcription_errors_become_warnings():
+    def fail(parts, mime):
+        raise RuntimeError("stt down")
+
+    executor = ManualExecutor()
+    stream = AudioStream(fail, executor, window_seconds=1, overlap_seconds=0)
+    stream.append(0, b"H")
+    stream.append(1, b"a")
+    executor.run()
+    assert stream.describe()["warning"] == "stt down"
+
+
+def test_read_audio_chunk_limit():
+    assert bytes(read_audio_chunk(io.BytesIO(b"abc"), max_bytes=3)) == b"abc"
+    with pytest.raises(AudioChunkTooLargeError):
+        read_audio_chunk(io.BytesIO(b"abcd"), max_bytes=3)
@@ -0,0 +1,79 @@
+import base64
+import io
+import json
+from urllib.parse import quote
+
+import pytest
+
+from frames import FrameTooLargeError, IncompleteBodyError, decode_base64_frame, downscale_frame, read_bounded, read_frame_stream
+
+
+class TrickleStream:
+    # Hands out at most a few bytes per read(), like a proxied or chunked request body.
+    def __init__(self, data, step=3):
+        self.data = data
+        self.step = step
+
+    def read(self, size=-1):
+        size = self.step if size < 0 else min(size, self.step)
+        block, self.data = self.data[:size], self.data[size:]
+        return block
+
+
+def jpeg_bytes(size=(64, 48)):
+    image_module = pytest.importorskip("PIL.Image")
+    output = io.BytesIO()
+    image_module.new("RGB", size, (120, 90, 60)).save(output, format="JPEG")
+    return output.getvalue()
+
+
+def test_read_bounded_reads_until_complete():
+    assert read_bounded(TrickleStream(b"0123456789"), 100, content_length=10) == b"0123456789"
+    assert read_bounded(TrickleStream(b"0123456789"), 100) == b"0123456789"
+
+
+def test_read_bounded_rejects_short_body():
+    with pytest.raises(IncompleteBodyError) as excinfo:
+        read_bounded(TrickleStream(b"01234"), 100, content_length=10)
+    assert (excinfo.value.expected, excinfo.value.received) == (10, 5)
+
+
+def test_read_frame_stream_enforces_limit():
+    assert bytes(read_frame_stream(io.BytesIO(b"x" * 8), max_bytes=8)) == b"x" * 8
+    with pytest.raises(FrameTooLargeError):
+        read_frame_stream(io.BytesIO(b"x" * 9), max_bytes=8)
+
+
+def test_decode_base64_frame_accepts_data_urls():
+    encoded = base64.b64encode(b"frame-bytes").decode("ascii")
+    assert bytes(decode_base64_frame(f"data:image/jpeg;base64,{encoded}")) == b"frame-bytes"
+    assert decode_base64_frame("") is None
+    assert decode_base64_frame("not base64!") is None
+    with pytest.raises(FrameTooLargeError):
+        decode_base64_frame("A" * 400, max_bytes=100)
+
+
+def test_downscale_frame_caps_longest_side():
+    image_module = pytest.importorskip("PIL.Image")
+    small = downscale_frame(jpeg_bytes((640, 480)), max_side=160)
+    assert image_module.open(io.BytesIO(small)).size == (160, 120)
+
+
+def test_binary_frame_route_uses_query_fields(client):
+    payload = quote(json.dumps({"role": "Engineer", "transcript": "hello there", "session_seconds": 20}))
+    response = client.post(f"/realtime-score?payload={payload}", data=jpeg_bytes(), content_type="image/jpeg")
+    assert response.status_code == 200
+    assert "overall_score" in response.get_json()
+
+
+def test_oversized_frame_is_413(client, backend_module):
+    response = client.post("/realtime-score", data=b"x" * (backend_module.FRAME_MAX_BYTES + 1), content_type="image/jpeg")
+    assert response.status_code == 413
+    assert "error" in response.get_json()
+
+
+def test_request_over_max_content_length_is_json_413(client, backend_module, monkeypatch):
+    monkeypatch.setitem(backend_module.app.config, "MAX_CONTENT_LENGTH", 64)
+    response = client.post("/score", data=json.dumps({"question": "q", "answer": "a" * 200}), content_type="application/json")
+    assert response.status_code == 413
+    assert "error" in response.get_json()
@@ -0,0 +1,64 @@
+import json
+import time
+
+# Valid both as a realtime coaching result and as an answer score, whichever call picks it up first.
+COMBINED = json.dumps({
+    "overall_score": 8,
+    "tone_score": 7,
+    "confidence_score": 7,
+    "summary": "Steady delivery.",
+    "score": 7,
+    "feedback": ["Clear example."],
+    "improvements": ["Quantify the impact."],
+})
+ANSWER = "I led the migration of our billing service to a new queue and cut failures in half."
+BODY = {
+    "role": "Engineer",
+    "transcript": "I led the migration of our billing service and measured the results every week.",
+    "session_seconds": 40,
+    "question": "Describe a project you led",
+    "answer": ANSWER,
+}
+
+
+def test_fused_request_returns_coaching_and_answer_score_in_one_round_trip(client, nvidia):
+    nvidia.queue_chat(COMBINED, delay=0.3)
+    nvidia.queue_chat(COMBINED, delay=0.3)
+    started = time.monotonic()
+    result = client.post("/realtime-score", json=BODY).get_json()
+    assert time.monotonic() - started < 0.55
+    assert result["overall_score"] == 8
+    assert result["answer_score"]["score"] == 7
+    assert len(nvidia.requests) == 2
+
+
+def test_without_answer_only_the_realtime_prompt_runs(client, nvidia):
+    nvidia.queue_chat(COMBINED)
+    result = client.post("/realtime-score", json={**BODY, "answer": ""}).get_json()
+    assert "answer_score" not in result
+    assert len(nvidia.requests) == 1
+
+
+def test_answer_score_falls_back_without_failing_the_evaluation(client):
+    response = client.post("/realtime-score", json=BODY)
+    assert response.status_code == 200
+    result = response.get_json()
+    assert "overall_score" in result
+    assert result["answer_score"]["fallback"] is True
+    assert result["answer_score"]["provisional"] is True
+
+
+def test_session_evaluate_scores_the_current_answer(client, nvidia):
+    nvidia.queue_chat(COMBINED)
+    nvidia.queue_chat(COMBINED)
+    session_id = client.post("/realtime/sessions", json={"role": "Engineer"}).get_json()["session_id"]
+    response = client.post(f"/realtime/sessions/{session_id}/evaluate", json={
+        "question": "Describe a project you led",
+        "transcript_delta": ANSWER,
+        "offset": 0,
+        "include_answer_score": True,
+    })
+    assert response.status_code == 200
+    assert response.get_json()["answer_score"]["score"] == 7
+    prompts = [request["messages"][0]["content"] for request in map(nvidia.request_json, range(2))]
+    assert any(ANSWER in prompt for prompt in prompts)
@@ -0,0 +1,63 @@
+import pytest
+
+import generation
+from generation import JSONObjectExtractor, extract_json_object
+from upstream import NvidiaAPIError
+
+
+@pytest.fixture
+def forget_unsupported():
+    yield
+    generation._unsupported_models.clear()
+
+
+def test_profiles_cap_tokens_and_attach_the_schema(forget_unsupported):
+    fields = generation.profile("score").payload_fields("some/model")
+    assert fields["max_tokens"] == 320
+    assert fields["temperature"] == 0.2
+    assert fields["nvext"] == {"guided_json": generation.SCORE_SCHEMA}
+    assert "nvext" not in generation.profile("questions").payload_fields("some/model")
+
+
+def test_profile_reads_env_overrides(monkeypatch):
+    monkeypatch.setenv("GEN_DEMO_MAX_TOKENS", "42")
+    monkeypatch.setenv("GEN_DEMO_STOP", "END|STOP")
+    demo = generation.GenerationProfile("demo", 100, 0.3)
+    assert demo.payload_fields("m") == {"temperature": 0.3, "max_tokens": 42, "stop": ["END", "STOP"]}
+
+
+def test_rejected_constraint_is_dropped_and_remembered(forget_unsupported):
+    payload = {"model": "m", **generation.profile("score").payload_fields("m")}
+    assert not generation.drop_guided("m", dict(payload), NvidiaAPIError(500, "bad"))
+    assert generation.drop_guided("m", payload, NvidiaAPIError(400, "bad"))
+    assert "nvext" not in payload
+    assert "nvext" not in generation.profile("score").payload_fields("m")
+    assert "nvext" in generation.profile("score").payload_fields("other")
+
+
+def test_score_retries_without_guided_json(client, nvidia, forget_unsupported):
+    nvidia.queue(400, {"detail": "guided_json is not supported"})
+    nvidia.queue_chat('{"score": 6, "feedback": ["Ok"], "improvements": ["More detail"]}')
+    response = client.post("/score", json={
+        "question": "Describe a project you led",
+        "answer": "I led the migration of our billing service to a new queue and cut failures in half.",
+    })
+    assert response.status_code == 200
+    assert response.get_json()["score"] == 6
+    assert "nvext" in nvidia.request_json(0)
+    assert "nvext" not in nvidia.request_json(1)
+
+
+def test_extractor_finds_object_split_across_chunks():
+    extractor = JSONObjectExtractor()
+    chunks = ['Sure! {"score": 8, "feed', 'back": ["a \\"quoted\\" }"], ', '"improvements": []}', " trailing"]
+    results = [extractor.feed(chunk) for chunk in chunks]
+    assert results[:2] == [None, None]
+    assert results[2] == {"score": 8, "feedback": ['a "quoted" }'], "improvements": []}
+    assert extractor.done
+
+
+def test_extractor_skips_braces_in_prose():
+    assert extract_json_object('Use {score} then {"score": 3}') == ({"score": 3}, "recovered")
+    assert extract_json_object('{"score": 3}') == ({"score": 3}, "ok")
+    assert extract_json_object("no json here") == (None, "failed")
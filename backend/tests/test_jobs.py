@@ -0,0 +1,73 @@
+import pytest
+
+import jobs
+from jobs import JobQueue, JobStore, QueueFullError, UnknownJobKindError
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    yield store
+    store.close()
+
+
+def test_claims_follow_priority_then_arrival(store):
+    batch = store.insert("score_batch", jobs.PRIORITIES["score_batch"], {})
+    first = store.insert("score", jobs.PRIORITIES["score"], {"n": 1})
+    second = store.insert("score", jobs.PRIORITIES["score"], {"n": 2})
+    realtime = store.insert("realtime", jobs.PRIORITIES["realtime"], {})
+    assert store.position(batch) == 3
+    assert [store.claim("worker")["id"] for _ in range(4)] == [realtime, first, second, batch]
+    assert store.claim("worker") is None
+
+
+def test_cancel_only_applies_to_queued_jobs(store):
+    queued = store.insert("score", 3, {})
+    assert store.cancel(queued)
+    assert store.get(queued)["status"] == "cancelled"
+    running = store.insert("score", 3, {})
+    store.claim("worker")
+    assert not store.cancel(running)
+
+
+def test_jobs_of_a_dead_worker_are_requeued_then_failed(store, monkeypatch):
+    monkeypatch.setattr(jobs, "MAX_ATTEMPTS", 2)
+    job_id = store.insert("score", 3, {}, body=b"audio")
+    store.claim("dead-worker")
+    assert store.maintain("live-worker") == 1
+    assert store.get(job_id)["status"] == "queued"
+
+    claimed = store.claim("dead-worker")
+    assert claimed["body"] == b"audio"
+    store.maintain("live-worker")
+    job = store.get(job_id)
+    assert job["status"] == "failed" and job["attempts"] == 2
+
+
+def test_queue_limit(store, monkeypatch):
+    monkeypatch.setattr(jobs, "QUEUE_MAX", 1)
+    store.insert("score", 3, {})
+    with pytest.raises(QueueFullError):
+        store.insert("score", 3, {})
+
+
+def test_queue_runs_handlers_and_maps_errors(tmp_path):
+    def fail(_payload, _body):
+        raise LookupError("missing")
+
+    queue = JobQueue(
+        JobStore(str(tmp_path / "jobs.sqlite3")),
+        {"double": lambda payload, _body: payload["value"] * 2, "fail": fail},
+        workers=1,
+        on_error=lambda err: (f"mapped: {err}", 404),
+    )
+    try:
+        done = queue.wait(queue.submit("double", {"value": 21})["id"], 5)
+        assert (done["status"], done["result"]) == ("done", 42)
+        failed = queue.wait(queue.submit("fail", {})["id"], 5)
+        assert (failed["status"], failed["error"], failed["status_code"]) == ("failed", "mapped: missing", 404)
+        with pytest.raises(UnknownJobKindError):
+            queue.submit("unknown", {})
+    finally:
+        # The store stays open: the queue's metrics collector keeps reading it for the rest of the session.
+        assert queue.stop(5)
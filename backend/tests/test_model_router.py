@@ -0,0 +1,110 @@
+import threading
+import time
+
+import pytest
+
+import model_router
+from model_router import ModelRouter, cancel_event, is_retryable, reset_deadline, set_deadline
+from upstream import CircuitOpenError, DeadlineExceeded, NvidiaAPIError, RateLimitedError
+
+ANSWER = "I led the migration of our billing service to a new queue and cut failures in half."
+
+
+@pytest.fixture
+def router(monkeypatch):
+    monkeypatch.setattr(model_router, "HEDGE_DEFAULT_SECONDS", 0.05)
+    router = ModelRouter("primary", max_workers=4)
+    router.models["score"] = ["primary", "secondary"]
+    yield router
+    router.executor.shutdown(wait=True)
+
+
+@pytest.fixture
+def deadline():
+    tokens = []
+    yield lambda milliseconds: tokens.append(set_deadline(milliseconds))
+    for token in reversed(tokens):
+        reset_deadline(token)
+
+
+def test_single_model_runs_in_the_calling_thread(router):
+    assert router.call("questions", lambda model: (model, threading.current_thread())) == ("primary", threading.current_thread())
+
+
+def test_retryable_error_fails_over_to_the_next_model(router):
+    def call(model):
+        if model == "primary":
+            raise NvidiaAPIError(503, "overloaded")
+        return model
+
+    assert router.call("score", call) == "secondary"
+
+
+def test_request_errors_are_not_failed_over(router):
+    seen = []
+
+    def call(model):
+        seen.append(model)
+        raise NvidiaAPIError(400, "bad request")
+
+    with pytest.raises(NvidiaAPIError):
+        router.call("score", call)
+    assert seen == ["primary"]
+
+
+def test_slow_primary_is_hedged_and_cancelled(router):
+    events = {}
+
+    def call(model):
+        events[model] = cancel_event()
+        if model == "primary":
+            events[model].wait(2)
+        return model
+
+    started = time.monotonic()
+    assert router.call("score", call) == "secondary"
+    assert time.monotonic() - started < 1
+    assert events["primary"].wait(1)
+
+
+def test_deadline_bounds_the_wait(router, deadline):
+    deadline(100)
+    started = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        router.call("score", lambda model: time.sleep(0.5))
+    assert time.monotonic() - started < 0.4
+
+
+def test_spent_deadline_fails_before_calling(router, deadline):
+    deadline(1)
+    time.sleep(0.01)
+    with pytest.raises(DeadlineExceeded):
+        router.call("questions", lambda model: pytest.fail("called past the deadline"))
+
+
+def test_retryable_classification():
+    assert is_retryable(CircuitOpenError("host", 5))
+    assert is_retryable(NvidiaAPIError(502, "bad gateway"))
+    assert is_retryable(ConnectionError())
+    assert not is_retryable(RateLimitedError("chat", 3))
+    assert not is_retryable(DeadlineExceeded("score"))
+    assert not is_retryable(NvidiaAPIError(401, "unauthorized"))
+
+
+def test_score_degrades_to_provisional_prescore(client, nvidia, backend_module, monkeypatch):
+    def unavailable(*_args, **_kwargs):
+        raise CircuitOpenError("upstream", 30)
+
+    monkeypatch.setattr(backend_module.simulator, "_complete_text", unavailable)
+    response = client.post("/score", json={"question": "Describe a project you led", "answer": ANSWER})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["provisional"] is True and body["fallback"] is True
+    assert 0 <= body["score"] <= 10
+    assert "temporarily unavailable" in body["error"]
+
+
+def test_score_surfaces_request_errors(client, nvidia):
+    nvidia.queue(403, {"detail": "forbidden"})
+    response = client.post("/score", json={"question": "Describe a project you led", "answer": ANSWER})
+    assert response.status_code == 403
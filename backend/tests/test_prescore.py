@@ -0,0 +1,63 @@
+from prescore import prescore, tokenize
+
+QUESTION = "Describe a project you led"
+ANSWER = "I led the migration of our billing service to a new queue and cut failures in half."
+
+
+def test_trivial_answers_are_settled_locally():
+    assert prescore(QUESTION, "")["reason"] == "empty"
+    assert prescore(QUESTION, "asdfghjkl qwrtpsdfg zxcvbnmlk")["reason"] == "gibberish"
+    assert prescore(QUESTION, "yes " * 20)["reason"] == "repetitive"
+    assert prescore(QUESTION, "!!!! ???? ....")["reason"] == "gibberish"
+
+
+def test_short_answers_go_to_the_model():
+    for question, answer in [
+        ("Which SQL clause filters aggregated groups?", "HAVING"),
+        ("Have you used Kubernetes in production?", "Yes"),
+        ("Would you relocate for this role?", "Yes, definitely."),
+        ("How many bits are in a byte?", "8"),
+    ]:
+        result = prescore(question, answer)
+        assert result["provisional"] is True and result["reason"] is None, answer
+
+
+def test_non_latin_answers_are_words_not_gibberish():
+    answer = "मुझे यह काम पसंद है क्योंकि मैं टीम के साथ सीखता हूँ।"
+    assert tokenize(answer) == ["मुझे", "यह", "काम", "पसंद", "है", "क्योंकि", "मैं", "टीम", "के", "साथ", "सीखता", "हूँ"]
+    result = prescore("आप यह भूमिका क्यों चाहते हैं?", answer)
+    assert result["provisional"] is True and result["features"]["gibberish_ratio"] == 0.0
+    assert prescore("Tell me about yourself", "Я backend-разработчик, пять лет пишу на Python.")["provisional"] is True
+
+
+def test_short_code_answer_goes_to_the_model():
+    assert prescore("Print every item", "arr.forEach(console.log)")["provisional"] is True
+
+
+def test_real_answer_gets_a_capped_provisional_score():
+    result = prescore(QUESTION, ANSWER)
+    assert result["provisional"] is True and result["reason"] is None
+    assert 1 <= result["score"] <= 8
+    assert result["features"]["keyword_coverage"] > 0
+    longer = prescore(QUESTION, ANSWER + " The project I led moved every invoice job and I wrote the rollout plan." * 3)
+    assert longer["score"] >= result["score"]
+
+
+def test_async_score_returns_prescore_then_refines(client, nvidia):
+    nvidia.queue_chat('{"score": 9, "feedback": ["Strong"], "improvements": ["Add metrics"]}')
+    response = client.post("/score", json={"question": QUESTION, "answer": ANSWER}, headers={"Prefer": "respond-async"})
+    assert response.status_code == 202
+    body = response.get_json()
+    assert body["provisional"] is True
+    assert response.headers["Location"] == body["refinement"]["status_url"]
+
+    job = client.get(body["refinement"]["status_url"] + "?wait_ms=5000").get_json()
+    assert job["status"] == "done"
+    assert job["result"]["score"] == 9
+
+
+def test_async_score_of_trivial_answer_is_final(client, nvidia):
+    response = client.post("/score", json={"question": QUESTION, "answer": "", "async": True})
+    assert response.status_code == 200
+    assert response.get_json()["provisional"] is False
+    assert nvidia.requests == []
@@ -0,0 +1,99 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import prompt_context
+from prompt_context import ContextStore, ContextWindow, estimate_tokens, extractive_summary
+
+BUDGET = 64  # tokens, so 256 characters stay verbatim
+
+
+@pytest.fixture
+def executor():
+    pool = ThreadPoolExecutor(max_workers=1)
+    yield pool
+    pool.shutdown(wait=True)
+
+
+def transcript(sentences):
+    return " ".join(f"Sentence number {index} explains one more detail." for index in range(sentences))
+
+
+def test_short_transcript_is_passed_verbatim(executor):
+    window = ContextWindow("realtime")
+    assert window.prepare("just a few words", lambda *_: "unused", executor, BUDGET) == "just a few words"
+
+
+def test_long_transcript_keeps_a_word_aligned_tail_and_folds_the_rest(executor, monkeypatch):
+    monkeypatch.setattr(prompt_context, "FOLD_MIN_TOKENS", 16)
+    calls = []
+    text = transcript(40)
+    window = ContextWindow("realtime")
+
+    first = window.prepare(text, lambda previous, chunk, budget: calls.append(chunk) or "SUMMARY", executor, BUDGET)
+    assert first.startswith("(Earlier answers omitted for length.)")
+    recent = first.split("Most recent transcript (verbatim):\n", 1)[1]
+    assert text.endswith(recent) and text[len(text) - len(recent) - 1] == " "
+    assert len(recent) <= BUDGET * prompt_context.CHARS_PER_TOKEN
+
+    window.wait(2)
+    assert calls and text.startswith(calls[0])
+    second = window.prepare(text, lambda *_: "SUMMARY", executor, BUDGET)
+    assert second.startswith("Summary of earlier answers:\nSUMMARY")
+    assert estimate_tokens(second) <= BUDGET + 32
+
+
+def test_failed_summarizer_falls_back_to_extractive(executor, monkeypatch):
+    monkeypatch.setattr(prompt_context, "FOLD_MIN_TOKENS", 16)
+
+    def broken(*_args):
+        raise RuntimeError("model down")
+
+    window = ContextWindow("realtime")
+    text = transcript(40)
+    window.prepare(text, broken, executor, BUDGET)
+    window.wait(2)
+    assert window.summary.startswith("Sentence number 0")
+
+
+def test_changed_transcript_resets_the_summary(executor, monkeypatch):
+    monkeypatch.setattr(prompt_context, "FOLD_MIN_TOKENS", 16)
+    window = ContextWindow("realtime")
+    window.prepare(transcript(40), lambda *_: "SUMMARY", executor, BUDGET)
+    window.wait(2)
+    assert window.summarized
+    assert window.prepare("A new answer.", lambda *_: "SUMMARY", executor, BUDGET) == "A new answer."
+    assert window.summary == ""
+
+
+def test_prepare_range_matches_prepare(executor):
+    text = transcript(40)
+    by_text = ContextWindow("realtime").prepare(text, lambda *_: "", None, BUDGET)
+    by_range = ContextWindow("realtime").prepare_range(len(text), lambda start, end: text[start:end], lambda *_: "", None, BUDGET)
+    assert by_range == by_text
+
+
+def test_extractive_summary_stays_within_budget():
+    summary = extractive_summary("", transcript(200), budget_tokens=32)
+    assert len(summary) <= 32 * prompt_context.CHARS_PER_TOKEN
+
+
+def test_store_keys_on_the_full_identity():
+    store = ContextStore(max_windows=8)
+    shared = "x" * 400
+    opening = transcript(10)
+    first = store.window("realtime", ("Engineer", shared + "payments"), opening)
+    assert store.window("realtime", ("Engineer", shared + "payments"), opening) is first
+    assert store.window("realtime", ("Engineer", shared + "search"), opening) is not first
+    # The transcript grows but keeps its opening characters, so it finds the same window.
+    assert store.window("realtime", ("Engineer", shared + "payments"), opening + " more" * 100) is first
+
+
+def test_store_evicts_least_recently_used():
+    store = ContextStore(max_windows=2)
+    first = store.window("score", ("q1",), "a")
+    store.window("score", ("q2",), "a")
+    store.window("score", ("q1",), "a")
+    store.window("score", ("q3",), "a")
+    assert len(store) == 2
+    assert store.window("score", ("q1",), "a") is first
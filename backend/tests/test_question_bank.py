@@ -0,0 +1,81 @@
+import threading
+
+import pytest
+
+import question_bank
+from question_bank import QuestionBank, normalize_role, skill_tags
+
+QUESTIONS = [
+    "1. Tell me about a Python service you scaled.",
+    "2. How do you design a REST API for payments?",
+    "3. Explain how you would debug a slow SQL query.",
+    "4. Describe how you deploy with Docker and Kubernetes.",
+]
+
+
+@pytest.fixture
+def bank(tmp_path, monkeypatch):
+    monkeypatch.setattr(question_bank, "LOW_WATER", 0)
+    bank = QuestionBank(str(tmp_path / "bank.bin"))
+    yield bank
+    bank.executor.shutdown(wait=True)
+
+
+def test_roles_and_skills_are_normalized():
+    assert normalize_role("Senior Front-End Developer") == normalize_role("frontend engineer") == "frontend engineer"
+    assert skill_tags("React.js, Postgres and k8s; some ML") == {"react", "postgresql", "kubernetes", "machine learning"}
+
+
+def test_near_duplicates_map_to_the_held_question(bank):
+    first = bank.add("Backend Engineer", "python", QUESTIONS)
+    again = bank.add("backend engineer", "python", ["Tell me about a Python service you scaled!"])
+    assert len(first) == 4 and again == first[:1]
+    assert bank.stats()["questions"] == 4
+
+
+def test_take_ranks_by_skill_and_never_repeats_for_a_user(bank):
+    bank.add("Backend Engineer", "", QUESTIONS)
+    taken = bank.take("backend engineer", "We use Docker and Kubernetes", 1, user_id="u1")
+    assert taken == ["1. Describe how you deploy with Docker and Kubernetes."]
+    assert bank.seen_in_role("Backend Engineer", "u1")
+    rest = bank.take("backend engineer", "", 3, user_id="u1")
+    assert len(rest) == 3 and "Docker" not in " ".join(rest)
+    assert bank.take("backend engineer", "", 1, user_id="u1") is None
+    # The opening question leads whenever it is picked.
+    assert bank.take("backend engineer", "", 4, user_id="u2")[0] == "1. Tell me about a Python service you scaled."
+
+
+def test_save_and_load_round_trip(bank, tmp_path):
+    bank.add("Backend Engineer", "python", QUESTIONS)
+    bank.save()
+    loaded = QuestionBank(str(tmp_path / "bank.bin"))
+    try:
+        assert loaded.stats()["roles"] == {"backend engineer": 4}
+        original = sorted((q.id, q.text, q.tags, q.signature, q.opener) for q in bank.questions.values())
+        assert sorted((q.id, q.text, q.tags, tuple(q.signature), q.opener) for q in loaded.questions.values()) == original
+        assert loaded.add("Backend Engineer", "", ["New question about caching layers and eviction."]) == [5]
+    finally:
+        loaded.executor.shutdown(wait=True)
+
+
+def test_unreadable_file_starts_empty(tmp_path):
+    path = tmp_path / "bank.bin"
+    path.write_bytes(b"not a bank")
+    bank = QuestionBank(str(path))
+    assert bank.stats()["questions"] == 0
+    bank.executor.shutdown(wait=True)
+
+
+def test_low_pool_triggers_one_background_refill(tmp_path, monkeypatch):
+    monkeypatch.setattr(question_bank, "LOW_WATER", 10)
+    called = threading.Event()
+
+    def refill(job_role, job_description, count):
+        called.set()
+        return ["What is your approach to code review on a small team?"]
+
+    bank = QuestionBank(str(tmp_path / "bank.bin"), refill=refill)
+    assert bank.take("Backend Engineer", "", 3) is None
+    assert called.wait(5)
+    bank.executor.shutdown(wait=True)
+    assert bank.stats()["roles"] == {"backend engineer": 1}
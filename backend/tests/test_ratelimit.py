@@ -0,0 +1,89 @@
+import threading
+import time
+
+import pytest
+
+import ratelimit
+from ratelimit import CallCancelled, RateLimiter
+from upstream import RateLimitedError
+
+
+def limiter(rpm=60, burst=2, **kwargs):
+    # An empty path keeps the bucket in memory for this process.
+    return RateLimiter("", rates={"chat": rpm / 60}, bursts={"chat": burst}, **kwargs)
+
+
+def bucket(limiter):
+    return next(iter(limiter.snapshot().values()))
+
+
+def test_burst_then_refuse_instead_of_waiting_past_the_limit():
+    limits = limiter(max_wait=0)
+    assert limits.acquire("chat", "key") == 0.0
+    assert limits.acquire("chat", "key") == 0.0
+    with pytest.raises(RateLimitedError) as raised:
+        limits.acquire("chat", "key")
+    assert raised.value.status_code == 429
+    # Another key has its own budget.
+    assert limits.acquire("chat", "other-key") == 0.0
+
+
+def test_caller_waits_for_its_token():
+    limits = limiter(rpm=1200, burst=1, max_wait=1)
+    limits.acquire("chat", "key")
+    started = time.monotonic()
+    assert limits.acquire("chat", "key") > 0
+    assert time.monotonic() - started >= 0.03
+
+
+def test_deadline_caps_the_wait():
+    limits = limiter(rpm=60, burst=1, max_wait=5, deadline=lambda: 0.01)
+    limits.acquire("chat", "key")
+    with pytest.raises(RateLimitedError):
+        limits.acquire("chat", "key")
+
+
+def test_upstream_429_halves_the_rate_and_it_recovers(monkeypatch):
+    monkeypatch.setattr(ratelimit, "RECOVERY_SECONDS", 1.0)
+    limits = limiter(rpm=600, burst=5, max_wait=0)
+    limits.acquire("chat", "key")
+    limits.penalize("chat", "key", retry_after=2)
+    penalized = bucket(limits)
+    assert penalized["rate_per_minute"] == 300
+    assert penalized["tokens"] == pytest.approx(-10, abs=0.5)
+    with pytest.raises(RateLimitedError):
+        limits.acquire("chat", "key")
+
+    time.sleep(0.3)
+    limits.penalize("chat", "key", retry_after=0)
+    # Recovered part of the way back before the second halving.
+    assert bucket(limits)["rate_per_minute"] > 150
+
+
+def test_cancelled_waiter_refunds_its_token():
+    cancel = threading.Event()
+    limits = limiter(rpm=60, burst=1, max_wait=5, cancelled=lambda: cancel)
+    limits.acquire("chat", "key")
+    errors = []
+
+    def wait_for_token():
+        try:
+            limits.acquire("chat", "key")
+        except CallCancelled as err:
+            errors.append(err)
+
+    waiter = threading.Thread(target=wait_for_token)
+    waiter.start()
+    time.sleep(0.05)
+    assert bucket(limits)["tokens"] < -0.5
+    cancel.set()
+    waiter.join(5)
+    assert errors and errors[0].endpoint == "chat"
+    assert bucket(limits)["tokens"] > -0.5
+
+
+def test_disabled_endpoint_and_missing_key_pass_through():
+    limits = limiter(rpm=0, burst=1, max_wait=0)
+    for _ in range(5):
+        assert limits.acquire("chat", "key") == 0.0
+    assert limiter(max_wait=0).acquire("chat", None) == 0.0
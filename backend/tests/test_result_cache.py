@@ -0,0 +1,130 @@
+import json
+import threading
+import time
+
+import pytest
+
+from model_router import DeadlineExceeded, reset_deadline, set_deadline
+from result_cache import DiskTier, ResultCache, content_key
+
+
+def test_content_key_keeps_part_boundaries():
+    assert content_key("ab", "c") != content_key("a", "bc")
+    assert content_key(b"audio", "x") == content_key(memoryview(b"audio"), "x")
+    assert content_key(["a", "b"]) != content_key("a", "b")
+
+
+def test_lru_eviction_and_stats():
+    cache = ResultCache("t", ttl=60, max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    stats = cache.stats()
+    assert (stats["entries"], stats["evictions"], stats["hits"], stats["misses"]) == (2, 1, 1, 1)
+
+
+def test_entries_expire():
+    cache = ResultCache("t", ttl=0.05)
+    cache.set("a", "value")
+    time.sleep(0.06)
+    assert cache.get("a") is None
+
+
+def test_disabled_cache_always_computes():
+    cache = ResultCache("t", ttl=60, max_entries=0)
+    calls = []
+    assert cache.get_or_compute("k", lambda: calls.append(1) or "v") == "v"
+    assert cache.get_or_compute("k", lambda: calls.append(1) or "v") == "v"
+    assert len(calls) == 2
+
+
+def test_single_flight_coalesces_concurrent_misses():
+    cache = ResultCache("t", ttl=60)
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait(2)
+        return "answer"
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(cache.get_or_compute("k", compute)))
+    leader.start()
+    started.wait(2)
+    followers = [threading.Thread(target=lambda: results.append(cache.get_or_compute("k", compute))) for _ in range(3)]
+    for thread in followers:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in [leader, *followers]:
+        thread.join(2)
+    assert results == ["answer"] * 4
+    assert len(calls) == 1
+    assert cache.stats()["coalesced"] == 3
+
+
+def test_leader_error_reaches_followers_and_is_not_cached():
+    cache = ResultCache("t", ttl=60)
+    with pytest.raises(ValueError):
+        cache.get_or_compute("k", lambda: (_ for _ in ()).throw(ValueError("upstream")))
+    assert cache.get_or_compute("k", lambda: "later") == "later"
+
+
+def test_follower_gives_up_at_its_deadline():
+    cache = ResultCache("t", ttl=60)
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(2)
+        return "late"
+
+    leader = threading.Thread(target=lambda: cache.get_or_compute("k", slow))
+    leader.start()
+    started.wait(2)
+    token = set_deadline(100)
+    try:
+        begun = time.monotonic()
+        with pytest.raises(DeadlineExceeded):
+            cache.get_or_compute("k", slow)
+        assert time.monotonic() - begun < 0.5
+    finally:
+        reset_deadline(token)
+        release.set()
+        leader.join(2)
+    assert cache.get("k") == "late"
+
+
+def test_disk_tier_is_shared_between_caches(tmp_path):
+    disk = DiskTier(str(tmp_path / "cache.sqlite3"))
+    try:
+        ResultCache("score", ttl=60, disk=disk).set("k", {"score": 7})
+        other = ResultCache("score", ttl=60, disk=disk)
+        assert other.get("k") == {"score": 7}
+        assert other.stats()["disk_hits"] == 1
+        assert ResultCache("questions", ttl=60, disk=disk).get("k") is None
+    finally:
+        disk.close()
+
+
+def test_repeated_score_is_served_from_cache(client, nvidia):
+    nvidia.queue_chat(json.dumps({"score": 8, "feedback": ["ok"], "improvements": ["more"]}))
+    body = {"question": "Describe a project you led", "answer": "I led the migration of our billing service and cut failures in half."}
+    assert client.post("/score", json=body).get_json()["score"] == 8
+    assert client.post("/score", json=body).get_json()["score"] == 8
+    assert len(nvidia.requests) == 1
+
+
+def test_realtime_cache_buckets_seconds_but_prompt_keeps_them(client, nvidia):
+    nvidia.queue_chat(json.dumps({"overall_score": 7}))
+    body = {"role": "Engineer", "transcript": "I designed the service and measured latency every week.", "filler_words": 0}
+    client.post("/realtime-score", json={**body, "session_seconds": 31})
+    client.post("/realtime-score", json={**body, "session_seconds": 34})
+    assert len(nvidia.requests) == 1
+    assert "Session seconds: 31" in nvidia.request_json(0)["messages"][0]["content"]
@@ -0,0 +1,52 @@
+import json
+import time
+
+ANSWER = "I led the migration of our billing service to a new queue and cut failures in half."
+
+
+def score_json(score):
+    return json.dumps({"score": score, "feedback": ["ok"], "improvements": ["more detail"]})
+
+
+def test_rejects_empty_and_oversized_batches(client, backend_module, monkeypatch):
+    assert client.post("/score/batch", json={"items": []}).status_code == 400
+    monkeypatch.setattr(backend_module, "SCORE_BATCH_MAX_ITEMS", 2)
+    response = client.post("/score/batch", json={"items": [{}, {}, {}]})
+    assert response.status_code == 400
+    assert "At most 2" in response.get_json()["error"]
+
+
+def test_results_keep_item_order(client, nvidia):
+    nvidia.queue_chat(score_json(8))
+    response = client.post("/score/batch", json={"items": [
+        {"question": "Describe a project you led", "answer": ANSWER},
+        "not an object",
+        {"question": "Why this role?", "answer": ""},
+    ]})
+    assert response.status_code == 200
+    results = response.get_json()["results"]
+    assert results[0]["score"] == 8
+    assert "error" in results[1]
+    assert results[2]["source"] == "prescore" and results[2]["provisional"] is False
+    assert len(nvidia.requests) == 1
+
+
+def test_items_are_scored_concurrently(client, nvidia):
+    for _ in range(3):
+        nvidia.queue_chat(score_json(6), delay=0.3)
+    items = [{"question": f"Question {index} about the project you led", "answer": f"{ANSWER} Case {index}."} for index in range(3)]
+    started = time.monotonic()
+    results = client.post("/score/batch", json={"items": items}).get_json()["results"]
+    assert time.monotonic() - started < 0.8
+    assert [result["score"] for result in results] == [6, 6, 6]
+
+
+def test_failed_item_falls_back_to_provisional_prescore(client, nvidia):
+    nvidia.queue(403, {"detail": "model not enabled"})
+    results = client.post("/score/batch", json={"items": [
+        {"question": "Describe a project you led", "answer": ANSWER},
+    ]}).get_json()["results"]
+    assert results[0]["fallback"] is True
+    assert results[0]["provisional"] is True
+    assert results[0]["source"] == "prescore"
+    assert "model not enabled" in results[0]["error"]
@@ -0,0 +1,95 @@
+import threading
+import time
+
+from serving import AdmissionControl
+
+
+class BlockingApp:
+    # WSGI app that holds each request until released, so tests control how many are in flight.
+    def __init__(self):
+        self.release = threading.Event()
+        self.entered = threading.Semaphore(0)
+
+    def __call__(self, environ, start_response):
+        self.entered.release()
+        if environ["PATH_INFO"] != "/metrics":
+            self.release.wait(5)
+        start_response("200 OK", [("Content-Type", "text/plain")])
+        return [b"ok"]
+
+
+def call(admission, path="/score", method="POST"):
+    status = {}
+
+    def start_response(line, headers):
+        status["line"], status["headers"] = line, dict(headers)
+
+    body = admission({"PATH_INFO": path, "REQUEST_METHOD": method}, start_response)
+    data = b"".join(body)
+    if hasattr(body, "close"):
+        body.close()
+    return status["line"], status["headers"], data
+
+
+def in_background(admission, results):
+    thread = threading.Thread(target=lambda: results.append(call(admission)))
+    thread.start()
+    return thread
+
+
+def test_requests_past_concurrency_and_queue_get_503():
+    app = BlockingApp()
+    admission = AdmissionControl(app, max_concurrency=1, queue_max=1, queue_timeout=5)
+    results = []
+    first = in_background(admission, results)
+    assert app.entered.acquire(timeout=5)
+    second = in_background(admission, results)
+    while admission.waiting == 0:
+        time.sleep(0.001)
+
+    line, headers, _ = call(admission)
+    assert line.startswith("503")
+    assert int(headers["Retry-After"]) >= 1
+
+    app.release.set()
+    first.join(5)
+    second.join(5)
+    assert [line for line, _, _ in results] == ["200 OK", "200 OK"]
+    assert admission.active == 0 and admission.waiting == 0
+
+
+def test_queued_request_times_out():
+    app = BlockingApp()
+    admission = AdmissionControl(app, max_concurrency=1, queue_max=4, queue_timeout=0.05)
+    results = []
+    first = in_background(admission, results)
+    assert app.entered.acquire(timeout=5)
+    assert call(admission)[0].startswith("503")
+    app.release.set()
+    first.join(5)
+
+
+def test_probes_bypass_admission():
+    app = BlockingApp()
+    admission = AdmissionControl(app, max_concurrency=1, queue_max=0, queue_timeout=0)
+    results = []
+    first = in_background(admission, results)
+    assert app.entered.acquire(timeout=5)
+    assert call(admission, "/metrics", "GET")[0] == "200 OK"
+    app.release.set()
+    first.join(5)
+
+
+def test_drain_refuses_new_requests_and_waits_for_running_ones():
+    app = BlockingApp()
+    admission = AdmissionControl(app, max_concurrency=2, queue_max=0, queue_timeout=0)
+    results = []
+    running = in_background(admission, results)
+    assert app.entered.acquire(timeout=5)
+    assert admission.drain(0.05) is False
+    line, headers, _ = call(admission)
+    assert line.startswith("503") and headers["Connection"] == "close"
+    app.release.set()
+    running.join(5)
+    assert admission.drain(1) is True
+    assert results[0][0] == "200 OK"
@@ -0,0 +1,86 @@
+import pytest
+
+from sessions import RealtimeSession, SessionOffsetError, SessionStore
+
+
+def test_append_transcript_skips_resent_overlap():
+    session = RealtimeSession("s1")
+    assert session.append_transcript("Hello there", offset=0) == 11
+    # A retried upload resends text the session already has; only the unseen tail is kept.
+    assert session.append_transcript("there, I am Ada", offset=6) == 10
+    assert session.append_transcript("I am", offset=12) == 0
+    assert session.read(0, session.transcript_length) == "Hello there, I am Ada"
+
+
+def test_append_transcript_rejects_gap():
+    session = RealtimeSession("s1")
+    session.append_transcript("abc")
+    with pytest.raises(SessionOffsetError) as excinfo:
+        session.append_transcript("xyz", offset=5)
+    assert (excinfo.value.expected, excinfo.value.received) == (3, 5)
+
+
+def test_read_spans_chunks():
+    session = RealtimeSession("s1")
+    for delta in ("one ", "two ", "three ", "four"):
+        session.append_transcript(delta)
+    assert session.read(2, 11) == "e two thr"
+    assert session.read(14, 100) == "four"
+    assert session.read(8, 8) == ""
+
+
+def test_answer_follows_question_changes():
+    session = RealtimeSession("s1")
+    session.append_transcript("small talk. ")
+    session.set_question("Tell me about yourself")
+    session.append_transcript("I build ")
+    session.append_transcript("backends.")
+    assert session.snapshot()["answer"] == "I build backends."
+    assert session.snapshot(include_answer=False)["answer"] == ""
+    session.set_question("Tell me about yourself", answer_offset=0)
+    assert session.snapshot()["answer"] == "small talk. I build backends."
+
+
+def test_snapshot_does_not_carry_transcript():
+    session = RealtimeSession("s1", role="Engineer")
+    session.append_transcript("word " * 50)
+    snapshot = session.snapshot()
+    assert "transcript" not in snapshot
+    assert snapshot["word_count"] == 50
+
+
+def test_record_metrics_null_hands_back_to_server():
+    session = RealtimeSession("s1")
+    session.record_metrics({"eye_contact": "7", "face_detected": "true"})
+    assert session.metrics == {"eye_contact": 7, "face_detected": True}
+    session.record_metrics({"eye_contact": None})
+    assert session.metrics == {"face_detected": True}
+    assert session.metric_samples == 2
+
+
+def test_store_evicts_oldest_beyond_capacity():
+    store = SessionStore(max_sessions=2, idle_timeout=60)
+    first = store.create()
+    second = store.create()
+    store.get(first.id)
+    third = store.create()
+    assert store.get(second.id) is None
+    assert store.get(first.id) is first
+    assert store.get(third.id) is third
+    assert len(store) == 2
+
+
+def test_append_route_reports_gap_with_length(client):
+    created = client.post("/realtime/sessions", json={"role": "Engineer", "transcript_delta": "Hello"})
+    assert created.status_code == 201
+    session_id = created.get_json()["session_id"]
+
+    response = client.post(f"/realtime/sessions/{session_id}/append", json={"transcript_delta": " world", "offset": 5})
+    assert response.status_code == 200
+    assert response.get_json()["transcript_length"] == 11
+
+    response = client.post(f"/realtime/sessions/{session_id}/append", json={"transcript_delta": "!", "offset": 20})
+    assert response.status_code == 409
+    assert response.get_json()["transcript_length"] == 11
+
+    assert client.post("/realtime/sessions/missing/append", json={}).status_code == 404
@@ -0,0 +1,76 @@
+import json
+import os
+import stat
+
+import pytest
+
+import settings
+from settings import SettingsStore
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "nvidia_settings.json")
+
+
+def write(path, payload):
+    with open(path, "w", encoding="utf-8") as file_obj:
+        json.dump(payload, file_obj)
+    # Make sure the signature changes even when the filesystem timestamp does not.
+    os.utime(path, ns=(os.stat(path).st_atime_ns, os.stat(path).st_mtime_ns + 1_000_000))
+
+
+def test_defaults_without_a_file(path):
+    current = SettingsStore(path).current()
+    assert current.api_key is None
+    assert current.model == settings.DEFAULT_MODEL
+    assert current.sources["model"] == "default"
+
+
+def test_change_by_another_process_is_picked_up(path):
+    changes = []
+    store = SettingsStore(path, check_interval=0, on_change=changes.append)
+    write(path, {"nvidia_api_key": "saved-key", "base_url": "http://nim.local/v1/"})
+    current = store.current()
+    assert (current.api_key, current.base_url) == ("saved-key", "http://nim.local/v1")
+    assert current.stt_api_key == "saved-key" and current.sources["stt_api_key"] == "saved"
+    assert len(changes) == 1
+    store.current()
+    assert len(changes) == 1
+
+
+def test_reads_within_the_interval_use_the_snapshot(path):
+    store = SettingsStore(path, check_interval=60)
+    write(path, {"nvidia_api_key": "saved-key"})
+    assert store.current().api_key is None
+    assert store.reload().api_key == "saved-key"
+
+
+def test_update_merges_and_removes_fields(path):
+    store = SettingsStore(path, check_interval=60)
+    write(path, {"model": "other/model"})
+    store.update(api_key=" new-key ")
+    with open(path, encoding="utf-8") as file_obj:
+        assert json.load(file_obj) == {"model": "other/model", "nvidia_api_key": "new-key"}
+    assert store.current().model == "other/model"
+    if os.name == "posix":
+        assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+
+    store.update(model="")
+    assert store.current().model == settings.DEFAULT_MODEL
+    with pytest.raises(ValueError):
+        store.update(colour="blue")
+
+
+def test_environment_overrides_saved_values(path, monkeypatch):
+    write(path, {"nvidia_api_key": "saved-key", "nvidia_stt_api_key": "saved-stt"})
+    monkeypatch.setenv("NVIDIA_API_KEY", "env-key")
+    current = SettingsStore(path).current()
+    assert (current.api_key, current.sources["api_key"]) == ("env-key", "environment")
+    assert (current.stt_api_key, current.sources["stt_api_key"]) == ("saved-stt", "saved")
+
+
+def test_corrupt_file_reads_as_empty(path):
+    with open(path, "w", encoding="utf-8") as file_obj:
+        file_obj.write("{not json")
+    assert SettingsStore(path).current().api_key is None
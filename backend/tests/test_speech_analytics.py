@@ -0,0 +1,57 @@
+import pytest
+
+import speech_analytics
+from speech_analytics import SpeechAnalytics, analyze_transcript, pace_wpm
+
+
+def test_fillers_split_across_deltas_are_counted_once():
+    analytics = SpeechAnalytics()
+    for delta in ["So um I think you", " know the like", "ly answer is ", "basic", "ally fine"]:
+        analytics.add_text(delta)
+    snapshot = analytics.snapshot()
+    assert snapshot["filler_counts"] == {"um": 1, "you know": 1, "basically": 1}
+    assert snapshot["word_count"] == 12
+
+
+def test_held_back_word_counts_in_snapshots():
+    analytics = SpeechAnalytics()
+    analytics.add_text("well um")
+    assert analytics.snapshot()["filler_counts"] == {"um": 1}
+    analytics.add_text("brella")
+    assert analytics.snapshot()["filler_counts"] == {}
+
+
+def test_pace_needs_enough_time_or_words():
+    assert pace_wpm(5, 2) is None
+    assert pace_wpm(30, 2) == 900
+    assert pace_wpm(5, speech_analytics.WPM_MIN_SECONDS) == 30
+    assert pace_wpm(100, None) is None
+    assert analyze_transcript("hello there", session_seconds=3)["wpm"] is None
+
+
+def test_rolling_wpm_forgets_old_speech():
+    analytics = SpeechAnalytics(window_seconds=10)
+    analytics.add_text("one two three four five six seven eight nine ten eleven twelve thirteen fourteen fifteen ", at=1)
+    analytics.add_text("sixteen seventeen eighteen nineteen twenty twentyone twentytwo twentythree twentyfour twentyfive ", at=25)
+    snapshot = analytics.snapshot(now=30)
+    assert snapshot["wpm"] == 60.0
+    assert snapshot["average_wpm"] == 50.0
+
+
+def test_pauses_count_once_speech_resumes(monkeypatch):
+    analytics = SpeechAnalytics()
+    analytics.add_audio(1.0, voiced=True)
+    analytics.add_audio(1.5, voiced=False)
+    analytics.add_audio(0.5, voiced=True)
+    analytics.add_audio(3.5, voiced=False)
+    analytics.add_audio(0.5, voiced=True)
+    analytics.add_audio(2.0, voiced=False)
+    pauses = analytics.snapshot()["pauses"]
+    assert (pauses["count"], pauses["long"], pauses["longest_seconds"]) == (2, 1, 3.5)
+    assert pauses["current_silence_seconds"] == 2.0
+    assert analytics.snapshot()["speaking_ratio"] == pytest.approx(2 / 9, abs=0.001)
+
+
+def test_heuristic_leaves_pace_out_early(backend_module):
+    result = backend_module.simulator._heuristic_realtime_score("I think so", 3, 0, {})
+    assert result["feedback"][0] == "Not enough speech yet to measure your pace."
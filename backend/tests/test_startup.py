@@ -0,0 +1,69 @@
+import threading
+
+import pytest
+
+from startup import Startup
+
+
+@pytest.fixture
+def fresh_startup(backend_module, monkeypatch):
+    # /readyz reports on the module's Startup; a fresh one keeps the real warm-up out of the tests.
+    fresh = Startup(timeout=5)
+    monkeypatch.setattr(backend_module, "startup", fresh)
+    monkeypatch.setattr(backend_module, "start_background_work", lambda: None)
+    return fresh
+
+
+def test_warm_up_records_each_check_and_turns_ready():
+    startup = Startup(timeout=5)
+    startup.warm_up([("ok", lambda: None), ("skipped", lambda: "skipped: no key"), ("broken", lambda: 1 / 0)])
+    assert startup._done.wait(5)
+    report = startup.report()
+    assert report["ready"] and report["warmup_complete"]
+    assert [report["checks"][name]["status"] for name in ("ok", "skipped")] == ["ok", "skipped: no key"]
+    assert report["checks"]["broken"]["status"].startswith("failed:")
+    assert list(report["phases"])[-1] == "ready"
+
+
+def test_slow_warm_up_is_ready_after_the_timeout():
+    release = threading.Event()
+    startup = Startup(timeout=0)
+    assert not startup.ready
+    startup.warm_up([("slow", lambda: release.wait(5) and None)])
+    assert startup.ready and not startup.report()["warmup_complete"]
+    release.set()
+
+
+def test_mark_keeps_the_first_time():
+    startup = Startup()
+    first = startup.mark("listening")
+    startup.mark("listening")
+    assert startup.phases["listening"] == first
+
+
+def test_launcher_delay_from_env(monkeypatch):
+    import startup as startup_module
+
+    monkeypatch.setenv("BACKEND_LAUNCHED_AT", str((startup_module.IMPORT_STARTED_WALL - 2) * 1000))
+    assert startup_module.launcher_delay() == pytest.approx(2, abs=0.01)
+    monkeypatch.setenv("BACKEND_LAUNCHED_AT", "soon")
+    assert startup_module.launcher_delay() is None
+
+
+def test_healthz_answers_without_warm_up(client, fresh_startup):
+    assert client.get("/healthz").get_json()["status"] == "ok"
+
+
+def test_readyz_reports_warming_up_then_ready(client, fresh_startup):
+    release = threading.Event()
+    fresh_startup.warm_up([("completion", lambda: release.wait(5) and None)])
+    response = client.get("/readyz")
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    assert response.get_json()["status"] == "warming_up"
+
+    release.set()
+    assert fresh_startup._done.wait(5)
+    response = client.get("/readyz")
+    assert response.status_code == 200
+    assert response.get_json()["checks"]["completion"]["status"] == "ok"
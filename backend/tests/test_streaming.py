@@ -0,0 +1,54 @@
+import json
+
+
+def sse_events(response):
+    events = []
+    for block in response.get_data(as_text=True).strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_generate_stream_emits_each_question_as_it_completes(client, nvidia):
+    nvidia.queue_stream(["1. What is ", "a closure?\n2. Explain", " REST.\n", "3. Describe a conflict."])
+    response = client.post("/generate/stream", json={"job_role": "Engineer", "job_description": "APIs"})
+    assert response.status_code == 200
+    assert response.mimetype == "text/event-stream"
+    events = sse_events(response)
+    assert [event for event, _ in events] == ["question", "question", "question", "done"]
+    assert events[1][1] == {"index": 1, "question": "2. Explain REST."}
+    assert events[-1][1]["questions"] == ["1. What is a closure?", "2. Explain REST.", "3. Describe a conflict."]
+    assert nvidia.request_json(0)["stream"] is True
+
+
+def test_score_stream_sends_prescore_then_score_then_result(client, nvidia):
+    nvidia.queue_stream(['{"score": 7', ', "feedback": ["Clear"], ', '"improvements": ["Add numbers"]}'])
+    response = client.post("/score/stream", json={
+        "question": "Describe a project you led",
+        "answer": "I led the migration of our billing service to a new queue and cut failures in half.",
+    })
+    events = sse_events(response)
+    assert [event for event, _ in events] == ["prescore", "score", "result"]
+    assert events[0][1]["provisional"] is True
+    assert events[1][1] == {"score": 7}
+    assert events[2][1]["score"] == 7
+
+
+def test_score_stream_settles_trivial_answer_locally(client, nvidia):
+    events = sse_events(client.post("/score/stream", json={"question": "Why this role?", "answer": ""}))
+    assert [event for event, _ in events] == ["result"]
+    assert events[0][1]["provisional"] is False
+    assert nvidia.requests == []
+
+
+def test_stream_without_key_is_a_plain_json_error(client):
+    response = client.post("/generate/stream", json={"job_role": "Engineer"})
+    assert response.status_code == 400
+    assert "NVIDIA_API_KEY" in response.get_json()["error"]
+
+
+def test_upstream_failure_before_first_event_maps_to_http_error(client, nvidia):
+    nvidia.queue(401, {"detail": "invalid key"})
+    response = client.post("/generate/stream", json={"job_role": "Engineer"})
+    assert response.status_code == 401
+    assert "authentication failed" in response.get_json()["error"]
@@ -0,0 +1,112 @@
+import os
+
+import telemetry
+
+
+def test_counter_and_gauge_render_with_escaped_labels():
+    counter = telemetry.Counter("demo_total", "Demo counter.", ("route",))
+    counter.inc(route='/a"b')
+    counter.inc(2, route='/a"b')
+    counter.set_total(7, route="/c")
+    assert counter.render() == [
+        "# HELP demo_total Demo counter.",
+        "# TYPE demo_total counter",
+        'demo_total{route="/a\\"b"} 3',
+        'demo_total{route="/c"} 7',
+    ]
+    gauge = telemetry.Gauge("demo_open", "Demo gauge.")
+    gauge.inc()
+    gauge.dec()
+    gauge.set(1.5)
+    assert gauge.render()[-1] == "demo_open 1.5"
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = telemetry.Histogram("demo_seconds", "Demo histogram.", buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(value)
+    lines = histogram.render()[2:]
+    assert lines == [
+        'demo_seconds_bucket{le="0.1"} 1',
+        'demo_seconds_bucket{le="1.0"} 2',
+        'demo_seconds_bucket{le="+Inf"} 3',
+        "demo_seconds_sum 5.55",
+        "demo_seconds_count 3",
+    ]
+
+
+def test_registry_runs_collectors_before_rendering():
+    registry = telemetry.Registry()
+    gauge = registry.register(telemetry.Gauge("demo_items", "Items."))
+    registry.add_collector(lambda: gauge.set(4))
+    assert "demo_items 4" in registry.render()
+
+
+def test_phases_are_added_to_the_current_request_only():
+    timings, token = telemetry.start_timings()
+    try:
+        with telemetry.phase("parse"):
+            pass
+        telemetry.add_phase("parse", 0.002)
+    finally:
+        telemetry.finish_timings(token)
+    telemetry.add_phase("parse", 1.0)
+    assert timings.phases["parse"] < 0.5
+    assert timings.header().startswith("parse;dur=")
+
+
+def test_responses_carry_server_timing_and_count_requests(client):
+    response = client.post("/score", json={"question": "Why this role?", "answer": ""})
+    assert "parse;dur=" in response.headers["Server-Timing"]
+    assert "total;dur=" in response.headers["Server-Timing"]
+    metrics = client.get("/metrics").get_data(as_text=True)
+    assert 'http_requests_total{route="/score",method="POST",status="200"}' in metrics
+    assert "# TYPE result_cache_lookups_total counter" in metrics
+
+
+def test_profile_header_has_an_id_but_no_path(client, monkeypatch, tmp_path):
+    monkeypatch.setattr(telemetry, "PROFILE_ROUTES", {"/score"})
+    monkeypatch.setattr(telemetry, "PROFILE_SAMPLE_RATE", 1.0)
+    monkeypatch.setattr(telemetry, "PROFILE_DIR", str(tmp_path))
+    header = client.post("/score", json={"question": "Why this role?", "answer": ""}).headers["Server-Timing"]
+    profile_id = header.split('profile;desc="', 1)[1].split('"', 1)[0]
+    assert "/" not in profile_id and str(tmp_path) not in header
+    assert [name for name in os.listdir(tmp_path) if profile_id in name]
+
+
+def test_only_one_request_is_profiled_at_a_time(tmp_path, monkeypatch):
+    monkeypatch.setattr(telemetry, "PROFILE_DIR", str(tmp_path))
+    first = telemetry.start_profile()
+    try:
+        assert first is not None
+        assert telemetry.start_profile() is None
+    finally:
+        assert telemetry.finish_profile(first, "/score") is not None
+    second = telemetry.start_profile()
+    assert second is not None
+    telemetry.discard_profile(second)
+
+
+def test_profiler_that_cannot_start_is_skipped(monkeypatch):
+    class BusyProfile:
+        def enable(self):
+            raise ValueError("Another profiling tool is already active")
+
+    monkeypatch.setattr(telemetry.cProfile, "Profile", BusyProfile)
+    assert telemetry.start_profile() is None
+    assert telemetry._profile_lock.acquire(blocking=False)
+    telemetry._profile_lock.release()
+
+
+def test_unwritable_profile_dir_does_not_fail_the_request(client, monkeypatch, tmp_path):
+    blocker = tmp_path / "not-a-directory"
+    blocker.write_text("")
+    monkeypatch.setattr(telemetry, "PROFILE_ROUTES", {"/score"})
+    monkeypatch.setattr(telemetry, "PROFILE_SAMPLE_RATE", 1.0)
+    monkeypatch.setattr(telemetry, "PROFILE_DIR", str(blocker / "profiles"))
+    response = client.post("/score", json={"question": "Why this role?", "answer": ""})
+    assert response.status_code == 200
+    assert "profile;" not in response.headers["Server-Timing"]
+    # The profiler slot was handed back for the next sampled request.
+    assert telemetry._profile_lock.acquire(blocking=False)
+    telemetry._profile_lock.release()
@@ -0,0 +1,136 @@
+import time
+from urllib.parse import urlsplit
+
+import pytest
+
+from upstream import CircuitBreaker, CircuitOpenError, DeadlineExceeded, NvidiaAPIError, UpstreamClient, parse_retry_after
+
+
+def make_client(**overrides):
+    options = {"max_retries": 2, "backoff_base": 0.001, "backoff_cap": 0.01, "breaker_threshold": 5, "breaker_reset": 30.0}
+    options.update(overrides)
+    return UpstreamClient(**options)
+
+
+def test_keeps_connection_alive_between_calls(upstream_server):
+    client = make_client()
+    try:
+        assert client.post_json(f"{upstream_server.url}/v1/chat", {"n": 1}, "key") == {}
+        assert client.post_json(f"{upstream_server.url}/v1/chat", {"n": 2}, "key") == {}
+    finally:
+        client.close()
+    assert len(set(upstream_server.ports)) == 1
+
+
+def test_retries_server_errors_then_succeeds(upstream_server):
+    upstream_server.queue(503, {"detail": "busy"})
+    upstream_server.queue(200, {"ok": True})
+    client = make_client()
+    try:
+        assert client.post_json(f"{upstream_server.url}/v1/chat", {}, "key") == {"ok": True}
+    finally:
+        client.close()
+    assert len(upstream_server.requests) == 2
+
+
+def test_gives_up_after_max_retries_with_upstream_message(upstream_server):
+    for _ in range(3):
+        upstream_server.queue(502, {"detail": "bad gateway"})
+    client = make_client(max_retries=2, breaker_threshold=10)
+    try:
+        with pytest.raises(NvidiaAPIError) as excinfo:
+            client.post_json(f"{upstream_server.url}/v1/chat", {}, "key")
+    finally:
+        client.close()
+    assert excinfo.value.status_code == 502
+    assert "bad gateway" in str(excinfo.value)
+    assert len(upstream_server.requests) == 3
+
+
+def test_client_errors_are_not_retried(upstream_server):
+    upstream_server.queue(400, {"message": "bad prompt"})
+    client = make_client()
+    try:
+        with pytest.raises(NvidiaAPIError) as excinfo:
+            client.post_json(f"{upstream_server.url}/v1/chat", {}, "key")
+    finally:
+        client.close()
+    assert excinfo.value.status_code == 400
+    assert len(upstream_server.requests) == 1
+
+
+def test_breaker_opens_after_threshold_and_fails_fast(upstream_server):
+    for _ in range(2):
+        upstream_server.queue(500, {})
+    client = make_client(max_retries=1, breaker_threshold=2)
+    url = f"{upstream_server.url}/v1/chat"
+    try:
+        with pytest.raises(NvidiaAPIError):
+            client.post_json(url, {}, "key")
+        assert not client.is_available(url)
+        with pytest.raises(CircuitOpenError):
+            client.post_json(url, {}, "key")
+    finally:
+        client.close()
+    assert len(upstream_server.requests) == 2
+
+
+def test_half_open_breaker_lets_one_probe_through():
+    breaker = CircuitBreaker("host", failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+    time.sleep(0.06)
+    assert breaker.state == "half_open"
+    breaker.before_request()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after("-1") == 0.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+
+
+def test_spent_deadline_does_not_hold_the_half_open_probe(upstream_server):
+    remaining = [None]
+    client = make_client(breaker_threshold=1, breaker_reset=0.05, deadline=lambda: remaining[0])
+    url = f"{upstream_server.url}/v1/chat"
+    host = urlsplit(url).netloc
+    try:
+        client.breaker_for(host).record_failure()
+        time.sleep(0.06)
+        remaining[0] = -1.0
+        with pytest.raises(DeadlineExceeded):
+            client.post_json(url, {}, "key")
+        remaining[0] = None
+        assert client.post_json(url, {}, "key") == {}
+        assert client.breaker_states()[host] == "closed"
+    finally:
+        client.close()
+    assert len(upstream_server.requests) == 1
+
+
+def test_probe_cut_short_by_the_deadline_is_released(upstream_server):
+    upstream_server.queue(200, {}, delay=0.5)
+    deadline_at = [time.monotonic() + 30]
+    client = make_client(breaker_threshold=1, breaker_reset=0.05, deadline=lambda: deadline_at[0] - time.monotonic())
+    url = f"{upstream_server.url}/v1/chat"
+    host = urlsplit(url).netloc
+    try:
+        client.breaker_for(host).record_failure()
+        time.sleep(0.06)
+        deadline_at[0] = time.monotonic() + 0.1
+        with pytest.raises(DeadlineExceeded):
+            client.post_json(url, {}, "key")
+        assert client.breaker_states()[host] == "half_open"
+        deadline_at[0] = time.monotonic() + 30
+        assert client.post_json(url, {}, "key") == {}
+        assert client.breaker_states()[host] == "closed"
+    finally:
+        client.close()
@@ -0,0 +1,60 @@
+import io
+
+import pytest
+
+pytest.importorskip("numpy")
+Image = pytest.importorskip("PIL.Image")
+
+from vision import VisualTracker, analyze_frame, visual_scores  # noqa: E402
+
+SKIN = (224, 172, 140)
+BACKDROP = (40, 60, 90)
+
+
+def frame(background=BACKDROP, face_box=None, size=(320, 240)):
+    image = Image.new("RGB", size, background)
+    if face_box is not None:
+        image.paste(SKIN, face_box)
+    output = io.BytesIO()
+    image.save(output, format="PNG")
+    return output.getvalue()
+
+
+def test_centered_face_scores_well():
+    analysis = analyze_frame(frame(face_box=(120, 70, 200, 170)))
+    assert analysis.face_detected
+    cx, cy = analysis.face_center
+    assert abs(cx - 0.5) < 0.05 and abs(cy - 0.5) < 0.05
+    assert analysis.scores()["eye_contact"] >= 8
+
+
+def test_no_face_and_dark_frame():
+    scores = visual_scores(frame(background=(10, 10, 10)))
+    assert scores["face_detected"] is False
+    assert scores["eye_contact"] == 3
+    assert scores["lighting"] == 1
+    assert scores["source"] == "server"
+
+
+def test_off_center_face_loses_eye_contact():
+    centered = analyze_frame(frame(face_box=(120, 70, 200, 170))).scores()["eye_contact"]
+    corner = analyze_frame(frame(face_box=(0, 0, 60, 60))).scores()["eye_contact"]
+    assert corner < centered
+
+
+def test_unreadable_frame_is_ignored():
+    assert analyze_frame(b"not an image") is None
+    assert visual_scores(None) is None
+
+
+def test_tracker_smooths_and_reports_stability():
+    tracker = VisualTracker(alpha=0.5)
+    still = frame(face_box=(120, 70, 200, 170))
+    first = visual_scores(still, tracker)
+    assert "stability" not in first
+    second = visual_scores(still, tracker)
+    assert second["stability"] == 10
+    dark = visual_scores(frame(background=(10, 10, 10), face_box=(120, 70, 200, 170)), tracker)
+    # Half-way between the previous lighting and the dark frame's, not a jump straight down.
+    assert 1 < dark["lighting"] < second["lighting"]
+    assert tracker.frames == 3
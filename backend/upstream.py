@@ -0,0 +1,453 @@
+import http.client
+import json
+import math
+import random
+import socket
+import ssl
+import threading
+import time
+from urllib.parse import urlsplit
+
+import telemetry
+from envconfig import env_float, env_int
+
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+BREAKER_STATUS_CODES = {500, 502, 503, 504}
+
+
+class NvidiaAPIError(Exception):
+    def __init__(self, status_code, message):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class CircuitOpenError(NvidiaAPIError):
+    def __init__(self, host, retry_in):
+        super().__init__(
+            503,
+            f"NVIDIA API temporarily unavailable for {host}; retrying in {max(1, int(retry_in))}s.",
+        )
+        self.retry_in = retry_in
+
+
+class RateLimitedError(NvidiaAPIError):
+    # Raised before sending: the API key's request budget would not free up within the caller's wait limit.
+    def __init__(self, endpoint, retry_after):
+        super().__init__(
+            429,
+            f"NVIDIA API rate limit reached for the {endpoint} key; retry in {max(1, math.ceil(retry_after))}s.",
+        )
+        self.retry_after = retry_after
+
+
+class DeadlineExceeded(NvidiaAPIError):
+    def __init__(self, task):
+        super().__init__(504, f"Client deadline exceeded before the {task} model answered.")
+        self.task = task
+
+
+def default_timeouts():
+    connect_timeout = env_float("NVIDIA_CONNECT_TIMEOUT", 5)
+    return {
+        "chat": (connect_timeout, env_float("NVIDIA_CHAT_TIMEOUT", 60)),
+        "stt": (connect_timeout, env_float("NVIDIA_STT_TIMEOUT", 120)),
+    }
+
+
+def parse_retry_after(value):
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def error_message_from_body(payload, fallback):
+    try:
+        details = json.loads(payload.decode("utf-8"))
+        return details.get("detail") or details.get("message") or str(details)
+    except Exception:
+        return fallback
+
+
+class CircuitBreaker:
+    def __init__(self, name, failure_threshold=5, reset_timeout=30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                return "open"
+            return "half_open"
+
+    def before_request(self):
+        with self._lock:
+            if self._opened_at is None:
+                return
+            remaining = self.reset_timeout - (time.monotonic() - self._opened_at)
+            if remaining > 0:
+                raise CircuitOpenError(self.name, remaining)
+            # Half-open: let exactly one probe through, everyone else keeps failing fast.
+            if self._probe_in_flight:
+                raise CircuitOpenError(self.name, 1)
+            self._probe_in_flight = True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._probe_in_flight or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+    def release_probe(self):
+        # The call ended without a verdict on the host (the client gave up); the next caller may probe instead.
+        with self._lock:
+            self._probe_in_flight = False
+
+
+class ConnectionPool:
+    def __init__(self, scheme, host, port, max_idle=8, idle_timeout=45.0):
+        self.scheme = scheme
+        self.host = host
+        self.port = port
+        self.max_idle = max_idle
+        self.idle_timeout = idle_timeout
+        self._idle = []
+        self._lock = threading.Lock()
+        self._ssl_context = ssl.create_default_context() if scheme == "https" else None
+
+    def _new_connection(self, connect_timeout):
+        if self.scheme == "https":
+            conn = http.client.HTTPSConnection(self.host, self.port, timeout=connect_timeout, context=self._ssl_context)
+        else:
+            conn = http.client.HTTPConnection(self.host, self.port, timeout=connect_timeout)
+        conn.connect()
+        # Multipart bodies go out as several writes; without NODELAY Nagle can hold the tail back.
+        conn.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return conn
+
+    def acquire(self, connect_timeout, fresh=False):
+        if not fresh:
+            with self._lock:
+                while self._idle:
+                    conn, idle_since = self._idle.pop()
+                    if time.monotonic() - idle_since < self.idle_timeout and conn.sock is not None:
+                        return conn, True
+                    conn.close()
+        return self._new_connection(connect_timeout), False
+
+    def prewarm(self, count, connect_timeout):
+        # Open connections ahead of the first request so it does not pay the TCP and TLS handshakes.
+        with self._lock:
+            missing = max(0, count - len(self._idle))
+        for _ in range(missing):
+            self.release(self._new_connection(connect_timeout))
+        return missing
+
+    def release(self, conn):
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append((conn, time.monotonic()))
+                return
+        conn.close()
+
+    @staticmethod
+    def discard(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn, _ in idle:
+            self.discard(conn)
+
+
+class UpstreamClient:
+    def __init__(self, timeouts=None, max_retries=None, backoff_base=None, backoff_cap=None, pool_size=None, breaker_threshold=None, breaker_reset=None, rate_limiter=None, deadline=None):
+        self.timeouts = timeouts or default_timeouts()
+        self.rate_limiter = rate_limiter
+        # deadline() -> seconds left for the current request, or None; it caps socket timeouts and retry sleeps.
+        self.deadline = deadline
+        self.max_retries = max_retries if max_retries is not None else env_int("NVIDIA_MAX_RETRIES", 2)
+        self.backoff_base = backoff_base if backoff_base is not None else env_float("NVIDIA_RETRY_BACKOFF", 0.5)
+        self.backoff_cap = backoff_cap if backoff_cap is not None else env_float("NVIDIA_RETRY_BACKOFF_CAP", 8.0)
+        self.pool_size = pool_size if pool_size is not None else env_int("NVIDIA_POOL_SIZE", 8)
+        self.breaker_threshold = breaker_threshold if breaker_threshold is not None else env_int("NVIDIA_BREAKER_THRESHOLD", 5)
+        self.breaker_reset = breaker_reset if breaker_reset is not None else env_float("NVIDIA_BREAKER_RESET", 30.0)
+        self._pools = {}
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def _pool_for(self, parts):
+        key = (parts.scheme, parts.hostname, parts.port)
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool is None:
+                port = parts.port or (443 if parts.scheme == "https" else 80)
+                pool = ConnectionPool(parts.scheme, parts.hostname, port, max_idle=self.pool_size)
+                self._pools[key] = pool
+            return pool
+
+    def breaker_for(self, host):
+        with self._lock:
+            breaker = self._breakers.get(host)
+            if breaker is None:
+                breaker = CircuitBreaker(host, self.breaker_threshold, self.breaker_reset)
+                self._breakers[host] = breaker
+            return breaker
+
+    def breaker_states(self):
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {host: breaker.state for host, breaker in breakers.items()}
+
+    def prewarm(self, url, connections=1):
+        parts = urlsplit(url)
+        return self._pool_for(parts).prewarm(min(connections, self.pool_size), self.timeouts["chat"][0])
+
+    def is_available(self, url):
+        return self.breaker_for(urlsplit(url).netloc).state != "open"
+
+    def _backoff_delay(self, attempt, retry_after=None):
+        delay = random.uniform(0, min(self.backoff_cap, self.backoff_base * (2 ** attempt)))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    def _remaining(self, endpoint):
+        remaining = self.deadline() if self.deadline is not None else None
+        if remaining is not None and remaining <= 0:
+            raise DeadlineExceeded(endpoint)
+        return remaining
+
+    def _sleep(self, delay, endpoint):
+        # A backoff that would outlast the deadline gives up now instead of sleeping into a certain 504.
+        remaining = self._remaining(endpoint)
+        if remaining is not None and delay >= remaining:
+            raise DeadlineExceeded(endpoint)
+        time.sleep(delay)
+
+    def _open(self, pool, method, path, body, headers, connect_timeout, read_timeout):
+        fresh = False
+        while True:
+            conn, reused = pool.acquire(connect_timeout, fresh=fresh)
+            try:
+                conn.sock.settimeout(read_timeout)
+                conn.request(method, path, body=body, headers=headers)
+                return conn, conn.getresponse()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                pool.discard(conn)
+                # The server dropped an idle keep-alive socket; retry once on a new connection.
+                if reused:
+                    fresh = True
+                    continue
+                raise
+            except BaseException:
+                pool.discard(conn)
+                raise
+
+    @staticmethod
+    def _finish(pool, conn, response):
+        if response.will_close:
+            pool.discard(conn)
+        else:
+            pool.release(conn)
+
+    def _open_with_retries(self, method, url, body, headers, endpoint):
+        parts = urlsplit(url)
+        path = parts.path + (f"?{parts.query}" if parts.query else "")
+        pool = self._pool_for(parts)
+        breaker = self.breaker_for(parts.netloc)
+        connect_timeout, read_timeout = self.timeouts.get(endpoint, self.timeouts["chat"])
+        limit_key = (headers or {}).get("Authorization", "")
+
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire(endpoint, limit_key)
+            # Checked before the breaker admits the call, so a spent deadline never takes the half-open probe.
+            remaining = self._remaining(endpoint)
+            breaker.before_request()
+            conn = None
+            try:
+                conn, response = self._open(
+                    pool,
+                    method,
+                    path,
+                    body,
+                    headers or {},
+                    connect_timeout if remaining is None else min(connect_timeout, remaining),
+                    read_timeout if remaining is None else min(read_timeout, remaining),
+                )
+                payload = b""
+                if response.status >= 400:
+                    payload = response.read()
+                    self._finish(pool, conn, response)
+            except (OSError, http.client.HTTPException) as exc:
+                if conn is not None:
+                    pool.discard(conn)
+                # A socket timeout cut short by the client's deadline says nothing about the host's health.
+                if remaining is not None and self.deadline() <= 0:
+                    breaker.release_probe()
+                    raise DeadlineExceeded(endpoint) from None
+                breaker.record_failure()
+                if attempt >= self.max_retries:
+                    raise NvidiaAPIError(503, f"Network error while contacting NVIDIA API: {exc}") from None
+                self._sleep(self._backoff_delay(attempt), endpoint)
+                attempt += 1
+                telemetry.upstream_retry(endpoint)
+                continue
+            except BaseException:
+                breaker.release_probe()
+                raise
+
+            status = response.status
+            if status in BREAKER_STATUS_CODES:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+
+            if status < 400:
+                return pool, conn, response
+
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            if status == 429 and self.rate_limiter is not None:
+                # The limiter now holds the retry back for Retry-After (or refuses it), so no extra sleep here.
+                self.rate_limiter.penalize(endpoint, limit_key, retry_after)
+                if attempt < self.max_retries:
+                    attempt += 1
+                    telemetry.upstream_retry(endpoint)
+                    continue
+
+            if status in RETRYABLE_STATUS_CODES and attempt < self.max_retries:
+                if retry_after is None or retry_after <= self.backoff_cap:
+                    self._sleep(self._backoff_delay(attempt, retry_after), endpoint)
+                    attempt += 1
+                    telemetry.upstream_retry(endpoint)
+                    continue
+
+            raise NvidiaAPIError(status, error_message_from_body(payload, response.reason))
+
+    @staticmethod
+    def _status_label(exc):
+        if isinstance(exc, CircuitOpenError):
+            return "circuit_open"
+        if isinstance(exc, RateLimitedError):
+            return "rate_limited"
+        return str(exc.status_code) if isinstance(exc, NvidiaAPIError) else "error"
+
+    def request(self, method, url, body=None, headers=None, endpoint="chat"):
+        started = time.perf_counter()
+        status, payload = "error", b""
+        telemetry.upstream_started(endpoint)
+        try:
+            pool, conn, response = self._open_with_retries(method, url, body, headers, endpoint)
+            status = str(response.status)
+            try:
+                payload = response.read()
+            except (OSError, http.client.HTTPException) as exc:
+                pool.discard(conn)
+                raise NvidiaAPIError(503, f"Network error while reading NVIDIA API response: {exc}") from None
+            self._finish(pool, conn, response)
+            return response.headers, payload
+        except Exception as exc:
+            status = self._status_label(exc)
+            raise
+        finally:
+            telemetry.upstream_finished(endpoint, status, time.perf_counter() - started, telemetry.body_size(body), len(payload))
+
+    def stream_lines(self, method, url, body=None, headers=None, endpoint="chat"):
+        started = time.perf_counter()
+        status, received = "error", 0
+        telemetry.upstream_started(endpoint)
+        completed = False
+        pool = conn = None
+        try:
+            pool, conn, response = self._open_with_retries(method, url, body, headers, endpoint)
+            status = str(response.status)
+            while True:
+                line = response.readline()
+                if not line:
+                    break
+                received += len(line)
+                yield line.decode("utf-8", "replace").rstrip("\r\n")
+            completed = True
+        except (OSError, http.client.HTTPException) as exc:
+            status = "error"
+            raise NvidiaAPIError(503, f"Network error while streaming from NVIDIA API: {exc}") from None
+        except NvidiaAPIError as exc:
+            status = self._status_label(exc)
+            raise
+        finally:
+            # A consumer that stops early leaves unread bytes on the socket, so it cannot be reused.
+            if conn is not None:
+                if completed:
+                    self._finish(pool, conn, response)
+                else:
+                    pool.discard(conn)
+            telemetry.upstream_finished(endpoint, status, time.perf_counter() - started, telemetry.body_size(body), received)
+
+    @staticmethod
+    def _json_headers(api_key, accept="application/json"):
+        return {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+            "Accept": accept,
+        }
+
+    def post_json(self, url, payload, api_key, endpoint="chat"):
+        _, body = self.request(
+            "POST",
+            url,
+            body=json.dumps(payload).encode("utf-8"),
+            headers=self._json_headers(api_key),
+            endpoint=endpoint,
+        )
+        return json.loads(body.decode("utf-8"))
+
+    def stream_sse_json(self, url, payload, api_key, endpoint="chat"):
+        lines = self.stream_lines(
+            "POST",
+            url,
+            body=json.dumps(payload).encode("utf-8"),
+            headers=self._json_headers(api_key, accept="text/event-stream"),
+            endpoint=endpoint,
+        )
+        try:
+            for line in lines:
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+                try:
+                    yield json.loads(data)
+                except ValueError:
+                    continue
+        finally:
+            lines.close()
+
+    def close(self):
+        with self._lock:
+            pools = list(self._pools.values())
+            self._pools.clear()
+        for pool in pools:
+            pool.close()
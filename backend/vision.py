@@ -0,0 +1,178 @@
+import io
+import threading
+
+from upstream import env_float, env_int
+
+try:
+    import numpy as np
+except Exception:
+    np = None
+
+try:
+    from PIL import Image
+except Exception:
+    Image = None
+
+
+ANALYSIS_WIDTH = max(16, env_int("VISION_ANALYSIS_WIDTH", 128))
+EMA_ALPHA = min(1.0, max(0.01, env_float("VISION_EMA_ALPHA", 0.35)))
+MIN_FACE_COVERAGE = 0.02
+THUMBNAIL_BLOCK = 4
+
+# Classic YCbCr skin-tone box; robust enough for a webcam head-and-shoulders shot.
+SKIN_CB = (77, 127)
+SKIN_CR = (133, 173)
+
+
+def is_available():
+    return np is not None and Image is not None
+
+
+def clamp_score(value):
+    return max(1, min(10, int(round(value))))
+
+
+def map_range_to_score(value, low, high):
+    if high <= low:
+        return 6
+    return clamp_score(1 + ((value - low) / (high - low)) * 9)
+
+
+def decode_ycbcr(frame, width=ANALYSIS_WIDTH):
+    image = Image.open(io.BytesIO(frame))
+    # For JPEG, draft() makes libjpeg decode at 1/2, 1/4 or 1/8 scale straight into YCbCr.
+    image.draft("YCbCr", (width, max(1, width * image.height // max(image.width, 1))))
+    if image.mode != "YCbCr":
+        image = image.convert("RGB").convert("YCbCr")
+    if image.width > width:
+        image = image.resize((width, max(1, round(image.height * width / image.width))), Image.BILINEAR)
+    return np.asarray(image, dtype=np.uint8)
+
+
+class FrameAnalysis:
+    def __init__(self, mean_luma, contrast, face_coverage, face_center, face_area, thumbnail):
+        self.mean_luma = mean_luma
+        self.contrast = contrast
+        self.face_coverage = face_coverage
+        self.face_center = face_center
+        self.face_area = face_area
+        self.thumbnail = thumbnail
+
+    @property
+    def face_detected(self):
+        return self.face_center is not None
+
+    def scores(self):
+        lighting = map_range_to_score(self.mean_luma, 35, 185)
+        contrast = map_range_to_score(self.contrast, 10, 64)
+        if self.face_detected:
+            cx, cy = self.face_center
+            eye_contact = clamp_score(10 - (abs(cx - 0.5) + abs(cy - 0.45)) * 20)
+            posture = clamp_score(10 - abs(self.face_area - 0.18) * 70)
+        else:
+            eye_contact = 3
+            posture = 3
+        return {
+            "eye_contact": eye_contact,
+            "posture": posture,
+            "outfit": clamp_score((contrast + lighting) / 2),
+            "lighting": lighting,
+            "contrast": contrast,
+        }
+
+
+def analyze_frame(frame):
+    if not is_available() or not frame:
+        return None
+    try:
+        ycc = decode_ycbcr(frame)
+    except Exception:
+        return None
+    if ycc.ndim != 3 or ycc.shape[0] < THUMBNAIL_BLOCK or ycc.shape[1] < THUMBNAIL_BLOCK:
+        return None
+
+    luma = ycc[..., 0]
+    cb = ycc[..., 1]
+    cr = ycc[..., 2]
+    height, width = luma.shape
+    luma_f = luma.astype(np.float32)
+
+    skin = (cb >= SKIN_CB[0]) & (cb <= SKIN_CB[1]) & (cr >= SKIN_CR[0]) & (cr <= SKIN_CR[1]) & (luma > 40)
+    coverage = float(skin.mean())
+    face_center = None
+    face_area = 0.0
+    if coverage >= MIN_FACE_COVERAGE:
+        ys, xs = np.nonzero(skin)
+        # Percentile box ignores stray skin-coloured pixels in the background.
+        x0, x1 = np.percentile(xs, (5, 95))
+        y0, y1 = np.percentile(ys, (5, 95))
+        face_center = (float(xs.mean()) / width, float(ys.mean()) / height)
+        face_area = float((x1 - x0) * (y1 - y0)) / (width * height)
+
+    rows = height - height % THUMBNAIL_BLOCK
+    cols = width - width % THUMBNAIL_BLOCK
+    thumbnail = luma_f[:rows, :cols].reshape(
+        rows // THUMBNAIL_BLOCK, THUMBNAIL_BLOCK, cols // THUMBNAIL_BLOCK, THUMBNAIL_BLOCK
+    ).mean(axis=(1, 3))
+
+    return FrameAnalysis(
+        mean_luma=float(luma_f.mean()),
+        contrast=float(luma_f.std()),
+        face_coverage=coverage,
+        face_center=face_center,
+        face_area=face_area,
+        thumbnail=thumbnail,
+    )
+
+
+class VisualTracker:
+    def __init__(self, alpha=EMA_ALPHA):
+        self.alpha = alpha
+        self.frames = 0
+        self._ema = {}
+        self._previous_thumbnail = None
+        self._previous_center = None
+        self._lock = threading.Lock()
+
+    def _smooth(self, key, value):
+        previous = self._ema.get(key)
+        self._ema[key] = value if previous is None else previous + self.alpha * (value - previous)
+        return self._ema[key]
+
+    def update(self, analysis):
+        with self._lock:
+            raw = analysis.scores()
+            raw["face_presence"] = 1.0 if analysis.face_detected else 0.0
+
+            motion = None
+            previous = self._previous_thumbnail
+            if previous is not None and previous.shape == analysis.thumbnail.shape:
+                motion = float(np.abs(analysis.thumbnail - previous).mean())
+                if analysis.face_center is not None and self._previous_center is not None:
+                    shift = abs(analysis.face_center[0] - self._previous_center[0]) + abs(analysis.face_center[1] - self._previous_center[1])
+                    motion += shift * 100
+                raw["stability"] = clamp_score(10 - motion / 3)
+            self._previous_thumbnail = analysis.thumbnail
+            self._previous_center = analysis.face_center
+
+            smoothed = {key: self._smooth(key, value) for key, value in raw.items()}
+            self.frames += 1
+            return smoothed
+
+
+def visual_scores(frame, tracker=None):
+    analysis = analyze_frame(frame)
+    if analysis is None:
+        return None
+
+    if tracker is not None:
+        values = tracker.update(analysis)
+        face_detected = values.pop("face_presence") >= 0.5
+    else:
+        values = analysis.scores()
+        face_detected = analysis.face_detected
+
+    scores = {key: clamp_score(value) for key, value in values.items()}
+    scores["face_detected"] = face_detected
+    scores["source"] = "server"
+    return scores
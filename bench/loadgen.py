@@ -0,0 +1,379 @@
+import argparse
+import base64
+import http.client
+import json
+import os
+import random
+import signal
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from urllib.parse import quote, urlsplit
+
+try:
+    import psutil
+except Exception:
+    psutil = None
+
+from bench import report, workload
+from bench.mock_nim import start_server
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REALTIME_INTERVAL = 12.0
+SILENCE_GAP = 1.2
+
+
+def process_tree_rss(pid):
+    if psutil is not None:
+        try:
+            parent = psutil.Process(pid)
+            return sum(proc.memory_info().rss for proc in [parent, *parent.children(recursive=True)])
+        except psutil.Error:
+            return None
+    # Linux fallback: walk /proc for the process and its descendants (the Flask reloader forks a child).
+    try:
+        parents = {}
+        for entry in os.listdir("/proc"):
+            if entry.isdigit():
+                try:
+                    with open(f"/proc/{entry}/stat", "r", encoding="utf-8") as file_obj:
+                        fields = file_obj.read().rsplit(")", 1)[1].split()
+                    parents.setdefault(int(fields[1]), []).append(int(entry))
+                except OSError:
+                    continue
+        total, pending = 0, [pid]
+        while pending:
+            current = pending.pop()
+            pending.extend(parents.get(current, []))
+            with open(f"/proc/{current}/status", "r", encoding="utf-8") as file_obj:
+                for line in file_obj:
+                    if line.startswith("VmRSS:"):
+                        total += int(line.split()[1]) * 1024
+        return total
+    except OSError:
+        return None
+
+
+class RssSampler(threading.Thread):
+    def __init__(self, pid, interval=0.5):
+        super().__init__(name="rss-sampler", daemon=True)
+        self.pid = pid
+        self.interval = interval
+        self.samples = []
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            rss = process_tree_rss(self.pid)
+            if rss:
+                self.samples.append(rss)
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+class BackendClient:
+    def __init__(self, base_url, timeout=180):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.timeout = timeout
+        self.conn = None
+
+    def request(self, method, path, body=None, headers=None):
+        for attempt in range(2):
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            try:
+                self.conn.request(method, path, body=body, headers=headers or {})
+                response = self.conn.getresponse()
+                payload = response.read()
+                if response.will_close:
+                    self.conn.close()
+                    self.conn = None
+                return response.status, payload
+            except (OSError, http.client.HTTPException):
+                self.conn.close()
+                self.conn = None
+                if attempt:
+                    raise
+        return None, b""
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+
+
+class Candidate(threading.Thread):
+    def __init__(self, index, args, deadline, samples, lock, wavs, frames):
+        super().__init__(name=f"candidate-{index}", daemon=True)
+        self.rng = random.Random(args.seed + index)
+        self.args = args
+        self.deadline = deadline
+        self.samples = samples
+        self.lock = lock
+        self.wavs = wavs
+        self.frames = frames
+        self.client = BackendClient(args.backend)
+        self.transcript = ""
+        self.question = "Tell me about a project you are proud of."
+        self.session_id = None
+        self.session_started = None
+        self.synced = 0
+        self.audio_seq = 0
+
+    def timed(self, route, method, path, body=None, headers=None):
+        started = time.perf_counter()
+        try:
+            status, payload = self.client.request(method, path, body, headers)
+            ok = status is not None and status < 400
+        except (OSError, http.client.HTTPException):
+            status, payload, ok = None, b"", False
+        with self.lock:
+            self.samples.append((route, time.perf_counter() - started, ok))
+        try:
+            return status, json.loads(payload or b"{}")
+        except ValueError:
+            return status, {}
+
+    def post_json(self, route, path, data):
+        return self.timed(route, "POST", path, json.dumps(data).encode("utf-8"), {"Content-Type": "application/json"})
+
+    def scaled_sleep(self, seconds):
+        time.sleep(max(0.0, seconds * self.args.time_scale))
+
+    def run(self):
+        role, description = workload.pick_role(self.rng)
+        # Candidates start staggered like real users opening the app.
+        self.scaled_sleep(self.rng.uniform(0, 3))
+        status, data = self.post_json("/generate", "/generate", {"job_role": role, "job_description": description})
+        if status == 200 and data.get("questions"):
+            self.question = data["questions"][0]
+        if self.args.mode == "sessions":
+            status, data = self.post_json("/realtime/sessions", "/realtime/sessions", {"role": role, "job_description": description})
+            self.session_id = data.get("session_id")
+
+        self.session_started = time.monotonic()
+        next_eval = time.monotonic() + REALTIME_INTERVAL * self.args.time_scale
+        while time.monotonic() < self.deadline:
+            speech_seconds = self.rng.uniform(2.0, 5.0)
+            self.scaled_sleep(speech_seconds + SILENCE_GAP)
+            self.send_segment(speech_seconds, role, description)
+            if time.monotonic() >= next_eval:
+                next_eval = time.monotonic() + REALTIME_INTERVAL * self.args.time_scale
+                self.evaluate(role, description)
+        self.client.close()
+
+    def send_segment(self, speech_seconds, role, description):
+        audio = workload.unique_wav(self.rng.choice(self.wavs), self.rng)
+        if self.args.mode == "sessions" and self.session_id:
+            self.stream_audio(audio)
+        else:
+            boundary = f"----bench{uuid.uuid4().hex}"
+            body = b"".join([
+                f'--{boundary}\r\nContent-Disposition: form-data; name="audio"; filename="segment.wav"\r\nContent-Type: audio/wav\r\n\r\n'.encode("utf-8"),
+                audio,
+                f"\r\n--{boundary}--\r\n".encode("utf-8"),
+            ])
+            self.timed("/transcribe-audio", "POST", "/transcribe-audio", body, {"Content-Type": f"multipart/form-data; boundary={boundary}"})
+        # Append what the candidate "said" regardless of the mock transcript, so prompts grow like a real session.
+        self.transcript = f"{self.transcript} {workload.answer_delta(self.rng, int(speech_seconds * 2.5))}".strip()
+
+    def stream_audio(self, audio):
+        # Header chunk first, then ~1 s PCM slices, then a flush at the end of the utterance, like the frontend recorder.
+        base = f"/realtime/sessions/{self.session_id}/audio"
+        header, pcm = audio[:44], audio[44:]
+        step = workload.SAMPLE_RATE * 2
+        chunks = [pcm[offset:offset + step] for offset in range(0, len(pcm), step)]
+        if self.audio_seq == 0:
+            chunks.insert(0, header)
+        for index, chunk in enumerate(chunks):
+            flush = "&flush=1&wait_ms=8000" if index == len(chunks) - 1 else ""
+            duration = 0 if self.audio_seq == 0 else 1000
+            self.timed(
+                "/realtime/sessions/<id>/audio",
+                "POST",
+                f"{base}?seq={self.audio_seq}&duration_ms={duration}{flush}",
+                chunk,
+                {"Content-Type": "audio/wav"},
+            )
+            self.audio_seq += 1
+
+    def session_seconds(self):
+        # Seconds on this candidate's own session clock, undoing --time-scale so the backend sees real interview time.
+        elapsed = time.monotonic() - self.session_started
+        if self.args.time_scale > 0:
+            elapsed /= self.args.time_scale
+        return max(1, int(elapsed))
+
+    def evaluate(self, role, description):
+        frame = self.rng.choice(self.frames)
+        answer = self.transcript[-1500:]
+        if self.args.mode == "sessions" and self.session_id:
+            payload = json.dumps({
+                "transcript_delta": self.transcript[self.synced:],
+                "offset": self.synced,
+                "question": self.question,
+                "include_answer_score": True,
+                "metrics": {"filler_words": self.transcript.count(" um ") + self.transcript.count(" so "), "confidence_signal": 6},
+            })
+            status, _ = self.timed(
+                "/realtime/sessions/<id>/evaluate",
+                "POST",
+                f"/realtime/sessions/{self.session_id}/evaluate?payload={quote(payload)}",
+                frame,
+                {"Content-Type": "image/jpeg"},
+            )
+            if status == 200:
+                self.synced = len(self.transcript)
+            return
+
+        self.post_json("/realtime-score", "/realtime-score", {
+            "role": role,
+            "job_description": description,
+            "transcript": self.transcript,
+            "session_seconds": self.session_seconds(),
+            "eye_contact": self.rng.randint(5, 9),
+            "posture": self.rng.randint(5, 9),
+            "outfit": 7,
+            "filler_words": self.transcript.count(" um ") + self.transcript.count(" so "),
+            "frame_base64": "data:image/jpeg;base64," + base64.b64encode(frame).decode("ascii"),
+        })
+        self.post_json("/score", "/score", {"question": self.question, "answer": answer})
+
+
+def wait_for_backend(url, timeout=30):
+    client = BackendClient(url, timeout=2)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            status, _ = client.request("GET", "/metrics")
+            if status == 200:
+                client.close()
+                return True
+        except (OSError, http.client.HTTPException):
+            pass
+        # Back off on non-200 answers too, so a backend still booting is not hammered in a tight loop.
+        time.sleep(0.25)
+    client.close()
+    return False
+
+
+def spawn_backend(args, mock_url):
+    env = dict(os.environ)
+    env.update({
+        "NVIDIA_BASE_URL": mock_url,
+        "NVIDIA_API_KEY": "bench-key",
+        "NVIDIA_STT_API_KEY": "bench-key",
+        "PORT": str(urlsplit(args.backend).port or 5000),
+    })
+    # Every simulated candidate shares the bench key, so the backend limiter stays off unless asked for.
+    env.setdefault("RATE_LIMIT_CHAT_RPM", "0")
+    env.setdefault("RATE_LIMIT_STT_RPM", "0")
+    return subprocess.Popen(
+        [sys.executable, os.path.join(REPO_ROOT, "backend", "backend.py")],
+        cwd=os.path.join(REPO_ROOT, "backend"),
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        # Own process group, so stopping it also stops any server child process.
+        start_new_session=os.name == "posix",
+    )
+
+
+def stop_backend(process):
+    if os.name == "posix":
+        try:
+            os.killpg(process.pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+    else:
+        process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay the frontend's traffic pattern against the backend and report latency percentiles.")
+    parser.add_argument("--backend", default="http://127.0.0.1:5000")
+    parser.add_argument("--candidates", type=int, default=4, help="concurrent simulated candidates")
+    parser.add_argument("--duration", type=float, default=60, help="seconds to run after start-up")
+    parser.add_argument("--time-scale", type=float, default=1.0, help="multiply think times (speech, 12 s loop) by this factor")
+    parser.add_argument("--mode", choices=("classic", "sessions"), default="classic", help="classic: /transcribe-audio + /realtime-score + /score; sessions: streamed audio + /evaluate")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--spawn", action="store_true", help="start a mock NIM and the backend as a subprocess")
+    parser.add_argument("--mock-chat-latency-ms", type=float, default=400)
+    parser.add_argument("--mock-stt-latency-ms", type=float, default=600)
+    parser.add_argument("--mock-error-rate", type=float, default=0.0, help="fraction of mock calls answered with 503")
+    parser.add_argument("--mock-rate-limit-rate", type=float, default=0.0, help="fraction of mock calls answered with 429")
+    parser.add_argument("--mock-quota-rpm", type=float, default=0.0, help="per-key requests per minute the mock allows before 429")
+    parser.add_argument("--backend-pid", type=int, help="sample RSS of an already running backend")
+    parser.add_argument("--output", help="write the JSON summary here")
+    parser.add_argument("--baseline", help="compare against a saved summary and exit 1 on regression")
+    parser.add_argument("--save-baseline", help="save this run's summary as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.15)
+    args = parser.parse_args()
+
+    mock = backend = None
+    pid = args.backend_pid
+    if args.spawn:
+        mock = start_server(chat_latency_ms=args.mock_chat_latency_ms, stt_latency_ms=args.mock_stt_latency_ms, error_rate=args.mock_error_rate, rate_limit_rate=args.mock_rate_limit_rate, quota_rpm=args.mock_quota_rpm)
+        backend = spawn_backend(args, f"http://127.0.0.1:{mock.server_port}/v1")
+        pid = backend.pid
+    if not wait_for_backend(args.backend):
+        print(f"Backend at {args.backend} did not become reachable.", file=sys.stderr)
+        if backend is not None:
+            stop_backend(backend)
+        return 2
+
+    wavs = workload.wav_pool(args.seed)
+    frames = workload.frame_pool(args.seed)
+    samples, lock = [], threading.Lock()
+    sampler = RssSampler(pid) if pid else None
+    if sampler is not None:
+        sampler.start()
+
+    started = time.monotonic()
+    deadline = started + args.duration
+    candidates = [Candidate(index, args, deadline, samples, lock, wavs, frames) for index in range(args.candidates)]
+    for candidate in candidates:
+        candidate.start()
+    for candidate in candidates:
+        candidate.join()
+    wall = time.monotonic() - started
+
+    if sampler is not None:
+        sampler.stop()
+    if backend is not None:
+        stop_backend(backend)
+    if mock is not None:
+        mock.shutdown()
+
+    summary = report.summarize(samples, wall, sampler.samples if sampler else None)
+    summary["config"] = {"candidates": args.candidates, "duration": args.duration, "time_scale": args.time_scale, "mode": args.mode}
+    print(report.format_table(summary))
+    if args.output:
+        report.save(args.output, summary)
+    if args.save_baseline:
+        report.save(args.save_baseline, summary)
+
+    if args.baseline:
+        regressions = report.compare(summary, report.load(args.baseline), args.tolerance)
+        if regressions:
+            print("\nRegressions against baseline:")
+            for line in regressions:
+                print(f"  - {line}")
+            return 1
+        print("\nNo regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
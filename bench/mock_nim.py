@@ -0,0 +1,234 @@
+import argparse
+import json
+import math
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+QUESTIONS = [
+    "Write a function that prints every element of an array.",
+    "Tell me about a project where you had to debug a production issue.",
+    "How do you keep a React component tree fast as it grows?",
+    "Describe a disagreement with a teammate and how you resolved it.",
+    "How would you design an API rate limiter?",
+    "What does good code review look like to you?",
+    "Explain the difference between a process and a thread.",
+    "How do you decide what to test first?",
+]
+QUOTA_BURST = 5
+FILLER_WORDS = ["so", "I", "worked", "on", "the", "api", "layer", "and", "we", "shipped", "it", "with", "tests"]
+
+
+class LatencyModel:
+    # Lognormal latency around a median, which matches the long tail of hosted inference well enough.
+    def __init__(self, median_ms, sigma=0.35):
+        self.median_ms = median_ms
+        self.sigma = sigma
+
+    def sample(self):
+        if self.median_ms <= 0:
+            return 0.0
+        return random.lognormvariate(0, self.sigma) * self.median_ms / 1000.0
+
+
+class MockConfig:
+    def __init__(self, chat_latency, stt_latency, token_delay_ms, error_rate, rate_limit_rate, quota_rpm=0.0):
+        self.chat_latency = chat_latency
+        self.stt_latency = stt_latency
+        self.token_delay = token_delay_ms / 1000.0
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.quota_rate = quota_rpm / 60.0
+        self.requests = 0
+        self.errors = 0
+        self._quota = {}
+        self._lock = threading.Lock()
+
+    def take_quota(self, key):
+        # Per-key token bucket like the hosted API's; returns the seconds until a request would be allowed.
+        if self.quota_rate <= 0:
+            return 0.0
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._quota.get(key, (QUOTA_BURST, now))
+            tokens = min(QUOTA_BURST, tokens + (now - updated) * self.quota_rate)
+            if tokens >= 1:
+                self._quota[key] = (tokens - 1, now)
+                return 0.0
+            self._quota[key] = (tokens, now)
+            return (1 - tokens) / self.quota_rate
+
+    def count(self, failed):
+        with self._lock:
+            self.requests += 1
+            self.errors += int(failed)
+
+
+def completion_text(prompt):
+    if "Generate" in prompt and "interview questions" in prompt:
+        count = 5
+        for word in prompt.split():
+            if word.isdigit():
+                count = int(word)
+                break
+        picked = random.sample(QUESTIONS, min(count, len(QUESTIONS)))
+        return "\n".join(f"{index}. {question}" for index, question in enumerate(picked, 1))
+    if "running summary" in prompt:
+        return "The candidate described migrating a checkout service, caching pricing lookups and cutting latency by forty percent."
+    if "realtime interview coach" in prompt:
+        return json.dumps({
+            "overall_score": random.randint(4, 9),
+            "tone_score": random.randint(4, 9),
+            "posture_score": random.randint(4, 9),
+            "outfit_score": random.randint(4, 9),
+            "confidence_score": random.randint(4, 9),
+            "summary": "Clear structure, could use more concrete metrics.",
+            "feedback": ["Good pacing.", "Relevant example."],
+            "improvements": ["Quantify the impact.", "Pause instead of filler words."],
+        })
+    return json.dumps({
+        "score": random.randint(3, 9),
+        "feedback": ["Covers the main idea.", "Example is relevant."],
+        "improvements": ["Add a concrete result.", "Be more concise."],
+    })
+
+
+def split_tokens(text, size=12):
+    return [text[index:index + size] for index in range(0, len(text), size)] or [""]
+
+
+def make_handler(config):
+    class MockNIMHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *_args):
+            pass
+
+        def _send(self, status, body, content_type="application/json", headers=None):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _maybe_fail(self, kind):
+            wait = config.take_quota(f"{kind}:{self.headers.get('Authorization', '')}")
+            if wait:
+                self._send(429, b'{"detail": "Too Many Requests"}', headers={"Retry-After": str(max(1, math.ceil(wait)))})
+                return True
+            roll = random.random()
+            if roll < config.rate_limit_rate:
+                self._send(429, b'{"detail": "Too Many Requests"}', headers={"Retry-After": "1"})
+                return True
+            if roll < config.rate_limit_rate + config.error_rate:
+                self._send(503, b'{"detail": "Service Unavailable"}')
+                return True
+            return False
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            if self.path.endswith("/chat/completions"):
+                self._chat(body)
+            elif self.path.endswith("/audio/transcriptions"):
+                self._transcribe(body)
+            else:
+                self._send(404, b'{"detail": "Not Found"}')
+
+        def _chat(self, body):
+            time.sleep(config.chat_latency.sample())
+            failed = self._maybe_fail("chat")
+            config.count(failed)
+            if failed:
+                return
+            payload = json.loads(body or b"{}")
+            prompt = (payload.get("messages") or [{}])[-1].get("content", "")
+            text = completion_text(prompt)
+            for stop in payload.get("stop") or []:
+                text = text.split(stop, 1)[0]
+            if payload.get("max_tokens"):
+                text = text[:payload["max_tokens"] * 4]
+            usage = {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(text) // 4, "total_tokens": (len(prompt) + len(text)) // 4}
+
+            if not payload.get("stream"):
+                response = {"choices": [{"index": 0, "message": {"role": "assistant", "content": text}}], "usage": usage}
+                self._send(200, json.dumps(response).encode("utf-8"))
+                return
+
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            events = [{"choices": [{"index": 0, "delta": {"content": token}}]} for token in split_tokens(text)]
+            if (payload.get("stream_options") or {}).get("include_usage"):
+                events.append({"choices": [], "usage": usage})
+            try:
+                for event in events:
+                    self._write_chunk(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+                    time.sleep(config.token_delay)
+                self._write_chunk(b"data: [DONE]\n\n")
+                self._write_chunk(b"")
+            except (BrokenPipeError, ConnectionResetError):
+                self.close_connection = True
+
+        def _write_chunk(self, data):
+            self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+            self.wfile.flush()
+
+        def _transcribe(self, body):
+            # Latency grows with upload size, like a real decoder, on top of the base latency.
+            time.sleep(config.stt_latency.sample() + len(body) / 2_000_000)
+            failed = self._maybe_fail("stt")
+            config.count(failed)
+            if failed:
+                return
+            words = max(1, len(body) // 12000)
+            text = " ".join(random.choice(FILLER_WORDS) for _ in range(words))
+            self._send(200, json.dumps({"text": text}).encode("utf-8"))
+
+    return MockNIMHandler
+
+
+def start_server(host="127.0.0.1", port=0, chat_latency_ms=400, stt_latency_ms=600, sigma=0.35, token_delay_ms=15, error_rate=0.0, rate_limit_rate=0.0, quota_rpm=0.0):
+    config = MockConfig(
+        LatencyModel(chat_latency_ms, sigma),
+        LatencyModel(stt_latency_ms, sigma),
+        token_delay_ms,
+        error_rate,
+        rate_limit_rate,
+        quota_rpm,
+    )
+    server = ThreadingHTTPServer((host, port), make_handler(config))
+    server.daemon_threads = True
+    server.mock_config = config
+    threading.Thread(target=server.serve_forever, name="mock-nim", daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the NVIDIA NIM chat and Whisper endpoints.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--chat-latency-ms", type=float, default=400, help="median time to first byte for chat completions")
+    parser.add_argument("--stt-latency-ms", type=float, default=600, help="median transcription latency before size cost")
+    parser.add_argument("--sigma", type=float, default=0.35, help="lognormal spread of the latency distribution")
+    parser.add_argument("--token-delay-ms", type=float, default=15, help="delay between streamed chunks")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of calls answered with 503")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="fraction of calls answered with 429")
+    parser.add_argument("--quota-rpm", type=float, default=0.0, help="per-key requests per minute before 429 + Retry-After (0 = unlimited)")
+    args = parser.parse_args()
+
+    server = start_server(args.host, args.port, args.chat_latency_ms, args.stt_latency_ms, args.sigma, args.token_delay_ms, args.error_rate, args.rate_limit_rate, args.quota_rpm)
+    print(f"Mock NIM listening on http://{args.host}:{server.server_port}/v1")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
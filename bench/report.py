@@ -0,0 +1,90 @@
+import json
+import math
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    rank = fraction * (len(sorted_values) - 1)
+    low = math.floor(rank)
+    high = math.ceil(rank)
+    if low == high:
+        return sorted_values[low]
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+
+def summarize(samples, wall_seconds, rss_samples=None):
+    routes = {}
+    for route, seconds, ok in samples:
+        entry = routes.setdefault(route, {"latencies": [], "errors": 0})
+        entry["latencies"].append(seconds)
+        entry["errors"] += int(not ok)
+
+    summary = {"wall_seconds": round(wall_seconds, 2), "routes": {}}
+    total = 0
+    for route, entry in sorted(routes.items()):
+        latencies = sorted(entry["latencies"])
+        total += len(latencies)
+        summary["routes"][route] = {
+            "requests": len(latencies),
+            "errors": entry["errors"],
+            "throughput_rps": round(len(latencies) / wall_seconds, 3) if wall_seconds else 0.0,
+            "p50_ms": round(percentile(latencies, 0.50) * 1000, 1),
+            "p95_ms": round(percentile(latencies, 0.95) * 1000, 1),
+            "p99_ms": round(percentile(latencies, 0.99) * 1000, 1),
+        }
+    summary["throughput_rps"] = round(total / wall_seconds, 3) if wall_seconds else 0.0
+    if rss_samples:
+        summary["rss_mb"] = {
+            "start": round(rss_samples[0] / 1048576, 1),
+            "peak": round(max(rss_samples) / 1048576, 1),
+            "end": round(rss_samples[-1] / 1048576, 1),
+        }
+    return summary
+
+
+def compare(summary, baseline, tolerance=0.15):
+    # A regression is a slower tail, lower throughput, more errors or a larger memory peak than the baseline allows.
+    regressions = []
+    for route, current in summary["routes"].items():
+        previous = baseline.get("routes", {}).get(route)
+        if previous is None:
+            continue
+        for field in ("p50_ms", "p95_ms", "p99_ms"):
+            if previous[field] and current[field] > previous[field] * (1 + tolerance):
+                regressions.append(f"{route} {field}: {previous[field]} -> {current[field]}")
+        previous_error_rate = previous["errors"] / max(previous["requests"], 1)
+        current_error_rate = current["errors"] / max(current["requests"], 1)
+        if current_error_rate > previous_error_rate + 0.01:
+            regressions.append(f"{route} error rate: {previous_error_rate:.1%} -> {current_error_rate:.1%}")
+    if baseline.get("throughput_rps") and summary["throughput_rps"] < baseline["throughput_rps"] * (1 - tolerance):
+        regressions.append(f"throughput_rps: {baseline['throughput_rps']} -> {summary['throughput_rps']}")
+    previous_rss = (baseline.get("rss_mb") or {}).get("peak")
+    current_rss = (summary.get("rss_mb") or {}).get("peak")
+    if previous_rss and current_rss and current_rss > previous_rss * (1 + tolerance):
+        regressions.append(f"rss peak MB: {previous_rss} -> {current_rss}")
+    return regressions
+
+
+def format_table(summary):
+    lines = [f"{'route':<44} {'reqs':>6} {'err':>5} {'rps':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"]
+    for route, entry in summary["routes"].items():
+        lines.append(
+            f"{route:<44} {entry['requests']:>6} {entry['errors']:>5} {entry['throughput_rps']:>7} "
+            f"{entry['p50_ms']:>9} {entry['p95_ms']:>9} {entry['p99_ms']:>9}"
+        )
+    lines.append(f"total throughput: {summary['throughput_rps']} req/s over {summary['wall_seconds']} s")
+    if summary.get("rss_mb"):
+        rss = summary["rss_mb"]
+        lines.append(f"backend RSS MB: start {rss['start']}, peak {rss['peak']}, end {rss['end']}")
+    return "\n".join(lines)
+
+
+def load(path):
+    with open(path, "r", encoding="utf-8") as file_obj:
+        return json.load(file_obj)
+
+
+def save(path, summary):
+    with open(path, "w", encoding="utf-8") as file_obj:
+        json.dump(summary, file_obj, indent=2)
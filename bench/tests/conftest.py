@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The bench modules are imported as the "bench" package, as `python -m bench.loadgen` does from the repo root.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
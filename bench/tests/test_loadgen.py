@@ -0,0 +1,41 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+from bench import loadgen
+
+
+def test_session_seconds_count_from_the_candidates_own_start():
+    args = SimpleNamespace(seed=1, backend="http://127.0.0.1:9", time_scale=0.1)
+    candidate = loadgen.Candidate(0, args, deadline=0, samples=[], lock=threading.Lock(), wavs=[], frames=[])
+    candidate.session_started = time.monotonic() - 2.0
+    # Two wall-clock seconds at a tenth of real think time are twenty seconds of interview.
+    assert candidate.session_seconds() == 20
+    candidate.session_started = time.monotonic()
+    assert candidate.session_seconds() == 1
+
+
+def test_wait_for_backend_backs_off_while_not_ready(monkeypatch):
+    class NotReady(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            self.send_response(503)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, *_args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), NotReady)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    sleeps = []
+    real_sleep = time.sleep
+    monkeypatch.setattr(loadgen.time, "sleep", lambda seconds: sleeps.append(seconds) or real_sleep(seconds))
+    try:
+        assert loadgen.wait_for_backend(f"http://127.0.0.1:{server.server_port}", timeout=0.6) is False
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert 1 <= len(sleeps) <= 4
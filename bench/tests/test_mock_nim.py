@@ -0,0 +1,65 @@
+import http.client
+import json
+
+import pytest
+
+from bench import mock_nim
+
+
+@pytest.fixture
+def mock_server():
+    servers = []
+
+    def start(**options):
+        server = mock_nim.start_server(chat_latency_ms=1, stt_latency_ms=1, token_delay_ms=0, **options)
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def post(server, path, payload, headers=None):
+    conn = http.client.HTTPConnection("127.0.0.1", server.server_port, timeout=5)
+    try:
+        conn.request("POST", path, body=json.dumps(payload).encode("utf-8"), headers={"Content-Type": "application/json", **(headers or {})})
+        response = conn.getresponse()
+        return response.status, dict(response.getheaders()), response.read()
+    finally:
+        conn.close()
+
+
+def test_chat_completion_answers_with_usage(mock_server):
+    server = mock_server()
+    status, _, body = post(server, "/v1/chat/completions", {"messages": [{"role": "user", "content": "Generate 5 professional interview questions"}]})
+    payload = json.loads(body)
+    assert status == 200
+    assert payload["choices"][0]["message"]["content"]
+    assert payload["usage"]["total_tokens"] > 0
+
+
+def test_streamed_completion_ends_with_done(mock_server):
+    server = mock_server()
+    status, headers, body = post(server, "/v1/chat/completions", {"stream": True, "messages": [{"role": "user", "content": "score"}]})
+    assert status == 200
+    assert headers["Content-Type"] == "text/event-stream"
+    assert body.decode("utf-8").rstrip().endswith("data: [DONE]")
+
+
+def test_quota_answers_429_with_retry_after(mock_server):
+    server = mock_server(quota_rpm=1)
+    statuses = [post(server, "/v1/chat/completions", {"messages": []}, {"Authorization": "Bearer a"})[:2] for _ in range(mock_nim.QUOTA_BURST + 1)]
+    assert all(status == 200 for status, _ in statuses[:-1])
+    status, headers = statuses[-1]
+    assert status == 429
+    assert int(headers["Retry-After"]) >= 1
+    # Another key has its own quota.
+    assert post(server, "/v1/chat/completions", {"messages": []}, {"Authorization": "Bearer b"})[0] == 200
+
+
+def test_injected_errors_are_counted(mock_server):
+    server = mock_server(error_rate=1.0)
+    assert post(server, "/v1/chat/completions", {"messages": []})[0] == 503
+    assert (server.mock_config.requests, server.mock_config.errors) == (1, 1)
@@ -0,0 +1,35 @@
+from bench import report
+
+
+def test_percentile_interpolates():
+    assert report.percentile([], 0.5) == 0.0
+    assert report.percentile([1.0, 2.0, 3.0, 4.0], 0.5) == 2.5
+    assert report.percentile([1.0, 2.0, 3.0], 1.0) == 3.0
+
+
+def test_summarize_groups_by_route():
+    samples = [("/score", 0.1, True), ("/score", 0.3, False), ("/generate", 0.2, True)]
+    summary = report.summarize(samples, wall_seconds=2.0, rss_samples=[1048576, 3145728, 2097152])
+    assert summary["routes"]["/score"]["requests"] == 2
+    assert summary["routes"]["/score"]["errors"] == 1
+    assert summary["routes"]["/score"]["p50_ms"] == 200.0
+    assert summary["throughput_rps"] == 1.5
+    assert summary["rss_mb"] == {"start": 1.0, "peak": 3.0, "end": 2.0}
+
+
+def test_compare_flags_only_changes_beyond_tolerance():
+    baseline = report.summarize([("/score", 0.1, True)] * 10, 10.0)
+    same = report.summarize([("/score", 0.11, True)] * 10, 10.0)
+    assert report.compare(same, baseline, tolerance=0.15) == []
+    slower = report.summarize([("/score", 0.2, True)] * 9 + [("/score", 0.2, False)], 20.0)
+    regressions = report.compare(slower, baseline, tolerance=0.15)
+    assert any("p95_ms" in line for line in regressions)
+    assert any("error rate" in line for line in regressions)
+    assert any("throughput_rps" in line for line in regressions)
+
+
+def test_save_and_load_round_trip(tmp_path):
+    summary = report.summarize([("/score", 0.1, True)], 1.0)
+    path = tmp_path / "baseline.json"
+    report.save(str(path), summary)
+    assert report.load(str(path)) == summary
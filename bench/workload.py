@@ -0,0 +1,87 @@
+import io
+import math
+import random
+import struct
+import wave
+
+try:
+    from PIL import Image, ImageDraw
+except Exception:
+    Image = None
+
+
+ROLES = [
+    ("Frontend Developer", "React, TypeScript, performance budgets, accessibility."),
+    ("Backend Engineer", "Python services, Postgres, queues, on-call ownership."),
+    ("Data Analyst", "SQL, dashboards, experiment analysis, stakeholder communication."),
+]
+ANSWER_WORDS = (
+    "so um I led the migration of our checkout service and we cut latency by forty percent "
+    "basically by caching the pricing lookups and you know batching writes to the ledger "
+    "the hardest part was coordinating the rollout with three teams without downtime"
+).split()
+SAMPLE_RATE = 48000
+
+
+def pick_role(rng):
+    return rng.choice(ROLES)
+
+
+def answer_delta(rng, words):
+    start = rng.randrange(len(ANSWER_WORDS))
+    return " ".join(ANSWER_WORDS[(start + index) % len(ANSWER_WORDS)] for index in range(words))
+
+
+def speech_wav(rng, speech_seconds, silence_seconds=0.6, sample_rate=SAMPLE_RATE):
+    # A VAD-sized segment: leading silence, a voiced tone with syllable-like amplitude bursts, trailing silence.
+    silence = int(silence_seconds * sample_rate)
+    voiced = int(speech_seconds * sample_rate)
+    pitch = rng.uniform(110, 220)
+    samples = [int(rng.gauss(0, 40)) for _ in range(silence)]
+    for index in range(voiced):
+        envelope = 0.5 + 0.5 * math.sin(2 * math.pi * 4 * index / sample_rate)
+        value = 9000 * envelope * math.sin(2 * math.pi * pitch * index / sample_rate)
+        samples.append(int(value + rng.gauss(0, 300)))
+    samples.extend(int(rng.gauss(0, 40)) for _ in range(silence))
+
+    output = io.BytesIO()
+    with wave.open(output, "wb") as writer:
+        writer.setnchannels(1)
+        writer.setsampwidth(2)
+        writer.setframerate(sample_rate)
+        writer.writeframes(struct.pack(f"<{len(samples)}h", *samples))
+    return output.getvalue()
+
+
+def camera_jpeg(rng, width=320, height=240):
+    if Image is None:
+        # Without Pillow, send a JPEG-shaped blob so the byte-level visual heuristic still runs.
+        return b"\xff\xd8\xff\xe0" + rng.randbytes(12000) + b"\xff\xd9"
+    image = Image.new("RGB", (width, height), (70 + rng.randrange(20), 80, 95))
+    draw = ImageDraw.Draw(image)
+    cx = width // 2 + rng.randrange(-20, 21)
+    cy = height // 2 + rng.randrange(-15, 16)
+    draw.ellipse((cx - 45, cy - 60, cx + 45, cy + 60), fill=(205, 160, 130))
+    draw.rectangle((cx - 80, cy + 60, cx + 80, height), fill=(40, 50, 90))
+    output = io.BytesIO()
+    image.save(output, format="JPEG", quality=70)
+    return output.getvalue()
+
+
+def unique_wav(payload, rng, samples=64):
+    # Real audio never repeats. Re-roll a few samples in the middle (inside the speech, which survives
+    # silence trimming) so content-addressed caches do not hit on reused buffers.
+    data = bytearray(payload)
+    offset = 44 + (len(data) - 44) // 4 * 2
+    data[offset:offset + samples * 2] = struct.pack(f"<{samples}h", *(rng.randint(-3000, 3000) for _ in range(samples)))
+    return bytes(data)
+
+
+def wav_pool(seed, size=8):
+    rng = random.Random(seed)
+    return [speech_wav(rng, rng.uniform(1.5, 4.5)) for _ in range(size)]
+
+
+def frame_pool(seed, size=8):
+    rng = random.Random(seed)
+    return [camera_jpeg(rng) for _ in range(size)]
@@ -46,7 +46,8 @@ function startBackend() {
     cwd: backend.cwd,
     detached: false,
     stdio: ['ignore', 'pipe', 'pipe'],
-    env: process.env,
+    // Lets the backend report how long interpreter start (and bundle unpacking) took before its own imports.
+    env: { ...process.env, BACKEND_LAUNCHED_AT: String(Date.now()) },
   });
 
   backendProcess.stdout.on('data', (chunk) => {
@@ -64,22 +65,35 @@ function startBackend() {
 
 function waitForBackend(timeoutMs = 15000) {
   const startedAt = Date.now();
+  let alive = false;
 
   return new Promise((resolve, reject) => {
+    const retry = () => {
+      if (Date.now() - startedAt > timeoutMs) {
+        // A backend that answers but is still warming up is usable; only a dead one is an error.
+        if (alive) {
+          resolve();
+          return;
+        }
+        reject(new Error('Backend did not become ready in time.'));
+        return;
+      }
+      setTimeout(probe, alive ? 250 : 100);
+    };
+
     const probe = () => {
-      const req = http.get('http://127.0.0.1:5000/settings/api-key', (res) => {
+      const req = http.get('http://127.0.0.1:5000/readyz', (res) => {
         res.resume();
-        resolve();
-      });
-
-      req.on('error', () => {
-        if (Date.now() - startedAt > timeoutMs) {
-          reject(new Error('Backend did not become ready in time.'));
+        alive = true;
+        if (res.statusCode === 200) {
+          resolve();
           return;
         }
-        setTimeout(probe, 500);
+        retry();
       });
 
+      req.on('error', retry);
+
       req.setTimeout(2500, () => {
         req.destroy();
       });
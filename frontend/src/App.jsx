@@ -5,6 +5,8 @@ import "./App.css";
 const DEMO_USER = "aquib";
 const DEMO_PASS = "1234";
 const BACKEND_URL = "http://localhost:5000";
+// Evaluations run every 12 s; a result that arrives later than this is stale, so the backend degrades instead.
+const REALTIME_DEADLINE_MS = 9000;
 const FILLER_WORDS = ["um", "uh", "like", "you know", "actually", "basically", "literally"];
 
 const clamp = (value, min = 1, max = 10) => Math.max(min, Math.min(max, value));
@@ -15,6 +17,38 @@ const mapRangeToScore = (value, min, max) => {
   return clamp(Math.round(1 + normalized * 9));
 };
 
+// POSTs to a backend Server-Sent Events endpoint and calls onEvent(event, data) as each event arrives.
+const streamBackendEvents = async (path, body, onEvent) => {
+  const res = await fetch(`${BACKEND_URL}${path}`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify(body),
+  });
+  if (!res.ok || !res.body) {
+    const data = await res.json().catch(() => ({}));
+    throw new Error(data.error || "Streaming request failed.");
+  }
+
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    const blocks = buffer.split("\n\n");
+    buffer = blocks.pop();
+    for (const block of blocks) {
+      const event = block.match(/^event: (.*)$/m)?.[1] || "message";
+      const dataLine = block.match(/^data: (.*)$/m)?.[1];
+      if (!dataLine) continue;
+      const data = JSON.parse(dataLine);
+      if (event === "error") throw new Error(data.error || "Streaming request failed.");
+      onEvent(event, data);
+    }
+  }
+};
+
 function App() {
   const [username, setUsername] = useState("");
   const [password, setPassword] = useState("");
@@ -41,7 +75,6 @@ function App() {
   const [realtimeQuestionIndex, setRealtimeQuestionIndex] = useState(0);
   const [realtimeAnswerScore, setRealtimeAnswerScore] = useState(null);
   const [isGeneratingRealtimeQuestions, setIsGeneratingRealtimeQuestions] = useState(false);
-  const [isScoringRealtimeAnswer, setIsScoringRealtimeAnswer] = useState(false);
   const [visualMetrics, setVisualMetrics] = useState({
     eyeContact: 6,
     posture: 6,
@@ -70,11 +103,20 @@ function App() {
   const speechMonitorRef = useRef(null);
   const speechStateRef = useRef(false);
   const lastSpeechTsRef = useRef(0);
-  const audioChunkBufferRef = useRef([]);
-  const isSegmentUploadingRef = useRef(false);
+  const audioSeqRef = useRef(0);
+  const audioInitChunkRef = useRef(null);
+  const audioUploadChainRef = useRef(Promise.resolve());
+  const audioTextLengthRef = useRef(0);
+  const lastAudioChunkTsRef = useRef(0);
+  const chunkVoicedRef = useRef(false);
+  const flushPendingRef = useRef(false);
+  const sessionCreationRef = useRef(null);
   const startTsRef = useRef(0);
   const transcriptRef = useRef("");
   const realtimeQuestionStartRef = useRef(0);
+  const realtimeSessionIdRef = useRef(null);
+  const syncedTranscriptLengthRef = useRef(0);
+  const serverVisionRef = useRef(false);
 
   const audioContextRef = useRef(null);
   const analyserRef = useRef(null);
@@ -109,20 +151,22 @@ function App() {
     synth.speak(utter);
   };
 
+  // Keyed on the question text so streamed questions arriving later do not restart speech.
+  const currentQuestionText = questions[currentIndex] || "";
+  const currentRealtimeQuestion = realtimeQuestions[realtimeQuestionIndex] || "";
+
   useEffect(() => {
-    if (questions.length > 0 && currentIndex < questions.length) {
-      const q = questions[currentIndex].replace(/^\d+\.\s*/, "");
-      speakText(q);
+    if (currentQuestionText) {
+      speakText(currentQuestionText.replace(/^\d+\.\s*/, ""));
     }
-  }, [currentIndex, questions]);
+  }, [currentQuestionText]);
 
   useEffect(() => {
     if (mode !== "realtime") return;
-    if (realtimeQuestions.length > 0 && realtimeQuestionIndex < realtimeQuestions.length) {
-      const q = realtimeQuestions[realtimeQuestionIndex].replace(/^\d+\.\s*/, "");
-      speakText(q);
+    if (currentRealtimeQuestion) {
+      speakText(currentRealtimeQuestion.replace(/^\d+\.\s*/, ""));
     }
-  }, [mode, realtimeQuestionIndex, realtimeQuestions]);
+  }, [mode, currentRealtimeQuestion]);
 
   useEffect(() => () => stopRealtimeSession(), []);
 
@@ -184,17 +228,14 @@ function App() {
 
     try {
       setIsGenerating(true);
-      const res = await fetch(`${BACKEND_URL}/generate`, {
-        method: "POST",
-        headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({ job_role: jobRole, job_description: jobDescription }),
-      });
-      const data = await res.json();
-      if (!res.ok) throw new Error(data.error || "Failed to generate questions.");
-      setQuestions(data.questions || []);
+      setQuestions([]);
       setAnswers({});
       setResults({});
       setCurrentIndex(0);
+      await streamBackendEvents("/generate/stream", { job_role: jobRole, job_description: jobDescription, user_id: username.trim().toLowerCase() }, (event, data) => {
+        if (event === "question") setQuestions((prev) => [...prev, data.question]);
+        if (event === "done") setQuestions(data.questions || []);
+      });
     } catch (err) {
       alert(err.message || "Failed to generate questions. Check backend.");
     } finally {
@@ -213,18 +254,14 @@ function App() {
     try {
       setIsGeneratingRealtimeQuestions(true);
       setRealtimeError("");
-      const res = await fetch(`${BACKEND_URL}/generate`, {
-        method: "POST",
-        headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({ job_role: role, job_description: description }),
-      });
-      const data = await res.json();
-      if (!res.ok) throw new Error(data.error || "Failed to generate realtime questions.");
-      const generated = data.questions || [];
-      setRealtimeQuestions(generated);
+      setRealtimeQuestions([]);
       setRealtimeQuestionIndex(0);
       setRealtimeAnswerScore(null);
       realtimeQuestionStartRef.current = transcriptRef.current.length;
+      await streamBackendEvents("/generate/stream", { job_role: role, job_description: description, user_id: username.trim().toLowerCase() }, (event, data) => {
+        if (event === "question") setRealtimeQuestions((prev) => [...prev, data.question]);
+        if (event === "done") setRealtimeQuestions(data.questions || []);
+      });
     } catch (err) {
       setRealtimeError(err.message || "Failed to generate realtime questions.");
     } finally {
@@ -232,37 +269,67 @@ function App() {
     }
   };
 
-  const scoreCurrentRealtimeAnswer = async (suppressNoAnswerError = true) => {
-    if (!realtimeQuestions.length) return null;
-
-    const currentQuestion = (realtimeQuestions[realtimeQuestionIndex] || "").replace(/^\d+\.\s*/, "").trim();
-    if (!currentQuestion) return null;
-
-    const answerText = transcriptRef.current.slice(realtimeQuestionStartRef.current).trim();
-    if (!answerText) {
-      if (!suppressNoAnswerError) {
-        setRealtimeError("No answer transcript captured yet for current realtime question.");
-      }
-      return null;
-    }
+  const currentRealtimeQuestionText = () => (realtimeQuestions[realtimeQuestionIndex] || "").replace(/^\d+\.\s*/, "").trim();
 
-    try {
-      setIsScoringRealtimeAnswer(true);
-      const res = await fetch(`${BACKEND_URL}/score`, {
+  // Audio uploads and evaluations both create the session lazily; share one in-flight request.
+  const createRealtimeSession = () => {
+    if (sessionCreationRef.current) return sessionCreationRef.current;
+    sessionCreationRef.current = (async () => {
+      const transcript = transcriptRef.current;
+      const res = await fetch(`${BACKEND_URL}/realtime/sessions`, {
         method: "POST",
         headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({ question: currentQuestion, answer: answerText }),
+        body: JSON.stringify({
+          role: jobRole || "Candidate",
+          job_description: realtimeJobDescription || jobDescription || "",
+          transcript_delta: transcript,
+          offset: 0,
+        }),
       });
       const data = await res.json();
-      if (!res.ok) throw new Error(data.error || "Failed to score realtime answer.");
-      setRealtimeAnswerScore(data);
-      return data;
-    } catch (err) {
-      setRealtimeError(err.message || "Failed to score realtime answer.");
-      return null;
-    } finally {
-      setIsScoringRealtimeAnswer(false);
+      if (!res.ok) throw new Error(data.error || "Failed to start realtime session.");
+      realtimeSessionIdRef.current = data.session_id;
+      syncedTranscriptLengthRef.current = transcript.length;
+    })().finally(() => {
+      sessionCreationRef.current = null;
+    });
+    return sessionCreationRef.current;
+  };
+
+  // Sends only the transcript text the backend session has not seen yet, then runs the session action.
+  // A camera frame goes as the raw JPEG body with the JSON fields in the query string (no base64).
+  const postRealtimeSession = async (action, body, frameBlob = null, allowRetry = true) => {
+    if (!realtimeSessionIdRef.current) await createRealtimeSession();
+
+    const transcript = transcriptRef.current;
+    const offset = Math.min(syncedTranscriptLengthRef.current, transcript.length);
+    const payload = JSON.stringify({
+      ...body,
+      transcript_delta: transcript.slice(offset),
+      offset,
+      question: currentRealtimeQuestionText(),
+      answer_offset: realtimeQuestionStartRef.current,
+    });
+    const url = `${BACKEND_URL}/realtime/sessions/${realtimeSessionIdRef.current}/${action}`;
+    const res = frameBlob
+      ? await fetch(`${url}?payload=${encodeURIComponent(payload)}`, {
+        method: "POST",
+        headers: { "Content-Type": "image/jpeg" },
+        body: frameBlob,
+      })
+      : await fetch(url, {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: payload,
+      });
+    const data = await res.json();
+
+    if ((res.status === 404 || res.status === 409) && allowRetry) {
+      realtimeSessionIdRef.current = null;
+      return postRealtimeSession(action, body, frameBlob, false);
     }
+    if (res.ok) syncedTranscriptLengthRef.current = transcript.length;
+    return { res, data };
   };
 
   const handleNextRealtimeQuestion = () => {
@@ -281,17 +348,21 @@ function App() {
 
     try {
       setIsScoring(true);
-      const question = questions[currentIndex].replace(/^\d+\.\s*/, "");
-      const res = await fetch(`${BACKEND_URL}/score`, {
-        method: "POST",
-        headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({ question, answer }),
+      const index = currentIndex;
+      const question = questions[index].replace(/^\d+\.\s*/, "");
+      let finalResult = null;
+      await streamBackendEvents("/score/stream", { question, answer }, (event, data) => {
+        // The local pre-score lands in milliseconds; the model's score and feedback replace it as they stream in.
+        if (event === "prescore") setResults((prev) => ({ ...prev, [index]: data }));
+        if (event === "score") {
+          setResults((prev) => ({ ...prev, [index]: { score: data.score, feedback: [], improvements: [] } }));
+        }
+        if (event === "result") finalResult = data;
       });
-      const data = await res.json();
-      if (!res.ok) throw new Error(data.error || "Failed to score answer.");
+      if (!finalResult) throw new Error("Failed to score answer.");
 
-      setResults((prev) => ({ ...prev, [currentIndex]: data }));
-      if (currentIndex + 1 < questions.length) setCurrentIndex(currentIndex + 1);
+      setResults((prev) => ({ ...prev, [index]: finalResult }));
+      if (index + 1 < questions.length) setCurrentIndex(index + 1);
     } catch (err) {
       alert(err.message || "Failed to score answer. Check backend.");
     } finally {
@@ -321,41 +392,58 @@ function App() {
     return candidates.find((type) => window.MediaRecorder.isTypeSupported(type)) || "";
   };
 
-  const sendRealtimeSample = async (audioBlob) => {
-    if (!audioBlob || audioBlob.size < 512 || isSegmentUploadingRef.current) return;
-
-    try {
-      isSegmentUploadingRef.current = true;
-      setRealtimeError("");
-      const formData = new FormData();
-      const extension = audioBlob.type.includes("mp4") ? "m4a" : "webm";
-      formData.append("audio", audioBlob, `speech-segment.${extension}`);
-
-      const transcribeRes = await fetch(`${BACKEND_URL}/transcribe-audio`, {
-        method: "POST",
-        body: formData,
-      });
-      const payload = await transcribeRes.json();
-      if (!transcribeRes.ok) {
-        throw new Error(payload.error || "Segment transcription unavailable");
-      }
-      if (payload.warning) {
-        setRealtimeError(payload.warning);
-      }
-
-      const segmentText = (payload.text || "").trim();
-      if (!segmentText) return;
-
-      const nextTranscript = `${transcriptRef.current} ${segmentText}`.trim();
-      setLiveTranscript(nextTranscript);
-      transcriptRef.current = nextTranscript;
+  // Streams one MediaRecorder chunk to the session; the backend transcribes overlapping windows as they fill
+  // and returns the merged transcript text this client has not seen yet.
+  const postAudioChunk = async (chunk, flush, allowRetry = true) => {
+    if (!realtimeSessionIdRef.current) await createRealtimeSession();
+
+    const params = new URLSearchParams({ text_offset: String(audioTextLengthRef.current) });
+    if (chunk) {
+      params.set("seq", String(audioSeqRef.current));
+      params.set("duration_ms", String(Math.round(chunk.durationMs)));
+      params.set("voiced", chunk.voiced ? "1" : "0");
+      if (audioSeqRef.current === 0) params.set("reset", "1");
+    }
+    if (flush) {
+      params.set("flush", "1");
+      params.set("wait_ms", "8000");
+    }
 
-      await evaluateRealtime();
-    } catch (err) {
-      setRealtimeError(err.message || "Realtime sample processing failed.");
-    } finally {
-      isSegmentUploadingRef.current = false;
+    const res = await fetch(`${BACKEND_URL}/realtime/sessions/${realtimeSessionIdRef.current}/audio?${params}`, {
+      method: "POST",
+      headers: { "Content-Type": chunk?.blob.type || "audio/webm" },
+      body: chunk ? chunk.blob : null,
+    });
+    const data = await res.json();
+
+    if ((res.status === 404 || res.status === 409) && allowRetry) {
+      // Session expired or a chunk was lost: restart the stream from the container header chunk.
+      if (res.status === 404) realtimeSessionIdRef.current = null;
+      audioSeqRef.current = 0;
+      audioTextLengthRef.current = 0;
+      const header = audioInitChunkRef.current;
+      if (header && chunk !== header) await postAudioChunk(header, false, false);
+      return postAudioChunk(chunk, flush, false);
     }
+    if (!res.ok) throw new Error(data.error || "Realtime audio streaming failed.");
+    if (chunk) audioSeqRef.current += 1;
+    if (data.warning) setRealtimeError(data.warning);
+
+    const segmentText = (data.text_delta || "").trim();
+    audioTextLengthRef.current = data.text_length || 0;
+    if (!segmentText) return;
+
+    const nextTranscript = `${transcriptRef.current} ${segmentText}`.trim();
+    setLiveTranscript(nextTranscript);
+    transcriptRef.current = nextTranscript;
+    await evaluateRealtime();
+  };
+
+  const queueAudioChunk = (chunk, flush = false) => {
+    // Chunks must reach the backend in order, so uploads run one at a time.
+    audioUploadChainRef.current = audioUploadChainRef.current
+      .then(() => postAudioChunk(chunk, flush))
+      .catch((err) => setRealtimeError(err.message || "Realtime audio streaming failed."));
   };
 
   const analyzeAudioSignal = () => {
@@ -409,19 +497,27 @@ function App() {
     };
   };
 
-  const estimateFrameMetrics = async () => {
+  const drawVideoFrame = () => {
     const video = videoRef.current;
     const canvas = canvasRef.current;
-    if (!video || !canvas || video.videoWidth === 0 || video.videoHeight === 0) return visualMetrics;
+    if (!video || !canvas || video.videoWidth === 0 || video.videoHeight === 0) return null;
 
     const targetWidth = 320;
     const targetHeight = Math.max(180, Math.round((video.videoHeight / video.videoWidth) * targetWidth));
     canvas.width = targetWidth;
     canvas.height = targetHeight;
     const ctx = canvas.getContext("2d", { willReadFrequently: true });
-    if (!ctx) return visualMetrics;
+    if (!ctx) return null;
 
     ctx.drawImage(video, 0, 0, canvas.width, canvas.height);
+    return ctx;
+  };
+
+  const estimateFrameMetrics = async () => {
+    const canvas = canvasRef.current;
+    const ctx = drawVideoFrame();
+    if (!ctx) return visualMetrics;
+
     const imageData = ctx.getImageData(0, 0, canvas.width, canvas.height);
     const pixels = imageData.data;
 
@@ -503,6 +599,8 @@ function App() {
 
     if (mediaRecorderRef.current) {
       try {
+        // stop() emits a last chunk; flush it so the tail of the answer is transcribed too.
+        flushPendingRef.current = true;
         if (mediaRecorderRef.current.state !== "inactive") mediaRecorderRef.current.stop();
       } catch {
         // noop
@@ -533,11 +631,6 @@ function App() {
     if (videoRef.current) videoRef.current.srcObject = null;
     faceDetectorRef.current = null;
     speechStateRef.current = false;
-    if (audioChunkBufferRef.current.length) {
-      const pendingBlob = new Blob(audioChunkBufferRef.current, { type: "audio/webm" });
-      sendRealtimeSample(pendingBlob);
-    }
-    audioChunkBufferRef.current = [];
     setIsSpeaking(false);
     setSpeechEngine("idle");
     setIsRealtimeRunning(false);
@@ -550,34 +643,50 @@ function App() {
       setIsEvaluatingRealtime(true);
       setRealtimeError("");
 
-      const metrics = await estimateFrameMetrics();
+      // Once the backend analyses frames itself, skip the per-pixel loop here and only send the audio signal.
+      const useServerVision = serverVisionRef.current;
+      const metrics = useServerVision
+        ? { ...visualMetrics, confidenceSignal: analyzeAudioSignal() }
+        : await estimateFrameMetrics();
+      if (useServerVision) drawVideoFrame();
       const canvas = canvasRef.current;
-      const frameBase64 = canvas.toDataURL("image/jpeg", 0.7);
+      const frameBlob = await new Promise((resolve) => canvas.toBlob(resolve, "image/jpeg", 0.7));
       const sessionSeconds = Math.max(1, Math.round((Date.now() - startTsRef.current) / 1000));
 
-      const res = await fetch(`${BACKEND_URL}/realtime-score`, {
-        method: "POST",
-        headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({
-          role: jobRole || "Candidate",
-          job_description: realtimeJobDescription || jobDescription || "",
-          transcript: transcriptRef.current,
-          session_seconds: sessionSeconds,
-          filler_words: fillerWordCount,
-          eye_contact: metrics.eyeContact,
-          posture: metrics.posture,
-          outfit: metrics.outfit,
+      const hasAnswer = Boolean(transcriptRef.current.slice(realtimeQuestionStartRef.current).trim());
+      const { res, data } = await postRealtimeSession("evaluate", {
+        session_seconds: sessionSeconds,
+        include_answer_score: Boolean(currentRealtimeQuestionText() && hasAnswer),
+        deadline_ms: REALTIME_DEADLINE_MS,
+        metrics: {
+          // null lets the session count fillers incrementally on the server.
+          filler_words: null,
+          eye_contact: useServerVision ? null : metrics.eyeContact,
+          posture: useServerVision ? null : metrics.posture,
+          outfit: useServerVision ? null : metrics.outfit,
           confidence_signal: metrics.confidenceSignal,
-          lighting_score: metrics.lighting,
-          face_detected: metrics.faceDetected,
-          frame_base64: frameBase64,
-        }),
-      });
+          lighting_score: useServerVision ? null : metrics.lighting,
+          face_detected: useServerVision ? null : metrics.faceDetected,
+        },
+      }, frameBlob);
 
-      const data = await res.json();
       if (!res.ok) throw new Error(data.error || "Realtime evaluation failed.");
-      const answerScore = await scoreCurrentRealtimeAnswer(true);
-      setRealtimeReport({ ...data, answer_score: answerScore });
+      if (data.visual_metrics) {
+        serverVisionRef.current = true;
+        const server = data.visual_metrics;
+        setVisualMetrics((prev) => ({
+          ...prev,
+          eyeContact: server.eye_contact,
+          posture: server.posture,
+          outfit: server.outfit,
+          lighting: server.lighting,
+          faceDetected: server.face_detected,
+          lightingLabel: server.lighting >= 7 ? "Good" : (server.lighting >= 4 ? "Moderate" : "Poor"),
+          confidenceSignal: metrics.confidenceSignal,
+        }));
+      }
+      if (data.answer_score) setRealtimeAnswerScore(data.answer_score);
+      setRealtimeReport(data);
     } catch (err) {
       setRealtimeError(err.message || "Realtime evaluation failed.");
     } finally {
@@ -619,13 +728,30 @@ function App() {
           : new MediaRecorder(audioOnlyStream);
         mediaRecorderRef.current = recorder;
         recorder.ondataavailable = (event) => {
-          if (!event.data || event.data.size < 512) return;
-          audioChunkBufferRef.current.push(event.data);
-          if (audioChunkBufferRef.current.length > 16) {
-            audioChunkBufferRef.current.shift();
-          }
+          if (!event.data || !event.data.size) return;
+          const now = Date.now();
+          const isHeader = !audioInitChunkRef.current;
+          const chunk = {
+            blob: event.data,
+            durationMs: isHeader ? 0 : now - lastAudioChunkTsRef.current,
+            voiced: !isHeader && chunkVoicedRef.current,
+          };
+          if (isHeader) audioInitChunkRef.current = chunk;
+          lastAudioChunkTsRef.current = now;
+          chunkVoicedRef.current = speechStateRef.current;
+          const flush = flushPendingRef.current;
+          flushPendingRef.current = false;
+          queueAudioChunk(chunk, flush);
         };
+        audioSeqRef.current = 0;
+        audioInitChunkRef.current = null;
+        audioTextLengthRef.current = 0;
+        chunkVoicedRef.current = false;
+        flushPendingRef.current = false;
+        lastAudioChunkTsRef.current = Date.now();
         recorder.start(1000);
+        // The first chunk then carries only the container header, which the backend prepends to every window.
+        recorder.requestData();
       } else {
         setRealtimeError("MediaRecorder not available; realtime audio segmentation disabled.");
       }
@@ -675,6 +801,9 @@ function App() {
       }
 
       startTsRef.current = Date.now();
+      realtimeSessionIdRef.current = null;
+      syncedTranscriptLengthRef.current = 0;
+      serverVisionRef.current = false;
       setIsRealtimeRunning(true);
 
       speechMonitorRef.current = setInterval(() => {
@@ -693,6 +822,7 @@ function App() {
 
         if (isVoiceActive) {
           lastSpeechTsRef.current = now;
+          chunkVoicedRef.current = true;
           if (!speechStateRef.current) {
             speechStateRef.current = true;
             setIsSpeaking(true);
@@ -700,20 +830,17 @@ function App() {
         } else if (speechStateRef.current && now - lastSpeechTsRef.current > 1200) {
           speechStateRef.current = false;
           setIsSpeaking(false);
-          const segmentBlob = new Blob(audioChunkBufferRef.current, { type: "audio/webm" });
-          audioChunkBufferRef.current = [];
-          sendRealtimeSample(segmentBlob);
-        }
-
-        if (!speechStateRef.current && audioChunkBufferRef.current.length >= 4 && !isSegmentUploadingRef.current) {
-          const segmentBlob = new Blob(audioChunkBufferRef.current, { type: "audio/webm" });
-          audioChunkBufferRef.current = [];
-          sendRealtimeSample(segmentBlob);
+          // End of an utterance: transcribe the partial window now instead of waiting for it to fill.
+          const recorder = mediaRecorderRef.current;
+          if (recorder && recorder.state === "recording") {
+            flushPendingRef.current = true;
+            recorder.requestData();
+          }
         }
       }, 250);
 
       frameAnalysisRef.current = setInterval(() => {
-        estimateFrameMetrics();
+        if (!serverVisionRef.current) estimateFrameMetrics();
       }, 2000);
       evalTimerRef.current = setInterval(() => {
         evaluateRealtime();
@@ -845,7 +972,7 @@ function App() {
                     )}
                     {results[index] && (
                       <div className="mt-4 rounded-xl border border-slate-700/90 bg-slate-950/80 p-4 text-sm">
-                        <p className="font-semibold text-emerald-200">Score: {results[index].score}</p>
+                        <p className="font-semibold text-emerald-200">Score: {results[index].score}{results[index].provisional ? " (provisional)" : ""}</p>
                         <p className="mt-2 text-cyan-100">Feedback: {results[index].feedback.join(" | ")}</p>
                         <p className="mt-1 text-cyan-100">Improvements: {results[index].improvements.join(" | ")}</p>
                       </div>
@@ -889,7 +1016,7 @@ function App() {
                 ) : (
                   <button onClick={stopRealtimeSession} className="rounded-xl bg-gradient-to-r from-rose-300 to-orange-300 px-5 py-3 font-semibold text-slate-950">Stop Session</button>
                 )}
-                <button onClick={evaluateRealtime} disabled={!isRealtimeRunning || isEvaluatingRealtime} className="rounded-xl bg-gradient-to-r from-emerald-300 to-cyan-300 px-5 py-3 font-semibold text-slate-950 disabled:opacity-60">{isEvaluatingRealtime || isScoringRealtimeAnswer ? "Evaluating..." : "Evaluate Now"}</button>
+                <button onClick={evaluateRealtime} disabled={!isRealtimeRunning || isEvaluatingRealtime} className="rounded-xl bg-gradient-to-r from-emerald-300 to-cyan-300 px-5 py-3 font-semibold text-slate-950 disabled:opacity-60">{isEvaluatingRealtime ? "Evaluating..." : "Evaluate Now"}</button>
               </div>
               {realtimeError && <p className="text-sm text-rose-300">{realtimeError}</p>}
             </div>
@@ -907,7 +1034,15 @@ function App() {
               <div className="status-chip text-sm text-cyan-100">Speech engine: <strong>{speechEngine === "backend-stt" ? "backend transcription" : speechEngine}</strong></div>
               <div className="status-chip text-sm text-cyan-100">Currently speaking: <strong>{isSpeaking ? "Yes" : "No"}</strong></div>
               <div className="status-chip text-sm text-cyan-100">Voice threshold: <strong>{vadThresholdRef.current.toFixed(3)}</strong></div>
-              <div className="status-chip text-sm text-cyan-100">Filler words detected: <strong>{fillerWordCount}</strong></div>
+              <div className="status-chip text-sm text-cyan-100">Filler words detected: <strong>{realtimeReport?.speech_metrics?.filler_words ?? fillerWordCount}</strong></div>
+              {realtimeReport?.speech_metrics?.wpm != null && (
+                <div className="status-chip text-sm text-cyan-100">
+                  Pace: <strong>{Math.round(realtimeReport.speech_metrics.wpm)} wpm</strong>
+                  {realtimeReport.speech_metrics.speaking_ratio != null && (
+                    <> · speaking {Math.round(realtimeReport.speech_metrics.speaking_ratio * 100)}% · {realtimeReport.speech_metrics.pauses.count} pauses</>
+                  )}
+                </div>
+              )}
               <div className="status-chip max-h-40 overflow-auto text-left text-sm text-slate-200">{liveTranscript || "Waiting for speech..."}</div>
 
               {realtimeReport ? (
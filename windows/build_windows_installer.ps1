@@ -80,7 +80,7 @@ $BackendExe = Join-Path $BackendDistDir "AIInterviewBackend.exe"
 $FrontendDistDir = Join-Path $RepoRoot "frontend/dist"
 
 Write-Host "Installing backend packaging dependencies..."
-& $PythonExe -m pip install --upgrade pyinstaller SpeechRecognition
+& $PythonExe -m pip install --upgrade pyinstaller SpeechRecognition numpy pillow
 
 Write-Host "Building frontend static bundle..."
 Push-Location (Join-Path $RepoRoot "frontend")